@@ -2,20 +2,33 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Las Change: Tue Aug 31, 2021 at 11:38 PM +0200
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 
 import re
+import json
 import logging
+import subprocess
+import os.path
 
 from collections import defaultdict
+from glob import glob
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
+from timeit import default_timer as timer
 
 from pyBabyMaker.base import TermColor as TC
 from pyBabyMaker.base import UniqueList, BaseMaker
 from pyBabyMaker.base import update_config
+from pyBabyMaker.engine.core import template_include
 from pyBabyMaker.engine.core import template_transformer, template_evaluator
 from pyBabyMaker.dag_resolver import resolve_scope
-from pyBabyMaker.dag_resolver import Variable
+from pyBabyMaker.dag_resolver import Variable, NodeRegistry
+from pyBabyMaker.optimizer import eliminate_common_subexprs, fold_constants, \
+    eliminate_dead_vars
+from pyBabyMaker.optimizer import parse_expr_with_pos, infer_type, common_type
+from pyBabyMaker.boolean.utils import cpp_expr_cache
+from pyBabyMaker.io.SchemaCache import SchemaCache
 
 
 ###########
@@ -26,7 +39,7 @@ class BabyResolver:
     def __init__(self, scopes, skip_names=[]):
         self.scopes = scopes
         self.skip_names = skip_names
-        self.resolved = UniqueList()
+        self.resolved = NodeRegistry()
 
     def resolve(self, scope,
                 ordering=['literals', 'calculation', 'rename', 'raw'],
@@ -43,6 +56,67 @@ class BabyResolver:
         node.output = var.output
 
 
+class PatternSet:
+    """
+    A set of regular expressions, compiled once, to test if a string matches
+    at least one of them.
+
+    Invalid regular expressions, including patterns that are not strings (e.g.
+    ``null`` or numbers in YAML), are reported once, when the set is compiled,
+    and are then ignored.
+    """
+    uncombinable = re.compile(r'\\[1-9]|\(\?P=|\(\?[aiLmsux]+\)')
+
+    def __init__(self, patterns):
+        self.patterns = tuple(patterns)
+        valid = []
+
+        for p in self.patterns:
+            try:
+                if not isinstance(p, str):
+                    raise re.error('not a string')
+                valid.append(re.compile(p))
+            except re.error:
+                print('WARN: Invalid regex: {}'.format(p))
+
+        self.regexes = valid
+        # A single alternation is faster than testing patterns one by one, but
+        # backreferences and global inline flags can't be combined safely
+        if valid and not any(self.uncombinable.search(r.pattern)
+                             for r in valid):
+            try:
+                self.regexes = [re.compile('|'.join(
+                    '(?:{})'.format(r.pattern) for r in valid))]
+            except re.error:
+                pass
+
+    @classmethod
+    def get(cls, patterns):
+        """
+        Return a compiled ``PatternSet``, cached per distinct list of patterns.
+        """
+        if isinstance(patterns, cls):
+            return patterns
+        try:
+            return cls._get(tuple(patterns))
+        except TypeError:  # Unhashable patterns can't be cached
+            return cls(patterns)
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _get(cls, patterns):
+        return cls(patterns)
+
+    def search(self, string):
+        """
+        Return ``True`` if ``string`` matches at least one pattern.
+        """
+        for r in self.regexes:
+            if r.search(string):
+                return True
+        return False
+
+
 ########################
 # Configuration parser #
 ########################
@@ -51,16 +125,43 @@ class BabyConfigParser:
     """
     Basic parser for YAML C++ code instruction.
     """
+    # ROOT compression algorithms and their default levels, following
+    # ROOT::RCompressionSetting
+    compression_algorithms = {
+        'ZLIB': (1, 1),
+        'LZMA': (2, 7),
+        'LZ4': (4, 4),
+        'ZSTD': (5, 5),
+    }
+
+    # Functions without side effects, and their return types, see
+    # pyBabyMaker.optimizer.infer_type
+    pure_functions = {
+        'abs': 'same', 'fabs': 'cmath',
+        'sqrt': 'cmath', 'cbrt': 'cmath', 'pow': 'cmath', 'hypot': 'cmath',
+        'exp': 'cmath', 'log': 'cmath', 'log10': 'cmath',
+        'sin': 'cmath', 'cos': 'cmath', 'tan': 'cmath',
+        'asin': 'cmath', 'acos': 'cmath', 'atan': 'cmath', 'atan2': 'cmath',
+        'sinh': 'cmath', 'cosh': 'cmath', 'tanh': 'cmath',
+        'TMath::Abs': 'same', 'TMath::Sqrt': 'double', 'TMath::Exp': 'double',
+        'TMath::Log': 'double', 'TMath::Log10': 'double',
+        'TMath::ATan2': 'double', 'TMath::Pi': 'double',
+    }
+
     def __init__(self, parsed_config, dumped_ntuple,
-                 literals={}, debug=False):
+                 literals={}, debug=False, selection_profile={}):
         """
         Initialize the config parser with parsed YAML file and dumped ntuple
         structure.
+
+        ``selection_profile`` maps output trees to the measured cost of their
+        cuts, which is used to reorder the cuts.
         """
         self.parsed_config = parsed_config
         self.dumped_ntuple = dumped_ntuple
         self.literals = literals
         self.debug = debug
+        self.selection_profile = selection_profile
 
         if debug:
             logging.basicConfig(level=logging.DEBUG)
@@ -76,6 +177,7 @@ class BabyConfigParser:
             'user_headers': UniqueList(),
             'trees': {},
             'input_trees': UniqueList(),
+            'input_groups': {},
         }
         self.parse_headers(self.parsed_config, directive)
         parsed_literals = {k: Variable(k, literal=v)
@@ -88,9 +190,10 @@ class BabyConfigParser:
 
 
             try:
-                known_warnings = global_known_warnings + config['mute']
+                known_warnings = PatternSet.get(
+                    global_known_warnings + config['mute'])
             except KeyError:
-                known_warnings = global_known_warnings
+                known_warnings = PatternSet.get(global_known_warnings)
 
             try:
                 dumped_tree = self.dumped_ntuple[input_tree]
@@ -128,7 +231,7 @@ class BabyConfigParser:
             rename, unresolved_rename = resolver.resolve('rename', ['raw'])
             calculation, unresolved_calculation = resolver.resolve(
                 'calculation')
-            resolved_vars = selection + keep + rename + calculation
+            post_selection = keep + rename + calculation
             most_unresolved_vars = unresolved_keep + unresolved_rename + \
                 unresolved_calculation
 
@@ -152,21 +255,90 @@ class BabyConfigParser:
                     print("{}Temp variable {} cannot be resolved...{}".format(
                         TC.YELLOW, var.name, TC.END))
 
+            # Compute expressions that only depend on literals once
+            pure_functions = self.parse_pure_functions(config)
+            loop_invariant, folded = [], []
+            if 'fold_constants' in config and config['fold_constants']:
+                (selection, post_selection), loop_invariant, folded = \
+                    fold_constants([selection, post_selection],
+                                   pure_functions)
+
+            # Compute repeated sub-expressions only once per event
+            if 'cse' in config and config['cse']:
+                (selection, post_selection), _ = eliminate_common_subexprs(
+                    [selection, post_selection], pure_functions)
+
+            # Drop variables that no output branch or cut depends on
+            dead_vars = []
+            if 'eliminate_dead_vars' in config and \
+                    config['eliminate_dead_vars']:
+                (loop_invariant, selection, post_selection), dead_vars = \
+                    eliminate_dead_vars(
+                        [loop_invariant, selection, post_selection])
+
+            selection = NodeRegistry(selection)
+            post_selection = NodeRegistry(post_selection)
+
+            if output_tree in self.selection_profile:
+                selection = self.reorder_selection(
+                    selection, self.selection_profile[output_tree])
+
+            resolved_vars = NodeRegistry(loop_invariant) + selection + \
+                post_selection
+            pre_sel_input = {v for v in selection if v.input}
+
             directive['trees'][output_tree] = {
                 'input_tree': input_tree,
                 'sel': ['true']+[v.rval for v in selection if v.fake],
                 'pre_sel_vars':
                 [v for v in selection if not v.fake and not v.input],
+                'sel_steps': self.parse_selection_steps(selection),
                 'post_sel_vars':
-                [v for v in keep+rename+calculation
-                 if not v.fake and not v.input],
+                [v for v in post_selection if not v.fake and not v.input],
                 'input': [v for v in resolved_vars if v.input],
+                # Inputs needed to evaluate the selection, and the ones that are
+                # only needed for events passing the selection
+                'pre_sel_input': [v for v in selection if v.input],
+                'post_sel_input':
+                [v for v in UniqueList(post_selection)
+                 if v.input and v not in pre_sel_input],
                 'output': [v for v in resolved_vars if v.output],
                 'tmp':
                 [v for v in resolved_vars
                  if True not in [v.input, v.output, v.fake]],
                 'input_br': [v.fname for v in resolved_vars if v.input],
+                # Temp variables that are computed once, before the event loop
+                'loop_invariant': loop_invariant,
+                'folded': ['{} -> {}'.format(e, v) for e, v in folded],
+                # Unused variables and input branches that are not computed or
+                # read
+                'dead_vars': [v for v in dead_vars if not v.input],
+                'dead_input_br': [v.fname for v in dead_vars if v.input],
+                # Size of the read cache of the input tree, in bytes
+                'cache_size': config['cache_size']
+                if 'cache_size' in config else 30000000,
+                # Output tree storage settings; ROOT defaults are used if None
+                'compression': self.parse_compression(config),
+                'basket_size': config['basket_size']
+                if 'basket_size' in config else None,
+                'auto_flush': config['auto_flush']
+                if 'auto_flush' in config else None,
+                # Write cut-flow and throughput reports
+                'instrument': bool(config['instrument'])
+                if 'instrument' in config else False,
+                # Time each cut, to profile them
+                'profile': bool(config['profile_cuts'])
+                if 'profile_cuts' in config else False,
+                # Number of events to profile; all if None
+                'profile_events': None,
             }
+            if directive['trees'][output_tree]['profile']:
+                directive['trees'][output_tree]['instrument'] = True
+                if 'profile_events' in config:
+                    directive['trees'][output_tree]['profile_events'] = \
+                        int(config['profile_events'])
+            directive['trees'][output_tree].update(self.parse_clone(
+                config, directive['trees'][output_tree]))
 
             # Merge raw config sections that doesn't override keys above
             config_to_merge = {k: v for k, v in config.items()
@@ -175,6 +347,17 @@ class BabyConfigParser:
                                          'calculation', 'selection']}
             directive['trees'][output_tree].update(config_to_merge)
 
+            # Group output trees sharing the same input tree, so that they can
+            # be generated in a single pass over the input tree
+            group = directive['input_groups'].setdefault(input_tree, {
+                'outputs': [],
+                'input': UniqueList(),
+                'input_br': UniqueList(),
+            })
+            group['outputs'].append(output_tree)
+            group['input'] += directive['trees'][output_tree]['input']
+            group['input_br'] += directive['trees'][output_tree]['input_br']
+
         return directive
 
     @staticmethod
@@ -194,9 +377,11 @@ class BabyConfigParser:
         """
         if 'rename' in config:
             rename_dict = config['rename']
+        drop = PatternSet.get(config['drop']) if 'drop' in config else None
+        keep = PatternSet.get(config['keep']) if 'keep' in config else None
 
         for var in namespace['raw'].values():
-            if 'drop' in config and cls.match(config['drop'], var.name):
+            if drop and drop.search(var.name):
                 print('Dropping branch: {}'.format(var.name))
                 continue
 
@@ -205,10 +390,110 @@ class BabyConfigParser:
                 namespace['rename'][renamed_var] = Variable(
                     renamed_var, var.type, [var.name])
 
-            if 'keep' in config and cls.match(config['keep'], var.name):
+            if keep and keep.search(var.name):
                 namespace['keep'][var.name] = Variable(
                     var.name, var.type, [var.name])
 
+    @classmethod
+    def parse_compression(cls, config):
+        """
+        Parse ``compression`` key, which is either a ROOT compression setting
+        (an integer, e.g. ``404``) or a string like ``LZ4:4``. If the level is
+        omitted, e.g. ``ZSTD``, ROOT's default level for that algorithm is used.
+
+        Return ``None`` if no compression is specified.
+        """
+        if 'compression' not in config:
+            return None
+
+        setting = config['compression']
+        if isinstance(setting, int):
+            return setting
+
+        algo, _, level = str(setting).partition(':')
+        try:
+            algo, default_level = cls.compression_algorithms[
+                algo.strip().upper()]
+            return algo*100 + (int(level) if level else default_level)
+        except (KeyError, ValueError):
+            raise ValueError('Illegal compression setting: {}.'.format(
+                setting))
+
+    @staticmethod
+    def parse_clone(config, tree_directive):
+        """
+        Detect output trees that only keep input branches, so that they can be
+        copied without a per-event loop.
+
+        The ``clone`` key is ``'fast'`` if there's no selection,
+        ``'copy'`` if there's a selection on input branches only, and ``None``
+        otherwise. ``clone_sel`` holds the selection in ``TTreeFormula``
+        syntax. Set ``fast_clone`` to ``false`` in the YAML file to disable
+        this. Instrumented output trees are never cloned.
+
+        Output trees with storage settings (``compression``, ``basket_size``
+        or ``auto_flush``) are not cloned either, as fast cloning copies the
+        compressed baskets as they are, and so are output trees with cuts that
+        ``TTreeFormula`` may evaluate differently (see ``formula_compatible``).
+        """
+        result = {'clone': None, 'clone_sel': None}
+
+        if 'fast_clone' in config and not config['fast_clone']:
+            return result
+        if [k for k in ['compression', 'basket_size', 'auto_flush']
+                if tree_directive[k] is not None]:
+            return result
+        # Instrumentation needs the event loop
+        if tree_directive['instrument']:
+            return result
+        if tree_directive['pre_sel_vars'] or tree_directive['tmp'] or \
+                [v for v in tree_directive['post_sel_vars']
+                 if v.scope != 'keep']:
+            return result
+
+        sel = [s for s in tree_directive['sel'] if s != 'true']
+        if not sel:
+            result['clone'] = 'fast'
+            result['clone_sel'] = ''
+            return result
+
+        var_types = {v.fname: v.type for v in tree_directive['input']}
+        if not all(BabyConfigParser.formula_compatible(s, var_types)
+                   for s in sel):
+            return result
+
+        # Refer to input branches by their names in the input tree
+        clone_sel = ' && '.join('({})'.format(s) for s in sel)
+        for var in tree_directive['input']:
+            clone_sel = re.sub(r'\b'+var.fname+r'\b', var.name, clone_sel)
+
+        result['clone'] = 'copy'
+        result['clone_sel'] = clone_sel
+        return result
+
+    @staticmethod
+    def formula_compatible(cut, var_types):
+        """
+        Check if a resolved ``cut`` is evaluated by ``TTreeFormula`` the same
+        way as in C++. This is not the case for calls to functions (e.g. from
+        user headers), member access, array subscripts, and division of
+        integers, which ``TTreeFormula`` always performs in floating point.
+
+        ``var_types`` maps the variables in ``cut`` to their types.
+        """
+        tree = parse_expr_with_pos(cut)
+        if tree is None:
+            return False
+
+        for subtree in tree.iter_subtrees():
+            if subtree.data in ['func_call', 'method_call', 'getattr']:
+                return False
+            if subtree.data == 'div' and common_type(
+                    [infer_type(c, var_types, {}) for c in subtree.children]
+            ) not in ['float', 'double']:
+                return False
+        return True
+
     @staticmethod
     def parse_calculation(config, namespace):
         """
@@ -245,20 +530,108 @@ class BabyConfigParser:
             namespace['selection']['sel'+str(idx)] = Variable(
                 'sel'+str(idx), rvals=[expr], input=False, output=False)
 
+    @classmethod
+    def parse_pure_functions(cls, config):
+        """
+        Return the functions that can be hoisted by common sub-expression
+        elimination. Additional functions, and their return types, can be
+        given in the ``pure_functions`` section of the YAML file.
+        """
+        result = dict(cls.pure_functions)
+        if 'pure_functions' in config:
+            result.update(config['pure_functions'])
+        return result
+
+    @staticmethod
+    def parse_selection_steps(selection):
+        """
+        Split the resolved ``selection`` into steps, one per cut, in order.
+        Each step holds the ``cut`` and the pre-selection ``vars`` that it
+        needs but that are not computed by the previous steps, so that they can
+        be computed right before the cut.
+
+        Unlike ``sel``, the always-true cut is not included.
+        """
+        steps = []
+        pending = []
+
+        for v in selection:
+            if v.fake:
+                steps.append({'cut': v.rval, 'vars': pending})
+                pending = []
+            elif not v.input:
+                pending.append(v)
+
+        return steps
+
+    @staticmethod
+    def reorder_selection(selection, profile):
+        """
+        Reorder the cuts in the resolved ``selection`` by their expected cost
+        per rejected event, i.e. ``cost / (1 - pass_rate)``, so that cheap and
+        selective cuts come first. ``profile`` maps resolved cut expressions to
+        ``evaluated``, ``passed`` and ``time_s``, measured on the events
+        passing the preceding cuts.
+
+        Cuts that depend on a common computed variable, or that are not in
+        ``profile``, keep their relative order. Sharing an input branch doesn't
+        prevent reordering. Ties are broken by the original order.
+        Variables needed by the cuts are moved to right before their first
+        user.
+        """
+        cuts = [v for v in selection if v.fake]
+
+        def find_deps(node, deps):
+            for child in node.children:
+                if child not in deps and child in selection:
+                    deps.add(child)
+                    find_deps(child, deps)
+            return deps
+
+        deps = [find_deps(c, set()) for c in cuts]
+        computed_deps = [{v for v in d if not v.input} for d in deps]
+
+        ranks = []
+        for cut in cuts:
+            stat = profile.get(cut.rval)
+            if not stat or not stat['evaluated']:
+                ranks.append(None)
+                continue
+            cost = stat['time_s'] / stat['evaluated']
+            rejection = 1 - stat['passed'] / stat['evaluated']
+            ranks.append(cost / rejection if rejection > 0 else float('inf'))
+
+        def movable(i, j):
+            return ranks[i] is not None and ranks[j] is not None and \
+                not computed_deps[i] & computed_deps[j]
+
+        ordering = []
+        remaining = list(range(len(cuts)))
+        while remaining:
+            ready = [i for i in remaining
+                     if all(movable(j, i) for j in remaining if j < i)]
+            best = min(ready, key=lambda i: (
+                ranks[i] if ranks[i] is not None else float('inf'), i))
+            ordering.append(best)
+            remaining.remove(best)
+
+        result = NodeRegistry()
+        for idx in ordering:
+            result += [v for v in selection if v in deps[idx]]
+            result.append(cuts[idx])
+        result += selection
+        return result
+
     @staticmethod
     def match(patterns, string, return_value=True):
         """
         Test if ``string`` matches at least one element in the ``patterns`` (a
-        list of regular expression).
+        list of regular expression, or a ``PatternSet``).
 
         If there's a match, return ``return_value``.
         """
-        for p in patterns:
-            try:
-                if bool(re.search(r'{}'.format(p), string)):
-                    return return_value
-            except Exception:
-                print('WARN: Invalid regex: {}'.format(p))
+        if PatternSet.get(patterns).search(string):
+            return return_value
         return not return_value
 
 
@@ -270,24 +643,70 @@ class BabyMaker(BaseMaker):
     """
     ``babymaker`` class to glue parser and code generator together.
     """
+    # Suffix of output files of the shard {0} out of {1} shards
+    shard_suffix = '_shard{}of{}'
+    # Suffix of output files when only the {0}-th input file is processed
+    file_suffix = '_file{}'
+
     def __init__(self, config_filename, ntuple_filename, friend_filenames,
                  template_filename,
-                 use_reformatter=True):
+                 use_reformatter=True, cache_dir=None, dump_workers=4):
         """
         Initialize with path to YAML file and ntuple file.
+
+        The main ntuple and each friend ntuple can also be a list of files with
+        identical structures, given as a ``list``, a glob pattern, a
+        comma-separated list, or ``@<file>`` with one path per line (see
+        ``expand_filenames``). The first file of each list is dumped, and the
+        structures of the others are verified to be identical. Multiple files
+        are only supported by templates reading all of them, e.g.
+        ``babymaker_chain.cpp``. Each friend ntuple then consists of either a
+        single file, shared by all main files, or as many files as the main
+        ntuple.
+
+        If ``cache_dir`` is specified, parsed C++ expressions and dumped
+        ntuple structures are cached on disk inside that directory.
+
+        The main and friend ntuples are dumped concurrently, with at most
+        ``dump_workers`` threads.
         """
         self.config_filename = config_filename
-        self.ntuple_filename = ntuple_filename
-        self.friend_filenames = friend_filenames
+        self.ntuple_filenames = self.expand_filenames(ntuple_filename)
+        self.friend_filenames_all = [self.expand_filenames(f)
+                                     for f in friend_filenames]
+        # Representative files, whose structures are dumped
+        self.ntuple_filename = self.ntuple_filenames[0]
+        self.friend_filenames = [f[0] for f in self.friend_filenames_all]
         self.template_filename = template_filename
+
+        for files in self.friend_filenames_all:
+            if len(files) not in (1, len(self.ntuple_filenames)):
+                raise ValueError(
+                    'Friend ntuple has {} files, but main ntuple has {}: {}'
+                    .format(len(files), len(self.ntuple_filenames),
+                            ', '.join(files)))
+
+        multi_files = [f for f in [self.ntuple_filenames] +
+                       self.friend_filenames_all if len(f) > 1]
+        if multi_files and not self.reads_all_files(template_filename):
+            raise ValueError(
+                'Template {} only processes a single file, but got: {}'.format(
+                    template_filename, ', '.join(multi_files[0])))
+
         self.use_reformatter = use_reformatter
+        self.cache_dir = cache_dir
+        self.schema_cache = SchemaCache(cache_dir) if cache_dir else None
+        self.dump_workers = dump_workers
 
     def process(self, literals={},
                 blocked_input_trees=[], blocked_output_trees=[],
-                directive_override={}, debug=False):
+                directive_override={}, debug=False, selection_profile=[]):
         """
         Generate raw directive and tree relations. This is the basis for
         processing.
+
+        Cuts are reordered according to the reports in ``selection_profile``,
+        written by binaries generated in profile mode.
         """
         parsed_config = self.read(self.config_filename)
         parsed_config['output'] = {
@@ -296,9 +715,15 @@ class BabyMaker(BaseMaker):
         config_override = self.parse_ext_directive(directive_override)
         parsed_config = update_config(parsed_config, config_override, True)
 
-        dumped_ntuple, tree_relations = self.dump_ntuples(blocked_input_trees)
+        dumped_ntuple, tree_relations = self.dump_ntuples(
+            blocked_input_trees, self.find_input_trees(parsed_config))
+
+        if self.cache_dir:
+            cpp_expr_cache.attach(self.cache_dir)
         directive = self.directive_gen(
-            parsed_config, dumped_ntuple, literals, debug)
+            parsed_config, dumped_ntuple, literals, debug,
+            self.load_selection_profile(selection_profile))
+        cpp_expr_cache.save()
 
         return directive, tree_relations
 
@@ -312,9 +737,14 @@ class BabyMaker(BaseMaker):
         directive['ntuple'] = self.ntuple_filename
         directive['friends'] = self.friend_filenames
         directive['tree_relations'] = tree_relations
+        directive['shard_suffix'] = self.shard_suffix
+        directive['ntuple_files'] = self.ntuple_filenames
+        directive['friend_files'] = self.friend_filenames_all
+        directive['file_suffix'] = self.file_suffix
 
         with open(self.template_filename) as tmpl:
-            macros = template_transformer(tmpl, directive)
+            macros = template_transformer(template_include(
+                tmpl, os.path.dirname(self.template_filename)), directive)
 
         output_cpp = template_evaluator(macros)
 
@@ -333,18 +763,30 @@ class BabyMaker(BaseMaker):
         with open(filename, 'w') as f:
             f.write(self.directive_debug(directive))
 
-    def dump_ntuples(self, blocked_input_trees=[]):
+    def dump_ntuples(self, blocked_input_trees=[], input_trees=None):
         """
         Dump main ntuple and all friend ntuples.
+
+        If ``input_trees`` is specified, only these trees are dumped.
         """
-        trees = self.dump(self.ntuple_filename)
+        if input_trees is not None:
+            input_trees = [t for t in input_trees
+                           if t not in blocked_input_trees]
+
+        ntuples = [self.ntuple_filename] + list(self.friend_filenames)
+        workers = max(1, min(self.dump_workers, len(ntuples)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            dumped = list(executor.map(
+                lambda ntp: self.timed_dump(ntp, input_trees), ntuples))
+
+        self.verify_ntuples(dumped, input_trees)
+
+        trees, *all_friend_trees = dumped
         # Remove blocked input trees
         trees = {k: v for k, v in trees.items() if k not in blocked_input_trees}
         tree_relations = {k: [] for k in trees}
 
-        for friend in self.friend_filenames:
-            friend_trees = self.dump(friend)
-
+        for friend_trees in all_friend_trees:
             for t in trees:
                 in_friend = t in friend_trees
                 tree_relations[t].append(in_friend)
@@ -355,14 +797,127 @@ class BabyMaker(BaseMaker):
 
         return trees, tree_relations
 
+    def verify_ntuples(self, dumped, input_trees=None):
+        """
+        Verify that all files of the main and friend ntuples have the same
+        structures as the dumped representative files.
+
+        ``dumped`` holds the dumped structures of the main ntuple and of the
+        friend ntuples, in this order.
+        """
+        filesets = [self.ntuple_filenames] + self.friend_filenames_all
+        to_verify = [(ntp, ref) for fileset, ref in zip(filesets, dumped)
+                     for ntp in fileset[1:]]
+        if not to_verify:
+            return
+
+        # Only tree names and branch names and types are compared. Each file
+        # is opened to dump its structure, unless it is in the schema cache,
+        # i.e. its path, size and modification time are unchanged
+        workers = max(1, min(self.dump_workers, len(to_verify)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(
+                lambda args: self.dump(args[0], self.schema_cache,
+                                       input_trees) == args[1],
+                to_verify))
+
+        mismatched = [ntp for (ntp, _), ok in zip(to_verify, results)
+                      if not ok]
+        if mismatched:
+            raise ValueError(
+                'Ntuple structures differ from the first file: {}'.format(
+                    ', '.join(mismatched)))
+
+    @staticmethod
+    def reads_all_files(template_filename):
+        """
+        Return if the template reads all files of the main ntuple, i.e. if it
+        references ``directive.ntuple_files``.
+        """
+        with open(template_filename) as tmpl:
+            return any('directive.ntuple_files' in line
+                       for line in template_include(
+                           tmpl, os.path.dirname(template_filename)))
+
+    @staticmethod
+    def expand_filenames(spec):
+        """
+        Return a list of files from ``spec``, which is either a ``list``, a
+        glob pattern, a comma-separated list of files, or ``@<file>`` with one
+        path per line in ``<file>``.
+        """
+        if isinstance(spec, (list, tuple)):
+            return [f for s in spec for f in BabyMaker.expand_filenames(s)]
+
+        if spec.startswith('@'):
+            with open(spec[1:]) as f:
+                return [line.strip() for line in f
+                        if line.strip() and not line.startswith('#')]
+
+        result = []
+        for pattern in spec.split(','):
+            if re.search(r'[*?[]', pattern):
+                matched = sorted(glob(pattern))
+                if not matched:
+                    raise ValueError('No file matches {}.'.format(pattern))
+                result += matched
+            else:
+                result.append(pattern)
+        return result
+
+    @staticmethod
+    def load_selection_profile(filenames):
+        """
+        Load cut statistics from reports written in profile mode. Statistics
+        of the same cut of the same output tree, e.g. from different shards,
+        are summed up.
+
+        Return a ``dict`` of output trees to ``dict`` of cuts to statistics.
+        """
+        result = {}
+
+        for filename in filenames:
+            with open(filename) as f:
+                report = json.load(f)
+            if not report.get('profile'):
+                raise ValueError('Not a selection profile: {}.'.format(
+                    filename))
+
+            tree = result.setdefault(report['tree'], {})
+            for cut in report['cuts']:
+                stat = tree.setdefault(
+                    cut['cut'], {'evaluated': 0, 'passed': 0, 'time_s': 0})
+                for key in stat:
+                    stat[key] += cut[key]
+
+        return result
+
+    def timed_dump(self, ntuple_filename, input_trees=None):
+        """
+        Dump a single ntuple and report the time spent.
+        """
+        start = timer()
+        result = self.dump(ntuple_filename, self.schema_cache, input_trees)
+        print('Dumped {} in {:.3f} s'.format(ntuple_filename, timer()-start))
+        return result
+
+    @staticmethod
+    def find_input_trees(parsed_config):
+        """
+        Return names of all input trees referenced by output trees.
+        """
+        return UniqueList(config['input']
+                          for config in parsed_config['output'].values())
+
     @staticmethod
     def directive_gen(parsed_config, dumped_ntuple,
-                      literals={}, debug=False):
+                      literals={}, debug=False, selection_profile={}):
         """
         Generate data structure (``directive``) needed for the C++ macro
         template.
         """
-        parser = BabyConfigParser(parsed_config, dumped_ntuple, literals, debug)
+        parser = BabyConfigParser(parsed_config, dumped_ntuple, literals, debug,
+                                  selection_profile)
         return parser.parse()
 
     @staticmethod
@@ -395,6 +950,22 @@ class BabyMaker(BaseMaker):
                     output += ' - {}\n'.format(i)
                 output += '\n'
 
+            output += '## Constant folding\n\n'
+            for key, repl in [('folded', 'Folded expressions'),
+                              ('loop_invariant', 'Loop-invariant variables')]:
+                output += '### {}\n'.format(repl)
+                for i in val[key]:
+                    output += ' - {}\n'.format(i)
+                output += '\n'
+
+            output += '## Dead variable elimination\n\n'
+            for key, repl in [('dead_vars', 'Removed variables'),
+                              ('dead_input_br', 'Removed input branches')]:
+                output += '### {}\n'.format(repl)
+                for i in val[key]:
+                    output += ' - {}\n'.format(i)
+                output += '\n'
+
             output += '## Input variable full names\n'
             for i in val['input_br']:
                 output += ' - {}\n'.format(i)
@@ -438,3 +1009,27 @@ class BabyMaker(BaseMaker):
         elif val.lower() == 'false':
             return False
         return val
+
+
+##########
+# Driver #
+##########
+
+def run_per_file(binary, input_prefix, output_prefix, jobs=4):
+    """
+    Run a ``binary`` generated from the ``babymaker_chain.cpp`` template once
+    per input file, with at most ``jobs`` processes at a time.
+
+    Return the return codes of all processes, ordered by the file index.
+    """
+    num_of_files = int(subprocess.run(
+        [binary, '--num-of-files'], stdout=subprocess.PIPE,
+        check=True).stdout)
+
+    def run(idx):
+        return subprocess.run(
+            [binary, input_prefix, output_prefix, '--file', str(idx)]
+        ).returncode
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        return list(executor.map(run, range(num_of_files)))
@@ -2,18 +2,21 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Fri Jan 15, 2021 at 12:21 AM +0100
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 """
 This module provides basic infrastructure for ntuple related C++ code
 generation.
 """
 
+import os
+import sys
 import abc
 import yaml
+import hashlib
 import subprocess
 
 from shutil import which
-from os import path
+from os import path, environ
 
 
 ###########
@@ -40,32 +43,167 @@ class UniqueList(list):
     """
     An extension to the standard ``list`` class such that every element stored
     inside is unique.
+
+    The insertion order is preserved. Membership of hashable elements is
+    tracked by a companion ``set``, so that ``append``, ``insert`` and
+    ``extend`` are O(1) per element; unhashable elements fall back to a linear
+    scan.
     """
     def __init__(self, iterable=None):
         """
         This initializer takes an optional iterable and store the unique
         elements inside that iterable only.
         """
+        super().__init__()
+        self._hashable = set()
+        self._unhashable = []
         if iterable:
-            uniq = []
-            [uniq.append(i) for i in iterable if not uniq.count(i)]
-            super().__init__(uniq)
-        else:
-            super().__init__()
+            self.extend(iterable)
+
+    def _track(self, obj):
+        """
+        Record ``obj`` as a member. Return ``False`` if it is already a member.
+        """
+        try:
+            if obj in self._hashable:
+                return False
+            self._hashable.add(obj)
+        except TypeError:
+            if obj in self._unhashable:
+                return False
+            self._unhashable.append(obj)
+        return True
+
+    def _retrack(self):
+        self._hashable = set()
+        self._unhashable = []
+        for i in self:
+            self._track(i)
+
+    def __contains__(self, obj):
+        try:
+            return obj in self._hashable
+        except TypeError:
+            return obj in self._unhashable
+
+    def __reduce_ex__(self, protocol):
+        return (self.__class__, (list(self),))
 
     def append(self, obj):
-        if not super().__contains__(obj):
+        if self._track(obj):
             super().append(obj)
 
     def insert(self, index, obj):
-        if not super().__contains__(obj):
+        if self._track(obj):
             super().insert(index, obj)
 
+    def extend(self, iterable):
+        for i in iterable:
+            self.append(i)
+
+    def remove(self, obj):
+        super().remove(obj)
+        self._retrack()
+
+    def pop(self, *args):
+        obj = super().pop(*args)
+        self._retrack()
+        return obj
+
+    def clear(self):
+        super().clear()
+        self._retrack()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        uniq = UniqueList(self)
+        super().clear()
+        super().extend(uniq)
+        self._retrack()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._retrack()
+
     def __add__(self, value):
-        return UniqueList(super().__add__(value))
+        result = UniqueList(self)
+        result.extend(value)
+        return result
 
     def __iadd__(self, value):
-        return UniqueList(super().__iadd__(value))
+        self.extend(value)
+        return self
+
+
+class LazyParser:
+    """
+    A proxy to a ``lark.Lark`` parser that is only constructed on first use.
+
+    The generated LALR tables are cached on disk by ``lark`` (keyed by the
+    grammar, the parser options and the ``lark`` version), so that subsequent
+    runs skip the table generation as well.
+    """
+    def __init__(self, grammar, cache=True, **options):
+        """
+        Store the grammar and the parser options for a later construction.
+
+        :param str grammar: grammar of the parser.
+        :param bool/str cache:
+            ``cache`` option of ``lark.Lark``. If ``True``, the tables are
+            cached in a private directory (see ``cache_path``), instead of
+            the world-writable temporary directory used by ``lark``.
+        """
+        self.grammar = grammar
+        self.options = dict(options, cache=cache)
+        self._parser = None
+
+    @property
+    def parser(self):
+        """
+        Return the underlying ``lark.Lark`` parser, constructing it if needed.
+        """
+        if self._parser is None:
+            from lark import Lark
+            options = self.options
+            if options['cache'] is True:
+                options = dict(options, cache=self.cache_path())
+            self._parser = Lark(self.grammar, **options)
+        return self._parser
+
+    def cache_path(self):
+        """
+        Return the path to the cached tables of this parser, inside a ``lark``
+        directory of ``default_cache_dir()`` that is only accessible by the
+        current user.
+
+        The cached tables are unpickled when loaded, so ``False`` (no caching)
+        is returned if the directory can't be created, is not owned by the
+        current user, or is accessible by others.
+        """
+        from lark import __version__
+
+        cache_dir = path.join(default_cache_dir(), 'lark')
+        try:
+            os.makedirs(cache_dir, mode=0o700, exist_ok=True)
+            stat = os.stat(cache_dir)
+        except OSError:
+            return False
+        if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+            return False
+
+        options = {k: v for k, v in self.options.items() if k != 'cache'}
+        key = hashlib.md5('\n'.join([
+            self.grammar, repr(sorted(options.items())), __version__,
+            sys.version]).encode('utf-8')).hexdigest()
+        return path.join(cache_dir, 'grammar-{}.cache'.format(key))
+
+    def parse(self, *args, **kwargs):
+        return self.parser.parse(*args, **kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.parser, name)
 
 
 def load_file(filepath, current_file_path=__file__):
@@ -79,6 +217,16 @@ def load_file(filepath, current_file_path=__file__):
     return filepath
 
 
+def default_cache_dir():
+    """
+    Return the default directory for on-disk caches, following the XDG base
+    directory specification.
+    """
+    cache_home = environ.get('XDG_CACHE_HOME', path.join(
+        path.expanduser('~'), '.cache'))
+    return path.join(cache_home, 'pyBabyMaker')
+
+
 def update_config(config, update, merge=True):
     """
     Update ``config`` directory keys from the ``update`` directory, if the
@@ -137,13 +285,26 @@ class BaseMaker(metaclass=abc.ABCMeta):
             return yaml.load(f, NestedYAMLLoader)
 
     @staticmethod
-    def dump(data_filename):
+    def dump(data_filename, cache=None, trees=None):
         """
-        Dump ``TTree`` structures inside a ntuple
+        Dump ``TTree`` structures inside a ntuple. If ``trees`` is specified,
+        only these trees are dumped.
+
+        If a ``SchemaCache`` is provided as ``cache``, the ntuple is only
+        opened when its structure is not cached yet.
         """
+        if cache:
+            result = cache.get(data_filename, trees)
+            if result is not None:
+                return result
+
         from pyBabyMaker.io.TupleDump import PyTupleDump
         dumper = PyTupleDump(data_filename)
-        return dumper.dump()
+        result = dumper.dump(trees)
+
+        if cache:
+            cache.put(data_filename, result, trees)
+        return result
 
     @staticmethod
     def reformat(cpp_filename, formatter='clang-format', flags=['-i']):
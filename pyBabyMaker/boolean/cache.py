@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun <syp at umd dot edu>
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+"""
+This module provides a memoizing layer on top of the C++ boolean parser, so
+that the same expression is parsed only once per run.
+
+Parsed expressions are stored in a bounded in-memory LRU cache, and optionally
+in a bounded on-disk LRU cache keyed by the expression text and a hash of the
+grammar. Only the extracted variables and arguments are stored on disk, as JSON,
+so that loading the cache never executes code.
+
+Simple expressions can be handled by a fast path that doesn't build a parse
+tree; in that case, and for expressions loaded from disk, the ``tree`` field of
+``ParsedExpr`` is ``None`` until the tree is explicitly requested with
+``ParseCache.tree``.
+"""
+
+import os
+import json
+import hashlib
+
+from collections import OrderedDict, namedtuple
+
+import lark
+
+from pyBabyMaker.base import UniqueList
+
+
+ParsedExpr = namedtuple('ParsedExpr', ['tree', 'vars', 'args'])
+
+
+def extract_vars(tree):
+    """
+    Find all variables, include function arguments, in a parsed tree.
+    """
+    return UniqueList([t.children[0].value for t in tree.find_data('var')])
+
+
+def extract_args(tree):
+    """
+    Find all variables used as function call arguments in a parsed tree.
+    """
+    result = UniqueList()
+    for subtree in tree.find_data('arguments'):
+        result += [t.children[0].value for t in subtree.find_data('var')]
+    return result
+
+
+class ParseCache:
+    """
+    Cache for parsed expressions, with a bounded in-memory LRU and an optional
+    bounded on-disk LRU.
+    """
+    def __init__(self, parser, grammar, maxsize=4096, cache_dir=None,
+                 fast_path=None, disk_maxsize=65536):
+        """
+        Initialize the cache.
+
+        :param Any parser: parser with a ``parse`` method.
+        :param str grammar: grammar used by the parser, for the cache key.
+        :param int maxsize: maximum number of in-memory entries.
+        :param str cache_dir: directory for the on-disk cache. Optional.
+        :param function fast_path:
+            function that returns a tuple of variables and arguments, or
+            ``None`` if the expression needs the full parser. Optional.
+        :param int disk_maxsize: maximum number of on-disk entries.
+        """
+        self.parser = parser
+        self.fast_path = fast_path
+        self.grammar_hash = hashlib.sha1(
+            (lark.__version__ + grammar).encode('utf-8')).hexdigest()
+        self.maxsize = maxsize
+        self.disk_maxsize = disk_maxsize
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        self._disk = None
+        self._disk_dirty = False
+        self.cache_dir = None
+        if cache_dir:
+            self.attach(cache_dir)
+
+    @property
+    def disk_path(self):
+        """
+        Path to the on-disk cache file, or ``None`` if it is disabled.
+        """
+        if self.cache_dir:
+            return os.path.join(self.cache_dir, 'expr-{}.json'.format(
+                self.grammar_hash[:16]))
+        return None
+
+    def attach(self, cache_dir):
+        """
+        Enable the on-disk cache located in ``cache_dir``.
+        """
+        self.cache_dir = cache_dir
+        self._disk = None
+        self._disk_dirty = False
+
+    def detach(self):
+        """
+        Disable the on-disk cache, without saving pending entries.
+        """
+        self.cache_dir = None
+        self._disk = None
+        self._disk_dirty = False
+
+    def clear(self):
+        """
+        Clear the in-memory cache and reset statistics.
+        """
+        self.memory.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        """
+        Load the on-disk cache, which maps expressions to lists of variables
+        and arguments, from the least to the most recently used. A corrupted or
+        unreadable cache is ignored.
+        """
+        self._disk = OrderedDict()
+        try:
+            with open(self.disk_path) as f:
+                entries = json.load(f)
+            for expr, (variables, args) in entries.items():
+                self._disk[expr] = ParsedExpr(
+                    None, UniqueList(variables), UniqueList(args))
+        except (OSError, ValueError, TypeError, AttributeError):
+            self._disk = OrderedDict()
+
+    def save(self):
+        """
+        Write the on-disk cache, if it has been modified. Only the
+        ``disk_maxsize`` most recently used entries are kept.
+        """
+        if not self.cache_dir or not self._disk_dirty:
+            return
+
+        while len(self._disk) > self.disk_maxsize:
+            self._disk.popitem(last=False)
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.disk_path + '.{}.tmp'.format(os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump({expr: [list(r.vars), list(r.args)]
+                       for expr, r in self._disk.items()}, f)
+        os.replace(tmp_path, self.disk_path)
+        self._disk_dirty = False
+
+    def get(self, expr):
+        """
+        Return a ``ParsedExpr`` for ``expr``, parsing it only if needed.
+        """
+        try:
+            result = self.memory[expr]
+            self.memory.move_to_end(expr)
+            self.hits += 1
+            return result
+        except KeyError:
+            pass
+
+        result = None
+        extracted = self.fast_path(expr) if self.fast_path else None
+
+        if extracted is not None:
+            result = ParsedExpr(None, *extracted)
+        elif self.cache_dir:
+            if self._disk is None:
+                self.load()
+            result = self._disk.get(expr)
+            if result is not None:
+                self._disk.move_to_end(expr)  # Mark as recently used
+                self._disk_dirty = True
+                self.hits += 1
+
+        if result is None:
+            result = self._parse(expr)
+
+        self._remember(expr, result)
+        return result
+
+    def tree(self, expr):
+        """
+        Return the full parse tree of ``expr``.
+        """
+        result = self.get(expr)
+        if result.tree is None:
+            result = self._parse(expr)
+            self._remember(expr, result)
+        return result.tree
+
+    def _parse(self, expr):
+        self.misses += 1
+        tree = self.parser.parse(expr)
+        result = ParsedExpr(tree, extract_vars(tree), extract_args(tree))
+
+        if self.cache_dir:
+            if self._disk is None:
+                self.load()
+            self._disk[expr] = ParsedExpr(None, result.vars, result.args)
+            self._disk.move_to_end(expr)
+            self._disk_dirty = True
+
+        return result
+
+    def _remember(self, expr, result):
+        self.memory[expr] = result
+        self.memory.move_to_end(expr)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
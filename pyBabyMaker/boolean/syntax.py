@@ -2,12 +2,12 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Tue Aug 10, 2021 at 03:47 PM +0200
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 """
 This module defines C++ boolean syntax.
 """
 
-from lark import Lark
+from pyBabyMaker.base import LazyParser
 
 
 cpp_boolean_grammar = '''
@@ -69,4 +69,8 @@ cpp_boolean_grammar = '''
     BOOL.2: "true" | "false"  // These keywords have higher priority
 '''
 
-cpp_boolean_parser = Lark(cpp_boolean_grammar, parser='lalr')
+cpp_boolean_parser = LazyParser(cpp_boolean_grammar, parser='lalr')
+
+# Same parser, but the positions of all sub-expressions in the input are kept
+cpp_boolean_parser_with_pos = LazyParser(
+    cpp_boolean_grammar, parser='lalr', propagate_positions=True)
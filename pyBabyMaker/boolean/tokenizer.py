@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun <syp at umd dot edu>
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+"""
+This module provides a fast path to extract variables and function arguments
+from simple C++ expressions, without going through the Lark parser.
+
+Only a subset of ``cpp_boolean_grammar`` is understood: identifiers, numbers
+(with suffixes), arithmetic, comparison and boolean operators, parentheses and
+function calls (including ``::`` qualified function names). For anything else,
+``fast_extract`` returns ``None`` and the caller should fall back to the full
+parser.
+
+The extracted lists are ordered exactly like the ones obtained from the parse
+tree produced by Lark: deeper nodes first, then from left to right.
+"""
+
+import re
+
+from pyBabyMaker.base import UniqueList
+
+
+class UnsupportedSyntax(Exception):
+    """
+    Raised when the fast path can't classify a construct.
+    """
+
+
+token_spec = [
+    ('WS', r'[ \t]+'),
+    ('NUMBER',
+     r'(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?(?:f|F|u|U|ll|LL|l|L)*'),
+    ('NAME', r'[A-Za-z_]\w*'),
+    ('OP', r'\|\||&&|==|!=|>=|<=|::|[-+*/<>!(){},]'),
+]
+token_regex = re.compile('|'.join(
+    '(?P<{}>{})'.format(name, pattern) for name, pattern in token_spec))
+
+BOOLS = ('true', 'false')
+COMPARISONS = ('==', '!=', '>', '>=', '<', '<=')
+OPERAND_ENDS = ('NUMBER', 'NAME', ')', '}')
+BRACKETS = {'(': ')', '{': '}'}
+
+
+def tokenize(expr):
+    """
+    Split ``expr`` into a list of ``(kind, value)`` tokens.
+
+    Following the contextual lexer of Lark, a sign directly followed by a number
+    is part of that number when an operand is expected.
+    """
+    tokens = []
+    pos = 0
+    size = len(expr)
+
+    while pos < size:
+        match = token_regex.match(expr, pos)
+        if not match:
+            raise UnsupportedSyntax(expr[pos])
+
+        kind, value = match.lastgroup, match.group()
+        pos = match.end()
+
+        if kind == 'WS':
+            continue
+        if kind == 'OP':
+            kind = value
+        if kind == 'NAME' and value.startswith(BOOLS):
+            if value not in BOOLS:
+                raise UnsupportedSyntax(value)
+            kind = 'BOOL'
+
+        if kind == 'NUMBER' and tokens and tokens[-1][0] in ('+', '-') and \
+                tokens[-1][2] == match.start() and \
+                (len(tokens) == 1 or tokens[-2][0] not in OPERAND_ENDS):
+            tokens.pop()
+
+        tokens.append((kind, value, pos))
+
+    return [(kind, value) for kind, value, _ in tokens]
+
+
+class Node:
+    """
+    Minimal parse tree node. Only nodes that would also be present in the Lark
+    parse tree are created.
+    """
+    __slots__ = ('data', 'children', 'value')
+
+    def __init__(self, data, children=None, value=None):
+        self.data = data
+        self.children = children if children else []
+        self.value = value
+
+
+class ExprParser:
+    """
+    Recursive descent parser for the supported subset of
+    ``cpp_boolean_grammar``.
+    """
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self, offset=0):
+        try:
+            return self.tokens[self.pos+offset][0]
+        except IndexError:
+            return None
+
+    def next(self):
+        try:
+            tok = self.tokens[self.pos]
+        except IndexError:
+            raise UnsupportedSyntax('Unexpected end of expression')
+        self.pos += 1
+        return tok
+
+    def expect(self, kind):
+        tok = self.next()
+        if tok[0] != kind:
+            raise UnsupportedSyntax(tok[1])
+        return tok
+
+    def parse(self):
+        tree = self.boolor()
+        if self.pos != len(self.tokens):
+            raise UnsupportedSyntax(self.tokens[self.pos][1])
+        return tree
+
+    def binary(self, operand, operators):
+        lhs = operand()
+        while self.peek() in operators:
+            op = self.next()[0]
+            lhs = Node(op, [lhs, operand()])
+        return lhs
+
+    def boolor(self):
+        return self.binary(self.booland, ('||',))
+
+    def booland(self):
+        return self.binary(self.cond, ('&&',))
+
+    def cond(self):
+        return self.binary(self.expr, COMPARISONS)
+
+    def expr(self):
+        if self.peek() == '!':
+            self.next()
+            return Node('comp', [self.sum()])
+        return self.sum()
+
+    def sum(self):
+        return self.binary(self.product, ('+', '-'))
+
+    def product(self):
+        return self.binary(self.molecule, ('*', '/'))
+
+    def molecule(self):
+        if self.peek() == 'NAME' and self.peek(1) in ('::', '(', '{'):
+            self.next()
+            while self.peek() == '::':
+                self.next()
+                self.expect('NAME')
+            if self.peek() not in BRACKETS:
+                # Qualified names as variables are not supported
+                raise UnsupportedSyntax('::')
+            return self.func_call()
+        return self.atom()
+
+    def func_call(self):
+        closing = BRACKETS[self.next()[0]]
+        if self.peek() == closing:
+            self.next()
+            return Node('func_call')
+
+        args = [self.boolor()]
+        while self.peek() == ',':
+            self.next()
+            if self.peek() == closing:
+                break
+            args.append(self.boolor())
+        self.expect(closing)
+
+        return Node('func_call', [Node('arguments', args)])
+
+    def atom(self):
+        kind, value = self.next()
+        if kind == 'NUMBER':
+            return Node('num')
+        if kind == 'BOOL':
+            return Node('bool')
+        if kind == 'NAME':
+            return Node('var', value=value)
+        if kind == '-':
+            return Node('neg', [self.atom()])
+        if kind == '(':
+            tree = self.boolor()
+            self.expect(')')
+            return tree
+        raise UnsupportedSyntax(value)
+
+
+def find_data(tree, data):
+    """
+    Return all subtrees of ``tree`` with matching ``data``, in the same order
+    as ``lark.Tree.find_data``: deeper nodes first, then from left to right.
+    """
+    found = []
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        if node.data == data:
+            found.append((-depth, len(found), node))
+        stack += [(c, depth+1) for c in reversed(node.children)]
+
+    return [node for *_, node in sorted(found, key=lambda x: x[:2])]
+
+
+def fast_extract(expr):
+    """
+    Return a tuple of variables and function arguments in ``expr``, or ``None``
+    if the expression is not supported by the fast path.
+
+    :param str expr: Expression to be parsed
+    """
+    try:
+        tree = ExprParser(tokenize(expr)).parse()
+    except UnsupportedSyntax:
+        return None
+
+    variables = UniqueList([t.value for t in find_data(tree, 'var')])
+    args = UniqueList()
+    for subtree in find_data(tree, 'arguments'):
+        args += [t.value for t in find_data(subtree, 'var')]
+
+    return variables, args
@@ -2,13 +2,27 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Mon Jan 11, 2021 at 02:55 AM +0100
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 """
 This module provides simple parsed boolean tree info extraction
 """
 
 from pyBabyMaker.base import UniqueList
 from .syntax import cpp_boolean_parser as cpp
+from .syntax import cpp_boolean_grammar
+from .cache import ParseCache
+from .tokenizer import fast_extract
+
+cpp_expr_cache = ParseCache(cpp, cpp_boolean_grammar, fast_path=fast_extract)
+
+
+def parse_expr(expr):
+    """
+    Parse a C++ expression, with the result memoized in ``cpp_expr_cache``.
+
+    :param str expr: Expression to be parsed
+    """
+    return cpp_expr_cache.get(expr)
 
 
 def find_all_args(expr):
@@ -20,14 +34,7 @@ def find_all_args(expr):
     if not len(expr):
         return []
 
-    tree = cpp.parse(expr)
-    args = tree.find_data('arguments')
-    result = UniqueList()
-
-    for subtree in args:
-        result += [t.children[0].value for t in subtree.find_data('var')]
-
-    return result
+    return UniqueList(parse_expr(expr).args)
 
 
 def find_all_vars(expr):
@@ -39,6 +46,5 @@ def find_all_vars(expr):
     if not len(expr):
         return []
 
-    tree = cpp.parse(expr)
-    return UniqueList([t.children[0].value for t in tree.find_data('var')])
+    return UniqueList(parse_expr(expr).vars)
     # This is needed otherwise 'b*b' -> ['b', 'b']
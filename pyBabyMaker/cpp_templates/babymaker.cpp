@@ -4,10 +4,21 @@
 #include <TFile.h>
 #include <TTree.h>
 #include <TTreeReader.h>
+#include <TVirtualIndex.h>
+#include <TFriendElement.h>
+#include <TEntryList.h>
+#include <TDirectory.h>
 #include <TString.h>
 
 #include <vector>
+#include <string>
 #include <iostream>
+#include <fstream>
+#include <chrono>
+#include <utility>
+#include <algorithm>
+#include <cstdio>
+#include <cstdlib>
 
 #include <Math/Vector3D.h>
 #include <Math/Vector4D.h>
@@ -22,12 +33,54 @@
 using namespace std;
 using namespace ROOT::Math;
 
+// {% include: "include/input_branches.cpp" %}
+
+// {% include: "include/run_options.cpp" %}
+
+// {% include: "include/report.cpp" %}
+
+// {% include: "include/clone.cpp" %}
+
 // Generator for each output tree: one tree per file
 // {% for tree_out, config in directive.trees->items: %}
-void generator_/* {% guard: tree_out %} */(TTree *input_tree, TString output_prefix) {
+void generator_/* {% guard: tree_out %} */(TTree *input_tree, TString output_prefix, const RunOptions &opts) {
   cout << "Generating output ntuple: " << /* {% quote: tree_out %} */ << endl;
-  auto output_file = new TFile(output_prefix + /* {% quote: tree_out %} */ + ".root", "recreate");
+  auto output_file = new TFile(output_prefix + /* {% quote: tree_out %} */ + shard_suffix(opts) + ".root", "recreate");
+  auto range = entry_range(input_tree, opts);
+  // {% if config.profile_events != (none:) then %}
+  // Only profile the cuts on the first events
+  //   {% format: "range.second = min(range.second, range.first + {});", config.profile_events %}
+  // {% endif %}
+  cout << "Processing entries [" << range.first << ", " << range.second << ")" << endl;
+  // {% if config.compression != (none:) then %}
+  //   {% format: "output_file->SetCompressionSettings({});", config.compression %}
+  // {% endif %}
+  // {% if config.clone != (none:) then %}
+
+  // Only input branches are kept: copy them directly, unless only a part of the
+  // input tree is processed
+  if (range.first == 0 && range.second == input_tree->GetEntries() &&
+      clone_input_tree(input_tree, output_file, {
+    // {% for var in config.output %}
+    //   {% format: "\"{}\",", var.name %}
+    // {% endfor %}
+  }, /* {% quote: config.clone_sel %} */)) {
+    output_file->Write();
+    delete output_file;
+    return;
+  }
+  // {% endif %}
+
+  setup_input_branches(input_tree, {
+    // {% for var in config.input %}
+    //   {% format: "\"{}\",", var.name %}
+    // {% endfor %}
+  }, /* {% identity: config.cache_size %} */);
+  // TTreeReader processes up to the last entry when given an empty range, so
+  // the event loop is skipped instead, leaving the output tree empty
+  bool empty_range = range.first >= range.second;
   TTreeReader reader(input_tree);
+  if (!empty_range) reader.SetEntriesRange(range.first, range.second);
   TTree output("tree", "tree");
 
   // Load needed branches from ntuple
@@ -41,26 +94,87 @@ void generator_/* {% guard: tree_out %} */(TTree *input_tree, TString output_pre
   //   {% format: "output.Branch(\"{}\", &{});", var.name, var.fname %}
   // {% endfor %}
 
+  // Output tree storage settings
+  // {% if config.basket_size != (none:) then %}
+  //   {% format: "output.SetBasketSize(\"*\", {});", config.basket_size %}
+  // {% endif %}
+  // {% if config.auto_flush != (none:) then %}
+  //   {% format: "output.SetAutoFlush({});", config.auto_flush %}
+  // {% endif %}
+
   // Define temporary variables
   // {% for var in config.tmp %}
   //   {% declare: var.type, var.fname %}
   // {% endfor %}
 
-  while (reader.Next()) {
-    // Define variables required by selection
-    // {% for var in config.pre_sel_vars %}
+  // Compute variables that are the same for all events once
+  // {% for var in config.loop_invariant %}
+  //   {% assign: var.fname, var.rval %}
+  // {% endfor %}
+
+  // {% if config.instrument then %}
+  vector<string> cuts{
+    // {% for cut in config.sel %}
+    //   {% format: "R\"cut({})cut\",", cut %}
+    // {% endfor %}
+  };
+  // {% if config.profile then %}
+  CutFlow cutflow(cuts, true);
+  // {% else %}
+  CutFlow cutflow(cuts, false);
+  // {% endif %}
+  Long64_t num_read = 0;
+  Long64_t num_written = 0;
+  auto bytes_read_start = TFile::GetFileBytesRead();
+  auto time_start = chrono::steady_clock::now();
+
+  while (!empty_range && reader.Next()) {
+    num_read++;
+
+    // Evaluate cuts one by one to count events passing each of them, computing
+    // the variables needed by each cut right before it. Cuts are only evaluated
+    // on events passing the previous ones, also in profile mode, as they may
+    // rely on them as guards
+    cutflow.eval(0, [] { return true; });
+    // {% for idx, step in enum: config.sel_steps, 1 %}
+    //   {% for var in step.vars %}
+    //     {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    //   {% endfor %}
+    //   {% format: "if (!cutflow.eval({}, [&] {{ return ({}); }})) continue;", idx, (deref_var: step.cut, config.input_br) %}
+    // {% endfor %}
+
+    // Assign values for each output branch in this loop
+    // {% for var in config.post_sel_vars %}
     //   {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
     // {% endfor %}
 
-    if (/* {% join: (deref_var_list: config.sel, config.input_br), " && " %} */) {
-      // Assign values for each output branch in this loop
-      // {% for var in config.post_sel_vars %}
-      //   {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
-      // {% endfor %}
+    output.Fill();
+    num_written++;
+  }
+
+  chrono::duration<double> time_spent = chrono::steady_clock::now() - time_start;
+  write_report(output_prefix + /* {% quote: tree_out %} */ + shard_suffix(opts) + "_report.json",
+               /* {% quote: tree_out %} */, cutflow, num_read, num_written,
+               time_spent.count(), TFile::GetFileBytesRead() - bytes_read_start);
+  // {% else %}
+  while (!empty_range && reader.Next()) {
+    // Compute the variables needed by each cut right before it, and skip the
+    // event as soon as a cut fails
+    // {% for step in config.sel_steps %}
+    //   {% for var in step.vars %}
+    //     {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    //   {% endfor %}
+    //   {% format: "if (!({})) continue;", (deref_var: step.cut, config.input_br) %}
+    // {% endfor %}
+
+    // Assign values for each output branch in this loop
+    // {% for var in config.post_sel_vars %}
+    //   {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    // {% endfor %}
 
-      output.Fill();
-    }
+    output.Fill();
   }
+  // {% endif %}
 
   output_file->Write();
   delete output_file;
@@ -68,9 +182,10 @@ void generator_/* {% guard: tree_out %} */(TTree *input_tree, TString output_pre
 
 // {% endfor %}
 
-int main(int, char** argv) {
+int main(int argc, char** argv) {
   TString in_prefix  = TString(argv[1]) + "/";
   TString out_prefix = TString(argv[2]) + "/";
+  auto opts = parse_options(argc, argv);
 
   TFile *ntuple = new TFile(in_prefix + /* {% quote: directive.ntuple %} */);
   cout << "The ntuple being worked on is: " << /* {% quote: directive.ntuple %} */
@@ -103,7 +218,7 @@ int main(int, char** argv) {
   // {% endfor %}
 
   // {% for tree_out, prop in directive.trees->items: %}
-  //   {% format: "generator_{}(tree_{}, out_prefix);", (guard: tree_out), (guard: prop.input_tree) %}
+  //   {% format: "generator_{}(tree_{}, out_prefix, opts);", (guard: tree_out), (guard: prop.input_tree) %}
   // {% endfor %}
 
   // Cleanups
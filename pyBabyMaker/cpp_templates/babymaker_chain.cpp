@@ -0,0 +1,188 @@
+// {% gendate: %}
+// NOTE: Input trees are read from TChains built over all files of the main
+//       ntuple and of each friend ntuple.
+//
+//       Usage: <binary> <input_prefix> <output_prefix> [--file <idx>]
+//              <binary> --num-of-files
+//       With '--file', only the idx-th file of each ntuple is processed, and
+//       output files are suffixed accordingly.
+
+#include <TFile.h>
+#include <TTree.h>
+#include <TChain.h>
+#include <TTreeReader.h>
+#include <TVirtualIndex.h>
+#include <TFriendElement.h>
+#include <TString.h>
+
+#include <vector>
+#include <string>
+#include <iostream>
+#include <cstdlib>
+
+#include <Math/Vector3D.h>
+#include <Math/Vector4D.h>
+#include <TMath.h>
+
+// System headers
+// {% join: (format_list: "#include <{}>", directive.system_headers), "\n" %}
+
+// User headers
+// {% join: (format_list: "#include \"{}\"", directive.user_headers), "\n" %}
+
+using namespace std;
+using namespace ROOT::Math;
+
+// Files of the main ntuple
+vector<TString> ntuple_files{
+  // {% for ntp in directive.ntuple_files %}
+  //   {% format: "\"{}\",", ntp %}
+  // {% endfor %}
+};
+
+// Files of each friend ntuple
+vector<vector<TString>> friend_files{
+  // {% for files in directive.friend_files %}
+  {
+    // {% for ntp in files %}
+    //   {% format: "\"{}\",", ntp %}
+    // {% endfor %}
+  },
+  // {% endfor %}
+};
+
+// Add all files, or only the idx-th file if idx >= 0, to the chain. A single
+// file is shared by all indices.
+void add_files(TChain *chain, const vector<TString> &files, TString prefix, int idx) {
+  if (idx < 0) {
+    for (auto &f : files) chain->Add(prefix + f);
+  } else {
+    chain->Add(prefix + files[files.size() == 1 ? 0 : idx]);
+  }
+}
+
+// {% include: "include/input_branches.cpp" %}
+
+// Generator for each output tree: one tree per file
+// {% for tree_out, config in directive.trees->items: %}
+void generator_/* {% guard: tree_out %} */(TTree *input_tree, TString output_prefix, TString output_suffix) {
+  cout << "Generating output ntuple: " << /* {% quote: tree_out %} */ << endl;
+  auto output_file = new TFile(output_prefix + /* {% quote: tree_out %} */ + output_suffix + ".root", "recreate");
+  // {% if config.compression != (none:) then %}
+  //   {% format: "output_file->SetCompressionSettings({});", config.compression %}
+  // {% endif %}
+
+  setup_input_branches(input_tree, {
+    // {% for var in config.input %}
+    //   {% format: "\"{}\",", var.name %}
+    // {% endfor %}
+  }, /* {% identity: config.cache_size %} */);
+  TTreeReader reader(input_tree);
+  TTree output("tree", "tree");
+
+  // Load needed branches from ntuple
+  // {% for var in config.input %}
+  //   {% format: "TTreeReaderValue<{}> {}(reader, \"{}\");", var.type, var.fname, var.name %}
+  // {% endfor %}
+
+  // Define output branches
+  // {% for var in config.output %}
+  //   {% declare: var.type, var.fname %}
+  //   {% format: "output.Branch(\"{}\", &{});", var.name, var.fname %}
+  // {% endfor %}
+
+  // Output tree storage settings
+  // {% if config.basket_size != (none:) then %}
+  //   {% format: "output.SetBasketSize(\"*\", {});", config.basket_size %}
+  // {% endif %}
+  // {% if config.auto_flush != (none:) then %}
+  //   {% format: "output.SetAutoFlush({});", config.auto_flush %}
+  // {% endif %}
+
+  // Define temporary variables
+  // {% for var in config.tmp %}
+  //   {% declare: var.type, var.fname %}
+  // {% endfor %}
+
+  // Compute variables that are the same for all events once
+  // {% for var in config.loop_invariant %}
+  //   {% assign: var.fname, var.rval %}
+  // {% endfor %}
+
+  while (reader.Next()) {
+    // Compute the variables needed by each cut right before it, and skip the
+    // event as soon as a cut fails
+    // {% for step in config.sel_steps %}
+    //   {% for var in step.vars %}
+    //     {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    //   {% endfor %}
+    //   {% format: "if (!({})) continue;", (deref_var: step.cut, config.input_br) %}
+    // {% endfor %}
+
+    // Assign values for each output branch in this loop
+    // {% for var in config.post_sel_vars %}
+    //   {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    // {% endfor %}
+
+    output.Fill();
+  }
+
+  output_file->Write();
+  delete output_file;
+}
+
+// {% endfor %}
+
+int main(int argc, char** argv) {
+  if (argc == 2 && TString(argv[1]) == "--num-of-files") {
+    cout << ntuple_files.size() << endl;
+    return 0;
+  }
+
+  TString in_prefix  = TString(argv[1]) + "/";
+  TString out_prefix = TString(argv[2]) + "/";
+
+  int file_idx = -1;
+  if (argc == 5 && TString(argv[3]) == "--file") file_idx = atoi(argv[4]);
+  if ((argc != 3 && file_idx < 0) || file_idx >= int(ntuple_files.size())) {
+    cerr << "Invalid arguments." << endl;
+    return 1;
+  }
+  TString out_suffix = file_idx < 0 ? TString("") :
+    TString::Format(/* {% quote: (format: directive.file_suffix, "%d") %} */, file_idx);
+
+  // Define input trees and container to store associated friend trees
+  // {% for tree in directive.input_trees %}
+  //   {% format: "auto tree_{} = new TChain(\"{}\");", (guard: tree), tree %}
+  //   {% format: "add_files(tree_{}, ntuple_files, in_prefix, file_idx);", (guard: tree) %}
+  //   {% format: "vector<TChain*> friends_{};", (guard: tree) %}
+  // {% endfor %}
+
+  // Handle friend trees
+  TChain* tmp_tree;
+  // {% for tree in directive.input_trees %}
+  //   {% for idx, state in enum: directive.tree_relations[tree] %}
+  //     {% if state then %}
+  //       {% format: "tmp_tree = new TChain(\"{}\");", tree %}
+  //       {% format: "add_files(tmp_tree, friend_files[{}], in_prefix, file_idx);", idx %}
+           tmp_tree->BuildIndex("runNumber", "eventNumber");
+  //       {% format: "tree_{}->AddFriend(tmp_tree, \"{}\", true);", (guard: tree), idx %}
+           friends_/* {% guard: tree %} */.push_back(tmp_tree);
+           cout << "Handling input tree: " << /* {% quote: tree %} */ << endl;
+  //     {% endif %}
+  //   {% endfor %}
+  // {% endfor %}
+
+  // {% for tree_out, prop in directive.trees->items: %}
+  //   {% format: "generator_{}(tree_{}, out_prefix, out_suffix);", (guard: tree_out), (guard: prop.input_tree) %}
+  // {% endfor %}
+
+  // Cleanups
+  cout <<"Cleanups" << endl;
+  // {% for tree in directive.input_trees %}
+    delete tree_/* {% guard: tree %} */;
+    for (auto tree : friends_/* {% guard: tree %} */) delete tree;
+  // {% endfor %}
+
+  return 0;
+}
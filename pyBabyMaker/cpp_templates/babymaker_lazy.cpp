@@ -0,0 +1,224 @@
+// {% gendate: %}
+// NOTE: Branches only needed for output are read for events passing the
+//       selection only.
+
+#include <TFile.h>
+#include <TTree.h>
+#include <TTreeReader.h>
+#include <TVirtualIndex.h>
+#include <TFriendElement.h>
+#include <TEntryList.h>
+#include <TDirectory.h>
+#include <TBranch.h>
+#include <TString.h>
+
+#include <vector>
+#include <string>
+#include <memory>
+#include <iostream>
+#include <utility>
+#include <type_traits>
+#include <algorithm>
+#include <cstdio>
+#include <cstdlib>
+
+#include <Math/Vector3D.h>
+#include <Math/Vector4D.h>
+#include <TMath.h>
+
+// System headers
+// {% join: (format_list: "#include <{}>", directive.system_headers), "\n" %}
+
+// User headers
+// {% join: (format_list: "#include \"{}\"", directive.user_headers), "\n" %}
+
+using namespace std;
+using namespace ROOT::Math;
+
+// {% include: "include/input_branches.cpp" %}
+
+// A branch value that is only read from the current entry when dereferenced.
+// Only branches of fundamental types directly in the input tree are read
+// through their address. Other branches (e.g. objects, vectors, or branches
+// from friend trees) fall back to a TTreeReaderValue.
+template <typename T>
+class LazyBranchValue {
+ public:
+  LazyBranchValue(TTreeReader &reader, const char *name) : reader(reader) {
+    if (is_fundamental<T>::value)
+      branch = static_cast<TBranch*>(
+          reader.GetTree()->GetListOfBranches()->FindObject(name));
+    if (branch)
+      branch->SetAddress(&value);
+    else
+      fallback = make_unique<TTreeReaderValue<T>>(reader, name);
+  }
+
+  T& operator*() {
+    if (fallback) return **fallback;
+
+    auto entry = reader.GetCurrentEntry();
+    if (entry != loaded_entry) {
+      branch->GetEntry(entry);
+      loaded_entry = entry;
+    }
+    return value;
+  }
+
+ private:
+  TTreeReader &reader;
+  TBranch *branch = nullptr;
+  unique_ptr<TTreeReaderValue<T>> fallback;
+  Long64_t loaded_entry = -1;
+  T value;
+};
+
+// {% include: "include/run_options.cpp" %}
+
+// {% include: "include/clone.cpp" %}
+
+// Generator for each output tree: one tree per file
+// {% for tree_out, config in directive.trees->items: %}
+void generator_/* {% guard: tree_out %} */(TTree *input_tree, TString output_prefix, const RunOptions &opts) {
+  cout << "Generating output ntuple: " << /* {% quote: tree_out %} */ << endl;
+  auto output_file = new TFile(output_prefix + /* {% quote: tree_out %} */ + shard_suffix(opts) + ".root", "recreate");
+  auto range = entry_range(input_tree, opts);
+  cout << "Processing entries [" << range.first << ", " << range.second << ")" << endl;
+  // {% if config.compression != (none:) then %}
+  //   {% format: "output_file->SetCompressionSettings({});", config.compression %}
+  // {% endif %}
+  // {% if config.clone != (none:) then %}
+
+  // Only input branches are kept: copy them directly, unless only a part of the
+  // input tree is processed
+  if (range.first == 0 && range.second == input_tree->GetEntries() &&
+      clone_input_tree(input_tree, output_file, {
+    // {% for var in config.output %}
+    //   {% format: "\"{}\",", var.name %}
+    // {% endfor %}
+  }, /* {% quote: config.clone_sel %} */)) {
+    output_file->Write();
+    delete output_file;
+    return;
+  }
+  // {% endif %}
+
+  setup_input_branches(input_tree, {
+    // {% for var in config.input %}
+    //   {% format: "\"{}\",", var.name %}
+    // {% endfor %}
+  }, /* {% identity: config.cache_size %} */);
+  // TTreeReader processes up to the last entry when given an empty range, so
+  // the event loop is skipped instead, leaving the output tree empty
+  bool empty_range = range.first >= range.second;
+  TTreeReader reader(input_tree);
+  if (!empty_range) reader.SetEntriesRange(range.first, range.second);
+  TTree output("tree", "tree");
+
+  // Load branches needed by the selection from ntuple
+  // {% for var in config.pre_sel_input %}
+  //   {% format: "TTreeReaderValue<{}> {}(reader, \"{}\");", var.type, var.fname, var.name %}
+  // {% endfor %}
+
+  // Branches only needed for events passing the selection
+  // {% for var in config.post_sel_input %}
+  //   {% format: "LazyBranchValue<{}> {}(reader, \"{}\");", var.type, var.fname, var.name %}
+  // {% endfor %}
+
+  // Define output branches
+  // {% for var in config.output %}
+  //   {% declare: var.type, var.fname %}
+  //   {% format: "output.Branch(\"{}\", &{});", var.name, var.fname %}
+  // {% endfor %}
+
+  // Output tree storage settings
+  // {% if config.basket_size != (none:) then %}
+  //   {% format: "output.SetBasketSize(\"*\", {});", config.basket_size %}
+  // {% endif %}
+  // {% if config.auto_flush != (none:) then %}
+  //   {% format: "output.SetAutoFlush({});", config.auto_flush %}
+  // {% endif %}
+
+  // Define temporary variables
+  // {% for var in config.tmp %}
+  //   {% declare: var.type, var.fname %}
+  // {% endfor %}
+
+  // Compute variables that are the same for all events once
+  // {% for var in config.loop_invariant %}
+  //   {% assign: var.fname, var.rval %}
+  // {% endfor %}
+
+  while (!empty_range && reader.Next()) {
+    // Compute the variables needed by each cut right before it, and skip the
+    // event as soon as a cut fails
+    // {% for step in config.sel_steps %}
+    //   {% for var in step.vars %}
+    //     {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    //   {% endfor %}
+    //   {% format: "if (!({})) continue;", (deref_var: step.cut, config.input_br) %}
+    // {% endfor %}
+
+    // Assign values for each output branch in this loop
+    // {% for var in config.post_sel_vars %}
+    //   {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    // {% endfor %}
+
+    output.Fill();
+  }
+
+  output_file->Write();
+  delete output_file;
+}
+
+// {% endfor %}
+
+int main(int argc, char** argv) {
+  TString in_prefix  = TString(argv[1]) + "/";
+  TString out_prefix = TString(argv[2]) + "/";
+  auto opts = parse_options(argc, argv);
+
+  TFile *ntuple = new TFile(in_prefix + /* {% quote: directive.ntuple %} */);
+  cout << "The ntuple being worked on is: " << /* {% quote: directive.ntuple %} */
+    << endl;
+
+  vector<TFile*> friend_ntuples;
+  // {% for friend in directive.friends %}
+    friend_ntuples.push_back(new TFile(in_prefix + /* {% quote: friend %} */));
+    cout << "Additional friend ntuple: " << /* {% quote: friend %} */ << endl;
+  // {% endfor %}
+
+  // Define input trees and container to store associated friend trees
+  // {% for tree in directive.input_trees %}
+  //   {% format: "auto tree_{} = static_cast<TTree*>(ntuple->Get(\"{}\"));", (guard: tree), tree %}
+  //   {% format: "vector<TTree*> friends_{};", (guard: tree) %}
+  // {% endfor %}
+
+  // Handle friend trees
+  TTree* tmp_tree;
+  // {% for tree in directive.input_trees %}
+  //   {% for idx, state in enum: directive.tree_relations[tree] %}
+  //     {% if state then %}
+  //       {% format: "tmp_tree = static_cast<TTree*>(friend_ntuples[{}]->Get(\"{}\"));", idx, tree %}
+           tmp_tree->BuildIndex("runNumber", "eventNumber");
+  //       {% format: "tree_{}->AddFriend(tmp_tree, \"{}\", true);", (guard: tree), idx %}
+           friends_/* {% guard: tree %} */.push_back(tmp_tree);
+           cout << "Handling input tree: " << /* {% quote: tree %} */ << endl;
+  //     {% endif %}
+  //   {% endfor %}
+  // {% endfor %}
+
+  // {% for tree_out, prop in directive.trees->items: %}
+  //   {% format: "generator_{}(tree_{}, out_prefix, opts);", (guard: tree_out), (guard: prop.input_tree) %}
+  // {% endfor %}
+
+  // Cleanups
+  cout <<"Cleanups" << endl;
+  delete ntuple;
+  // {% for tree in directive.input_trees %}
+    for (auto tree : friends_/* {% guard: tree %} */) delete tree;
+  // {% endfor %}
+  for (auto ntp : friend_ntuples) delete ntp;
+
+  return 0;
+}
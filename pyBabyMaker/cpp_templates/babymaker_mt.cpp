@@ -0,0 +1,202 @@
+// {% gendate: %}
+// NOTE: The input tree is processed in parallel with TTreeProcessorMT. Each
+//       thread fills its own output tree, and these are merged into a single
+//       file by TBufferMerger.
+//
+//       TTreeProcessorMT doesn't support friend trees with an index, so friend
+//       trees are matched entry by entry: they must have the same entries, in
+//       the same order, as the main tree.
+//
+//       Usage: <binary> <input_prefix> <output_prefix> [<num_of_threads>]
+//       By default, all available cores are used.
+
+#include <TROOT.h>
+#include <TFile.h>
+#include <TTree.h>
+#include <TTreeReader.h>
+#include <TString.h>
+#include <ROOT/TBufferMerger.hxx>
+#include <ROOT/TTreeProcessorMT.hxx>
+
+#include <vector>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <thread>
+#include <iostream>
+#include <cstdlib>
+
+#include <Math/Vector3D.h>
+#include <Math/Vector4D.h>
+#include <TMath.h>
+
+// System headers
+// {% join: (format_list: "#include <{}>", directive.system_headers), "\n" %}
+
+// User headers
+// {% join: (format_list: "#include \"{}\"", directive.user_headers), "\n" %}
+
+using namespace std;
+using namespace ROOT::Math;
+
+// Per-thread state of each output tree: a file of the merger, and the output
+// tree filled by all tasks run by that thread
+// {% for tree_out, config in directive.trees->items: %}
+struct OutputSlot_/* {% guard: tree_out %} */ {
+  shared_ptr<ROOT::TBufferMergerFile> output_file;
+  TTree *output;
+
+  // Output branches
+  // {% for var in config.output %}
+  //   {% declare: var.type, var.fname %}
+  // {% endfor %}
+
+  OutputSlot_/* {% guard: tree_out %} */(ROOT::TBufferMerger &merger) : output_file(merger.GetFile()) {
+    output_file->cd();
+    output = new TTree("tree", "tree");
+    output->ResetBit(kMustCleanup);
+
+    // Define output branches
+    // {% for var in config.output %}
+    //   {% format: "output->Branch(\"{}\", &{});", var.name, var.fname %}
+    // {% endfor %}
+
+    // Output tree storage settings
+    // {% if config.basket_size != (none:) then %}
+    //   {% format: "output->SetBasketSize(\"*\", {});", config.basket_size %}
+    // {% endif %}
+    // {% if config.auto_flush != (none:) then %}
+    //   {% format: "output->SetAutoFlush({});", config.auto_flush %}
+    // {% endif %}
+  }
+};
+
+// {% endfor %}
+
+// Generator for each output tree: one tree per file
+// {% for tree_out, config in directive.trees->items: %}
+void generator_/* {% guard: tree_out %} */(TTree *input_tree, TString output_prefix, UInt_t num_of_threads) {
+  cout << "Generating output ntuple: " << /* {% quote: tree_out %} */ << endl;
+  // {% if config.compression != (none:) then %}
+  //   {% format: "ROOT::TBufferMerger merger(output_prefix + \"{}.root\", \"recreate\", {});", tree_out, config.compression %}
+  // {% else %}
+  ROOT::TBufferMerger merger(output_prefix + /* {% quote: tree_out %} */ + ".root", "recreate");
+  // {% endif %}
+  ROOT::TTreeProcessorMT processor(*input_tree, num_of_threads);
+
+  // The output file and tree of each thread are created once, and reused by
+  // all the tasks it runs
+  mutex slots_mutex;
+  map<thread::id, unique_ptr<OutputSlot_/* {% guard: tree_out %} */>> slots;
+
+  processor.Process([&](TTreeReader &reader) {
+    OutputSlot_/* {% guard: tree_out %} */ *slot;
+    {
+      lock_guard<mutex> lock(slots_mutex);
+      auto &owned = slots[this_thread::get_id()];
+      if (!owned) owned.reset(new OutputSlot_/* {% guard: tree_out %} */(merger));
+      slot = owned.get();
+    }
+    auto output = slot->output;
+
+    // Load needed branches from ntuple
+    // {% for var in config.input %}
+    //   {% format: "TTreeReaderValue<{}> {}(reader, \"{}\");", var.type, var.fname, var.name %}
+    // {% endfor %}
+
+    // Output branches of this thread
+    // {% for var in config.output %}
+    //   {% format: "auto &{0} = slot->{0};", var.fname %}
+    // {% endfor %}
+
+    // Define temporary variables
+    // {% for var in config.tmp %}
+    //   {% declare: var.type, var.fname %}
+    // {% endfor %}
+
+    // Compute variables that are the same for all events once
+    // {% for var in config.loop_invariant %}
+    //   {% assign: var.fname, var.rval %}
+    // {% endfor %}
+
+    while (reader.Next()) {
+      // Compute the variables needed by each cut right before it, and skip the
+      // event as soon as a cut fails
+      // {% for step in config.sel_steps %}
+      //   {% for var in step.vars %}
+      //     {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+      //   {% endfor %}
+      //   {% format: "if (!({})) continue;", (deref_var: step.cut, config.input_br) %}
+      // {% endfor %}
+
+      // Assign values for each output branch in this loop
+      // {% for var in config.post_sel_vars %}
+      //   {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+      // {% endfor %}
+
+      output->Fill();
+    }
+
+    // Hand the entries filled by this task over to the merger
+    slot->output_file->Write();
+  });
+}
+
+// {% endfor %}
+
+int main(int argc, char** argv) {
+  TString in_prefix  = TString(argv[1]) + "/";
+  TString out_prefix = TString(argv[2]) + "/";
+  UInt_t num_of_threads = argc > 3 ? atoi(argv[3]) : 0;
+
+  ROOT::EnableImplicitMT(num_of_threads);
+  cout << "Number of threads: " << ROOT::GetThreadPoolSize() << endl;
+
+  TFile *ntuple = new TFile(in_prefix + /* {% quote: directive.ntuple %} */);
+  cout << "The ntuple being worked on is: " << /* {% quote: directive.ntuple %} */
+    << endl;
+
+  vector<TFile*> friend_ntuples;
+  // {% for friend in directive.friends %}
+    friend_ntuples.push_back(new TFile(in_prefix + /* {% quote: friend %} */));
+    cout << "Additional friend ntuple: " << /* {% quote: friend %} */ << endl;
+  // {% endfor %}
+
+  // Define input trees and container to store associated friend trees
+  // {% for tree in directive.input_trees %}
+  //   {% format: "auto tree_{} = static_cast<TTree*>(ntuple->Get(\"{}\"));", (guard: tree), tree %}
+  //   {% format: "vector<TTree*> friends_{};", (guard: tree) %}
+  // {% endfor %}
+
+  // Handle friend trees
+  TTree* tmp_tree;
+  // {% for tree in directive.input_trees %}
+  //   {% for idx, state in enum: directive.tree_relations[tree] %}
+  //     {% if state then %}
+  //       {% format: "tmp_tree = static_cast<TTree*>(friend_ntuples[{}]->Get(\"{}\"));", idx, tree %}
+  //       {% format: "if (tmp_tree->GetTreeIndex() || tmp_tree->GetEntries() != tree_{}->GetEntries()) {{", (guard: tree) %}
+             cerr << "Friend tree " << /* {% quote: tree %} */ << " must have the same entries as the main tree, "
+                  << "as friend trees with an index are not supported by TTreeProcessorMT" << endl;
+             return 1;
+           }
+  //       {% format: "tree_{}->AddFriend(tmp_tree, \"{}\", true);", (guard: tree), idx %}
+           friends_/* {% guard: tree %} */.push_back(tmp_tree);
+           cout << "Handling input tree: " << /* {% quote: tree %} */ << endl;
+  //     {% endif %}
+  //   {% endfor %}
+  // {% endfor %}
+
+  // {% for tree_out, prop in directive.trees->items: %}
+  //   {% format: "generator_{}(tree_{}, out_prefix, num_of_threads);", (guard: tree_out), (guard: prop.input_tree) %}
+  // {% endfor %}
+
+  // Cleanups
+  cout <<"Cleanups" << endl;
+  delete ntuple;
+  // {% for tree in directive.input_trees %}
+    for (auto tree : friends_/* {% guard: tree %} */) delete tree;
+  // {% endfor %}
+  for (auto ntp : friend_ntuples) delete ntp;
+
+  return 0;
+}
@@ -0,0 +1,187 @@
+// {% gendate: %}
+// NOTE: Each output tree is expressed as an RDataFrame graph: calculations are
+//       Define'd, cuts are Filter'ed and output branches are Snapshot'ed.
+//       The graphs of all output trees sharing an input tree branch off a
+//       single RDataFrame, and all snapshots are booked lazily and run
+//       together with RunGraphs, so each input tree is read in one loop.
+//
+//       Requires ROOT >= 6.26 for RDataFrame::Redefine.
+//
+//       Usage: <binary> <input_prefix> <output_prefix> [<num_of_threads>]
+//       Implicit MT is only enabled if the number of threads is given (0 means
+//       all available cores). Note that with implicit MT, the order of the
+//       entries in the output trees is not preserved.
+
+#include <TFile.h>
+#include <TTree.h>
+#include <TString.h>
+#include <TInterpreter.h>
+#include <RVersion.h>
+#include <ROOT/RDataFrame.hxx>
+
+#include <vector>
+#include <string>
+#include <iostream>
+#include <cstdlib>
+
+#include <Math/Vector3D.h>
+#include <Math/Vector4D.h>
+#include <TMath.h>
+
+// System headers
+// {% join: (format_list: "#include <{}>", directive.system_headers), "\n" %}
+
+// User headers
+// {% join: (format_list: "#include \"{}\"", directive.user_headers), "\n" %}
+
+#if ROOT_VERSION_CODE < ROOT_VERSION(6, 26, 0)
+#error "The RDataFrame template requires ROOT >= 6.26 (RDataFrame::Redefine)"
+#endif
+
+using namespace std;
+using namespace ROOT::Math;
+
+// Make headers visible to the expressions compiled by RDataFrame
+void declare_headers() {
+  gInterpreter->Declare("#include <Math/Vector3D.h>");
+  gInterpreter->Declare("#include <Math/Vector4D.h>");
+  gInterpreter->Declare("#include <TMath.h>");
+  // {% for header in directive.system_headers %}
+  //   {% format: "gInterpreter->Declare(\"#include <{}>\");", header %}
+  // {% endfor %}
+  // {% for header in directive.user_headers %}
+  //   {% format: "gInterpreter->Declare(\"#include \\\"{}\\\"\");", header %}
+  // {% endfor %}
+  gInterpreter->Declare("using namespace std;");
+  gInterpreter->Declare("using namespace ROOT::Math;");
+}
+
+// Define a column, overriding the existing one with the same name if needed
+ROOT::RDF::RNode define(ROOT::RDF::RNode df, string name, string expr) {
+  if (df.HasColumn(name)) return df.Redefine(name, expr);
+  return df.Define(name, expr);
+}
+
+// Load needed branches of each input tree, for all output trees sharing it
+// {% for tree_in, group in directive.input_groups->items: %}
+ROOT::RDF::RNode load_/* {% guard: tree_in %} */(ROOT::RDF::RNode df) {
+  // {% for var in group.input %}
+  //   {% format: "df = df.Alias(\"{}\", \"{}\");", var.fname, var.name %}
+  // {% endfor %}
+  return df;
+}
+
+// {% endfor %}
+// Generator for each output tree: one tree per file
+// {% for tree_out, config in directive.trees->items: %}
+ROOT::RDF::RResultHandle generator_/* {% guard: tree_out %} */(ROOT::RDF::RNode df, TString output_prefix) {
+  cout << "Generating output ntuple: " << /* {% quote: tree_out %} */ << endl;
+
+  // Define variables that only depend on literals; like any other column,
+  // RDataFrame still evaluates them for each event
+  // {% for var in config.loop_invariant %}
+  //   {% format: "df = define(df, \"{}\", R\"expr(static_cast<{}>({}))expr\");", var.fname, var.type, var.rval %}
+  // {% endfor %}
+
+  // Define variables required by selection
+  // {% for var in config.pre_sel_vars %}
+  //   {% format: "df = define(df, \"{}\", R\"expr(static_cast<{}>({}))expr\");", var.fname, var.type, var.rval %}
+  // {% endfor %}
+
+  // {% for cut in config.sel %}
+  //   {% format: "df = df.Filter(R\"cut({})cut\");", cut %}
+  // {% endfor %}
+
+  // Define variables for each output branch
+  // {% for var in config.post_sel_vars %}
+  //   {% format: "df = define(df, \"{}\", R\"expr(static_cast<{}>({}))expr\");", var.fname, var.type, var.rval %}
+  // {% endfor %}
+
+  // Define output branches
+  vector<string> output_brs;
+  // {% for var in config.output %}
+  //   {% format: "df = define(df, \"{}\", \"{}\");", var.name, var.fname %}
+  //   {% format: "output_brs.push_back(\"{}\");", var.name %}
+  // {% endfor %}
+
+  ROOT::RDF::RSnapshotOptions opts;
+  opts.fLazy = true;
+  // {% if config.compression != (none:) then %}
+  //   {% format: "opts.fCompressionAlgorithm = static_cast<ROOT::RCompressionSetting::EAlgorithm::EValues>({} / 100);", config.compression %}
+  //   {% format: "opts.fCompressionLevel = {} % 100;", config.compression %}
+  // {% endif %}
+  // {% if config.basket_size != (none:) then %}
+  //   {% format: "opts.fBasketSize = {};", config.basket_size %}
+  // {% endif %}
+  // {% if config.auto_flush != (none:) then %}
+  //   {% format: "opts.fAutoFlush = {};", config.auto_flush %}
+  // {% endif %}
+  return df.Snapshot("tree", string(output_prefix + /* {% quote: tree_out %} */ + ".root"), output_brs, opts);
+}
+
+// {% endfor %}
+
+int main(int argc, char** argv) {
+  TString in_prefix  = TString(argv[1]) + "/";
+  TString out_prefix = TString(argv[2]) + "/";
+
+  if (argc > 3) {
+    ROOT::EnableImplicitMT(atoi(argv[3]));
+    cout << "Number of threads: " << ROOT::GetThreadPoolSize() << endl;
+  }
+  declare_headers();
+
+  TFile *ntuple = new TFile(in_prefix + /* {% quote: directive.ntuple %} */);
+  cout << "The ntuple being worked on is: " << /* {% quote: directive.ntuple %} */
+    << endl;
+
+  vector<TFile*> friend_ntuples;
+  // {% for friend in directive.friends %}
+    friend_ntuples.push_back(new TFile(in_prefix + /* {% quote: friend %} */));
+    cout << "Additional friend ntuple: " << /* {% quote: friend %} */ << endl;
+  // {% endfor %}
+
+  // Define input trees and container to store associated friend trees
+  // {% for tree in directive.input_trees %}
+  //   {% format: "auto tree_{} = static_cast<TTree*>(ntuple->Get(\"{}\"));", (guard: tree), tree %}
+  //   {% format: "vector<TTree*> friends_{};", (guard: tree) %}
+  // {% endfor %}
+
+  // Handle friend trees
+  TTree* tmp_tree;
+  // {% for tree in directive.input_trees %}
+  //   {% for idx, state in enum: directive.tree_relations[tree] %}
+  //     {% if state then %}
+  //       {% format: "tmp_tree = static_cast<TTree*>(friend_ntuples[{}]->Get(\"{}\"));", idx, tree %}
+           tmp_tree->BuildIndex("runNumber", "eventNumber");
+  //       {% format: "tree_{}->AddFriend(tmp_tree, \"{}\", true);", (guard: tree), idx %}
+           friends_/* {% guard: tree %} */.push_back(tmp_tree);
+           cout << "Handling input tree: " << /* {% quote: tree %} */ << endl;
+  //     {% endif %}
+  //   {% endfor %}
+  // {% endfor %}
+
+  {
+    // Build one RDataFrame per input tree and branch the graphs of all its
+    // output trees off it, then fill them in a single loop per input tree
+    vector<ROOT::RDF::RResultHandle> snapshots;
+    // {% for tree_in, group in directive.input_groups->items: %}
+    //   {% format: "ROOT::RDataFrame df_{0}(*tree_{0});", (guard: tree_in) %}
+    //   {% format: "auto input_{0} = load_{0}(df_{0});", (guard: tree_in) %}
+    //   {% for tree_out in group.outputs %}
+    //     {% format: "snapshots.push_back(generator_{}(input_{}, out_prefix));", (guard: tree_out), (guard: tree_in) %}
+    //   {% endfor %}
+    // {% endfor %}
+    ROOT::RDF::RunGraphs(snapshots);
+  }
+
+  // Cleanups
+  cout <<"Cleanups" << endl;
+  delete ntuple;
+  // {% for tree in directive.input_trees %}
+    for (auto tree : friends_/* {% guard: tree %} */) delete tree;
+  // {% endfor %}
+  for (auto ntp : friend_ntuples) delete ntp;
+
+  return 0;
+}
@@ -0,0 +1,183 @@
+// {% gendate: %}
+// NOTE: Output trees sharing the same input tree are generated in a single
+//       pass over that input tree.
+
+#include <TFile.h>
+#include <TTree.h>
+#include <TTreeReader.h>
+#include <TString.h>
+
+#include <vector>
+#include <iostream>
+
+#include <Math/Vector3D.h>
+#include <Math/Vector4D.h>
+#include <TMath.h>
+
+// System headers
+// {% join: (format_list: "#include <{}>", directive.system_headers), "\n" %}
+
+// User headers
+// {% join: (format_list: "#include \"{}\"", directive.user_headers), "\n" %}
+
+using namespace std;
+using namespace ROOT::Math;
+
+// Branches loaded from each input tree, shared by all its output trees
+// {% for tree_in, group in directive.input_groups->items: %}
+struct InputTree_/* {% guard: tree_in %} */ {
+  TTreeReader &reader;
+
+  // {% for var in group.input %}
+  //   {% format: "TTreeReaderValue<{}> {}{{reader, \"{}\"}};", var.type, var.fname, var.name %}
+  // {% endfor %}
+
+  InputTree_/* {% guard: tree_in %} */(TTreeReader &reader) : reader(reader) {}
+};
+
+// {% endfor %}
+
+// Output tree states: one tree per file
+// {% for tree_out, config in directive.trees->items: %}
+struct OutputTree_/* {% guard: tree_out %} */ {
+  TFile *output_file;
+  TTree *output;
+
+  // Define output branches
+  // {% for var in config.output %}
+  //   {% declare: var.type, var.fname %}
+  // {% endfor %}
+
+  // Define temporary variables
+  // {% for var in config.tmp %}
+  //   {% declare: var.type, var.fname %}
+  // {% endfor %}
+
+  OutputTree_/* {% guard: tree_out %} */(TString output_prefix) {
+    cout << "Generating output ntuple: " << /* {% quote: tree_out %} */ << endl;
+    output_file = new TFile(output_prefix + /* {% quote: tree_out %} */ + ".root", "recreate");
+    // {% if config.compression != (none:) then %}
+    //   {% format: "output_file->SetCompressionSettings({});", config.compression %}
+    // {% endif %}
+    output = new TTree("tree", "tree");
+
+    // {% for var in config.output %}
+    //   {% format: "output->Branch(\"{}\", &{});", var.name, var.fname %}
+    // {% endfor %}
+
+    // Output tree storage settings
+    // {% if config.basket_size != (none:) then %}
+    //   {% format: "output->SetBasketSize(\"*\", {});", config.basket_size %}
+    // {% endif %}
+    // {% if config.auto_flush != (none:) then %}
+    //   {% format: "output->SetAutoFlush({});", config.auto_flush %}
+    // {% endif %}
+
+    // Compute variables that are the same for all events once
+    // {% for var in config.loop_invariant %}
+    //   {% assign: var.fname, var.rval %}
+    // {% endfor %}
+  }
+
+  void process(InputTree_/* {% guard: config.input_tree %} */ &in) {
+    // Load needed branches from the shared input
+    // {% for var in config.input %}
+    //   {% format: "auto &{0} = in.{0};", var.fname %}
+    // {% endfor %}
+
+    // Compute the variables needed by each cut right before it, and skip the
+    // event as soon as a cut fails
+    // {% for step in config.sel_steps %}
+    //   {% for var in step.vars %}
+    //     {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    //   {% endfor %}
+    //   {% format: "if (!({})) return;", (deref_var: step.cut, config.input_br) %}
+    // {% endfor %}
+
+    // Assign values for each output branch in this loop
+    // {% for var in config.post_sel_vars %}
+    //   {% assign: var.fname, (deref_var: var.rval, config.input_br) %}
+    // {% endfor %}
+
+    output->Fill();
+  }
+
+  void finalize() {
+    output_file->Write();
+    delete output_file;
+  }
+};
+
+// {% endfor %}
+
+// Generator for each input tree: all output trees are filled in one loop
+// {% for tree_in, group in directive.input_groups->items: %}
+void generator_/* {% guard: tree_in %} */(TTree *input_tree, TString output_prefix) {
+  TTreeReader reader(input_tree);
+  InputTree_/* {% guard: tree_in %} */ in(reader);
+
+  // {% for tree_out in group.outputs %}
+  //   {% format: "OutputTree_{0} out_{0}(output_prefix);", (guard: tree_out) %}
+  // {% endfor %}
+
+  while (reader.Next()) {
+    // {% for tree_out in group.outputs %}
+    //   {% format: "out_{}.process(in);", (guard: tree_out) %}
+    // {% endfor %}
+  }
+
+  // {% for tree_out in group.outputs %}
+  //   {% format: "out_{}.finalize();", (guard: tree_out) %}
+  // {% endfor %}
+}
+
+// {% endfor %}
+
+int main(int, char** argv) {
+  TString in_prefix  = TString(argv[1]) + "/";
+  TString out_prefix = TString(argv[2]) + "/";
+
+  TFile *ntuple = new TFile(in_prefix + /* {% quote: directive.ntuple %} */);
+  cout << "The ntuple being worked on is: " << /* {% quote: directive.ntuple %} */
+    << endl;
+
+  vector<TFile*> friend_ntuples;
+  // {% for friend in directive.friends %}
+    friend_ntuples.push_back(new TFile(in_prefix + /* {% quote: friend %} */));
+    cout << "Additional friend ntuple: " << /* {% quote: friend %} */ << endl;
+  // {% endfor %}
+
+  // Define input trees and container to store associated friend trees
+  // {% for tree in directive.input_trees %}
+  //   {% format: "auto tree_{} = static_cast<TTree*>(ntuple->Get(\"{}\"));", (guard: tree), tree %}
+  //   {% format: "vector<TTree*> friends_{};", (guard: tree) %}
+  // {% endfor %}
+
+  // Handle friend trees
+  TTree* tmp_tree;
+  // {% for tree in directive.input_trees %}
+  //   {% for idx, state in enum: directive.tree_relations[tree] %}
+  //     {% if state then %}
+  //       {% format: "tmp_tree = static_cast<TTree*>(friend_ntuples[{}]->Get(\"{}\"));", idx, tree %}
+           tmp_tree->BuildIndex("runNumber", "eventNumber");
+  //       {% format: "tree_{}->AddFriend(tmp_tree, \"{}\", true);", (guard: tree), idx %}
+           friends_/* {% guard: tree %} */.push_back(tmp_tree);
+           cout << "Handling input tree: " << /* {% quote: tree %} */ << endl;
+  //     {% endif %}
+  //   {% endfor %}
+  // {% endfor %}
+
+  // {% for tree_in in directive.input_groups %}
+  //   {% format: "generator_{0}(tree_{0}, out_prefix);", (guard: tree_in) %}
+  // {% endfor %}
+
+  // Cleanups
+  cout <<"Cleanups" << endl;
+  delete ntuple;
+  // {% for tree in directive.input_trees %}
+    for (auto tree : friends_/* {% guard: tree %} */) delete tree;
+  // {% endfor %}
+  for (auto ntp : friend_ntuples) delete ntp;
+
+  return 0;
+}
@@ -0,0 +1,35 @@
+// Copy output branches of the input tree without an event loop, if they are
+// all directly in the input tree. Entries are selected by 'sel', if not empty.
+// Return false if the tree can't be copied, e.g. if 'sel' can't be compiled as
+// a TTreeFormula, so that the event loop is used instead.
+bool clone_input_tree(TTree *input_tree, TFile *output_file, vector<string> branches, TString sel) {
+  for (auto &br : branches)
+    if (!input_tree->GetListOfBranches()->FindObject(br.c_str())) return false;
+
+  TEntryList *entries = nullptr;
+  if (!sel.IsNull()) {
+    input_tree->GetDirectory()->cd();
+    input_tree->SetBranchStatus("*", 1);
+    auto num_selected = input_tree->Draw(">>clone_entries", sel, "entrylist");
+    entries = static_cast<TEntryList*>(gDirectory->Get("clone_entries"));
+    if (num_selected < 0 || !entries) {
+      cerr << "Selection can't be evaluated by TTreeFormula, falling back to the event loop: "
+           << sel << endl;
+      delete entries;
+      output_file->cd();
+      return false;
+    }
+    input_tree->SetEntryList(entries);
+  }
+
+  input_tree->SetBranchStatus("*", 0);
+  for (auto &br : branches) input_tree->SetBranchStatus(br.c_str(), 1);
+
+  output_file->cd();
+  auto output = entries ? input_tree->CopyTree("") : input_tree->CloneTree(-1, "fast");
+  output->SetNameTitle("tree", "tree");
+
+  input_tree->SetEntryList(nullptr);
+  delete entries;
+  return true;
+}
@@ -0,0 +1,30 @@
+// Only read needed branches, from the input tree and its friends, and prefetch
+// them in the read cache
+void setup_input_branches(TTree *tree, vector<string> branches, Long64_t cache_size) {
+  vector<TTree*> trees{tree};
+  if (auto friends = tree->GetListOfFriends()) {
+    for (auto elem : *friends) {
+      auto friend_tree = static_cast<TFriendElement*>(elem)->GetTree();
+      trees.push_back(friend_tree);
+
+      // Branches used to look up entries in indexed friend trees
+      if (auto index = friend_tree->GetTreeIndex()) {
+        branches.push_back(index->GetMajorName());
+        branches.push_back(index->GetMinorName());
+      }
+    }
+  }
+
+  for (auto t : trees) {
+    t->SetBranchStatus("*", 0);
+    t->SetCacheSize(cache_size);
+    for (auto &br : branches) {
+      // Look up branches by full name, so that sub-branches of split objects
+      // are found as well. Branches of the other trees are skipped.
+      UInt_t found = 0;
+      t->SetBranchStatus(br.c_str(), 1, &found);
+      if (found && t->GetBranch(br.c_str())) t->AddBranchToCache(br.c_str(), true);
+    }
+    t->StopCacheLearningPhase();
+  }
+}
@@ -0,0 +1,77 @@
+// Escape a string to be written in a JSON file, including control characters
+string json_escape(const string &str) {
+  string result;
+  for (unsigned char c : str) {
+    if (c == '"' || c == '\\') {
+      result += '\\';
+      result += c;
+    } else if (c == '\n') {
+      result += "\\n";
+    } else if (c == '\t') {
+      result += "\\t";
+    } else if (c == '\r') {
+      result += "\\r";
+    } else if (c < 0x20) {
+      char code[7];
+      snprintf(code, sizeof(code), "\\u%04x", c);
+      result += code;
+    } else {
+      result += c;
+    }
+  }
+  return result;
+}
+
+// Cut-flow of an output tree: for each cut, the number of events it is
+// evaluated on and passed by. In profile mode, the time spent on each cut is
+// measured as well.
+struct CutFlow {
+  vector<string> cuts;
+  vector<Long64_t> evaluated;
+  vector<Long64_t> passed;
+  vector<double> seconds;
+  bool profile;
+
+  CutFlow(vector<string> cuts, bool profile)
+      : cuts(cuts), evaluated(cuts.size(), 0), passed(cuts.size(), 0),
+        seconds(cuts.size(), 0), profile(profile) {}
+
+  template <typename F>
+  bool eval(size_t idx, F cut) {
+    bool result;
+    evaluated[idx]++;
+    if (profile) {
+      auto start = chrono::steady_clock::now();
+      result = cut();
+      seconds[idx] += chrono::duration<double>(chrono::steady_clock::now() - start).count();
+    } else {
+      result = cut();
+    }
+    if (result) passed[idx]++;
+    return result;
+  }
+};
+
+// Write cut-flow and throughput of an output tree to a JSON file
+void write_report(TString filename, const string &tree, const CutFlow &cutflow,
+                  Long64_t num_read, Long64_t num_written, double seconds,
+                  Long64_t bytes_read) {
+  ofstream report(filename.Data());
+  report << "{\n"
+         << "  \"tree\": \"" << json_escape(tree) << "\",\n"
+         << "  \"profile\": " << (cutflow.profile ? "true" : "false") << ",\n"
+         << "  \"events_read\": " << num_read << ",\n"
+         << "  \"events_written\": " << num_written << ",\n"
+         << "  \"wall_time_s\": " << seconds << ",\n"
+         << "  \"events_per_s\": " << (seconds > 0 ? num_read / seconds : 0) << ",\n"
+         << "  \"bytes_read\": " << bytes_read << ",\n"
+         << "  \"cuts\": [";
+  for (size_t i = 0; i < cutflow.cuts.size(); i++) {
+    report << (i ? "," : "") << "\n    {\"cut\": \"" << json_escape(cutflow.cuts[i])
+           << "\", \"evaluated\": " << cutflow.evaluated[i]
+           << ", \"passed\": " << cutflow.passed[i]
+           << ", \"time_s\": " << cutflow.seconds[i] << "}";
+  }
+  report << "\n  ]\n}\n";
+  cout << "Report written to: " << filename << endl;
+}
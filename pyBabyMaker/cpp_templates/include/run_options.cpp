@@ -0,0 +1,59 @@
+// Entries to be processed, from command line arguments
+struct RunOptions {
+  Long64_t first_entry = 0;
+  Long64_t last_entry = -1;  // Exclusive; -1 means up to the last entry
+  int shard_idx = 0;
+  int num_of_shards = 0;  // 0 means no sharding
+};
+
+RunOptions parse_options(int argc, char** argv) {
+  RunOptions opts;
+  for (int i = 3; i < argc; i++) {
+    string arg = argv[i];
+    if (arg == "--first-entry" && i+1 < argc)
+      opts.first_entry = atoll(argv[++i]);
+    else if (arg == "--last-entry" && i+1 < argc)
+      opts.last_entry = atoll(argv[++i]);
+    else if (arg == "--shard" && i+1 < argc &&
+             sscanf(argv[++i], "%d/%d", &opts.shard_idx, &opts.num_of_shards) == 2 &&
+             opts.shard_idx >= 0 && opts.shard_idx < opts.num_of_shards)
+      continue;
+    else {
+      cerr << "Invalid argument: " << arg << endl;
+      exit(1);
+    }
+  }
+  return opts;
+}
+
+TString shard_suffix(const RunOptions &opts) {
+  if (opts.num_of_shards <= 0) return "";
+  return TString::Format(/* {% quote: (format: directive.shard_suffix, "%d", "%d") %} */,
+                         opts.shard_idx, opts.num_of_shards);
+}
+
+// Return the start of the first cluster at or after 'entry'
+Long64_t align_to_cluster(TTree *tree, Long64_t entry) {
+  auto clusters = tree->GetClusterIterator(entry);
+  Long64_t start;
+  while ((start = clusters()) < tree->GetEntries())
+    if (start >= entry) return start;
+  return tree->GetEntries();
+}
+
+// Return the [first, last) entry range to process. Shards are aligned to
+// cluster boundaries so that no basket is read by two shards.
+pair<Long64_t, Long64_t> entry_range(TTree *tree, const RunOptions &opts) {
+  auto num_of_entries = tree->GetEntries();
+  auto first = min(opts.first_entry, num_of_entries);
+  auto last = opts.last_entry < 0 ? num_of_entries : min(opts.last_entry, num_of_entries);
+  last = max(first, last);
+  if (opts.num_of_shards <= 0) return {first, last};
+
+  auto boundary = [&](int idx) {
+    if (idx == 0) return first;
+    if (idx == opts.num_of_shards) return last;
+    return min(last, align_to_cluster(tree, first + (last-first)*idx/opts.num_of_shards));
+  };
+  return {boundary(opts.shard_idx), boundary(opts.shard_idx+1)};
+}
@@ -2,7 +2,7 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Wed Sep 01, 2021 at 05:47 PM +0200
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 """
 This module provides general variable dependency resolution.
 
@@ -151,13 +151,63 @@ class Node:
         return '{} {}_{} = {}'.format(
             self.type, self.scope, self.name, self.rval)
 
+    @property
+    def key(self):
+        """
+        Return a hashable key that identifies this node. Two nodes compare
+        equal if and only if they have the same key.
+        """
+        return (self.name, self.scope, self.type, self.expr)
+
     def __eq__(self, other):
-        if type(self) == type(other) and \
-                self.name == other.name and self.scope == other.scope and \
-                self.type == other.type and self.expr == other.expr:
+        if type(self) == type(other) and self.key == other.key:
             return True
         return False
 
+    def __hash__(self):
+        return hash(self.key)
+
+
+class NodeRegistry(list):
+    """
+    An ordered list of resolved nodes, with a ``dict`` index keyed by
+    ``Node.key`` so that lookups of already resolved nodes are O(1).
+
+    Only the first node with a given key is stored.
+    """
+    def __init__(self, iterable=None):
+        super().__init__()
+        self._index = {}
+        if iterable:
+            self.extend(iterable)
+
+    def __contains__(self, node):
+        return node.key in self._index
+
+    def get(self, node, default=None):
+        """
+        Return the registered node that is equal to ``node``.
+        """
+        return self._index.get(node.key, default)
+
+    def append(self, node):
+        if node.key not in self._index:
+            self._index[node.key] = node
+            super().append(node)
+
+    def extend(self, iterable):
+        for node in iterable:
+            self.append(node)
+
+    def __add__(self, value):
+        result = NodeRegistry(self)
+        result.extend(value)
+        return result
+
+    def __iadd__(self, value):
+        self.extend(value)
+        return self
+
 
 ################################
 # Variable resolver with a DAG #
@@ -188,6 +238,11 @@ def resolve_var(var, scope, scopes, ordering,
     """
     resolved_vars_now = []
     skip_names = [] if skip_names is None else skip_names
+    if resolved_vars and not isinstance(resolved_vars, NodeRegistry):
+        resolved_vars = NodeRegistry(resolved_vars)
+    if resolved_vars_mutable is not None and \
+            not isinstance(resolved_vars_mutable, NodeRegistry):
+        resolved_vars_mutable = NodeRegistry(resolved_vars_mutable)
 
     if var.terminal:
         node_root = Node(var.name, scope, var.type, parent=parent)
@@ -210,7 +265,8 @@ def resolve_var(var, scope, scopes, ordering,
         return True, node_root, []
 
     for rval, deps in var:  # Allow resolve variables with multiple rvalues
-        resolved_vars_mutable = [] if resolved_vars_mutable is None else \
+        resolved_vars_mutable = NodeRegistry() \
+            if resolved_vars_mutable is None else \
             resolved_vars_mutable  # This is flushed for each rvalue
         node_root = Node(var.name, scope, var.type, rval, parent=parent)
         postprocess(var, node_root)
@@ -218,12 +274,11 @@ def resolve_var(var, scope, scopes, ordering,
 
         if resolved_vars and node_root in resolved_vars:
             DEBUG('Already resolved: {}'.format(node_root))
-            return True, resolved_vars[resolved_vars.index(node_root)], []
+            return True, resolved_vars.get(node_root), []
 
         if node_root in resolved_vars_mutable:
             DEBUG('Already resolved: {}'.format(node_root))
-            return True, resolved_vars_mutable[
-                resolved_vars_mutable.index(node_root)], []
+            return True, resolved_vars_mutable.get(node_root), []
 
         resolved_vars_dep = []
         blocked_fnames = find_parent_fnames(node_root)
@@ -273,8 +328,11 @@ def resolve_vars_in_scope(vars, scope, scopes, ordering,
                           resolved_vars=None, **kwargs):
     """
     Resolve specified variables in scopes.
+
+    The returned resolved variables are stored in a ``NodeRegistry``, which
+    also contains all nodes in ``resolved_vars``.
     """
-    resolved = [] if resolved_vars is None else resolved_vars
+    resolved = NodeRegistry(resolved_vars)
     failed = []
 
     for v in vars:
@@ -8,7 +8,9 @@ This module glues all submodules in ``engine`` together to parse and evaluate
 template macros in a C++ file.
 """
 
-from .identifiers import full_line_id, inline_id
+import os.path
+
+from .identifiers import full_line_id, inline_id, include_id
 from .eval import DelayedEvaluator
 from .eval import TransForTemplateMacro
 from .eval import Scope
@@ -46,6 +48,25 @@ def helper_flatten(lst, result=None):
     return result
 
 
+def template_include(file_content, base_dir):
+    """
+    Replace ``// {% include: "<path>" %}`` lines by the content of the file at
+    ``<path>``, relative to ``base_dir``, so that code can be shared between
+    templates. Included files can include other files.
+
+    :param Iterable file_content: content of the raw template.
+    :param str base_dir: directory of the raw template.
+    """
+    for line in file_content:
+        match = include_id.search(line)
+        if match:
+            path = os.path.join(base_dir, match[1])
+            with open(path) as f:
+                yield from template_include(f, os.path.dirname(path))
+        else:
+            yield line
+
+
 def template_transformer(file_content, directive, do_check=True, eol='\n'):
     """
     Transform raw template into fully working C++ code.
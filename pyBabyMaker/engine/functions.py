@@ -112,6 +112,7 @@ macro_funcs_raw = {
     # Boolean
     'true': lambda: True,
     'false': lambda: False,
+    'none': lambda: None,
     # IO
     'input': func_input,
     # List & dict
@@ -124,6 +125,7 @@ macro_funcs_raw = {
     # Boolean
     'comp': lambda cond: not cond,
     'eq': lambda lhs, rhs: lhs == rhs,
+    'neq': lambda lhs, rhs: lhs != rhs,
     'gt': lambda lhs, rhs: lhs > rhs,
     'gte': lambda lhs, rhs: lhs >= rhs,
     'lt': lambda lhs, rhs: lhs < rhs,
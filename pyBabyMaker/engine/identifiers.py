@@ -72,3 +72,5 @@ full_line_id = Identifier(r'^(\s*)//\s*\{%\s*(.*)%\}\s*$', 'full_line',
                           2, [False, True])
 inline_id = Identifier(r'^(.*)/\*\s*\{%\s*(.*)%\}\s*\*/(.*)$', 'inline',
                        3, [False, True, False])
+include_id = Identifier(r'^\s*//\s*\{%\s*include:\s*"(.*)"\s*%\}\s*$', 'include',
+                        1, [False])
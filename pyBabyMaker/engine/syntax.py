@@ -2,7 +2,7 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Mon Jan 25, 2021 at 01:12 AM +0100
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 """
 This module provide a parser for template macros extracted from C++ files.
 
@@ -18,7 +18,7 @@ block. This is because the parser works on a line-by-line basis---it doesn't
 have access to the whole "macro" source code.
 """
 
-from lark import Lark
+from pyBabyMaker.base import LazyParser
 
 
 template_macro_grammar = '''
@@ -74,4 +74,5 @@ template_macro_grammar = '''
     BOOL.2: "True" | "False" | "true" | "false"  // these have higher priority
 '''
 
-template_macro_parser = Lark(template_macro_grammar, parser='lalr', debug=True)
+template_macro_parser = LazyParser(template_macro_grammar, parser='lalr',
+                                   debug=True)
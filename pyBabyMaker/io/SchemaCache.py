@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun <syp at umd dot edu>
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+"""
+This module provides a local cache for dumped ntuple structures, so that
+repeated code generation doesn't need to open the ntuple at all.
+
+Entries are keyed by the file identity: absolute path, size, modification time,
+and optionally a checksum of the file header.
+
+An entry may only hold a subset of the trees in a ntuple, when only some trees
+were dumped. In that case, the requested trees that were not found in the
+ntuple are recorded as well, so that their absence is also cached.
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+
+class SchemaCache:
+    """
+    Directory-based cache of ``PyTupleDump.dump`` results, with least recently
+    used eviction.
+    """
+    def __init__(self, cache_dir, max_entries=128, checksum_bytes=0):
+        """
+        Initialize the cache.
+
+        :param str cache_dir: directory to store cached schemas.
+        :param int max_entries: maximum number of cached ntuples.
+        :param int checksum_bytes:
+            if positive, number of bytes at the beginning of the ntuple to be
+            included in the key as a checksum.
+        """
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.checksum_bytes = checksum_bytes
+
+    def key(self, ntp_path):
+        """
+        Return the cache key of the ntuple located at ``ntp_path``.
+        """
+        ntp_path = os.path.abspath(ntp_path)
+        stat = os.stat(ntp_path)
+        identity = [ntp_path, str(stat.st_size), str(stat.st_mtime_ns)]
+
+        if self.checksum_bytes > 0:
+            with open(ntp_path, 'rb') as f:
+                identity.append(hashlib.sha1(
+                    f.read(self.checksum_bytes)).hexdigest())
+
+        return hashlib.sha1('\n'.join(identity).encode('utf-8')).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, 'schema-{}.json'.format(key))
+
+    def entries(self):
+        """
+        Return paths to all cached entries.
+        """
+        try:
+            return [os.path.join(self.cache_dir, f)
+                    for f in os.listdir(self.cache_dir)
+                    if f.startswith('schema-') and f.endswith('.json')]
+        except OSError:
+            return []
+
+    @staticmethod
+    def last_used(entry):
+        try:
+            return os.stat(entry).st_mtime_ns
+        except OSError:
+            return 0
+
+    def load(self, cached):
+        try:
+            with open(cached) as f:
+                entry = json.load(f)
+            if isinstance(entry, dict) and 'schema' in entry:
+                return entry
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def get(self, ntp_path, trees=None):
+        """
+        Return the cached schema of ``ntp_path``, or ``None`` if not cached.
+
+        If ``trees`` is specified, only these trees are needed and returned.
+        """
+        cached = self.path(self.key(ntp_path))
+        entry = self.load(cached)
+        if entry is None:
+            return None
+
+        schema = entry['schema']
+        if trees is None:
+            if not entry['complete']:
+                return None
+        else:
+            known = set(schema) | set(entry['absent'])
+            if not entry['complete'] and not known.issuperset(trees):
+                return None
+            schema = {k: v for k, v in schema.items() if k in trees}
+
+        os.utime(cached)  # Mark as recently used
+        return schema
+
+    def put(self, ntp_path, schema, trees=None):
+        """
+        Store ``schema`` as the cached schema of ``ntp_path``.
+
+        If ``trees`` is specified, ``schema`` only contains these trees, and is
+        merged with the existing entry.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cached = self.path(self.key(ntp_path))
+        tmp_path = cached + '.{}.{}.tmp'.format(
+            os.getpid(), threading.get_ident())
+
+        entry = self.load(cached) if trees is not None else None
+        if entry is None:
+            entry = {'schema': {}, 'complete': False, 'absent': []}
+
+        entry['schema'].update(schema)
+        if trees is None:
+            entry['complete'] = True
+            entry['absent'] = []
+        else:
+            entry['absent'] = sorted(set(entry['absent']) | {
+                t for t in trees if t not in schema})
+
+        with open(tmp_path, 'w') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, cached)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until at most ``max_entries`` are
+        left.
+        """
+        entries = self.entries()
+        if len(entries) <= self.max_entries:
+            return
+
+        entries.sort(key=self.last_used)
+        for e in entries[:len(entries)-self.max_entries]:
+            try:
+                os.remove(e)
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Remove all cached entries.
+        """
+        for e in self.entries():
+            os.remove(e)
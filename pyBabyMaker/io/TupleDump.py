@@ -2,7 +2,7 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Sat Mar 13, 2021 at 04:37 PM +0100
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 """
 This module dumps all branch names and their types from all TTrees in a ntuple.
 """
@@ -15,26 +15,54 @@ class PyTupleDump:
     def __init__(self, ntp_path):
         self.ntp = uproot.open(ntp_path)
 
-    def dump(self):
+    def dump(self, trees=None):
+        """
+        Dump branch names and types of all trees, or only of the trees listed
+        in ``trees``, if specified.
+        """
         return {self.tree_name(tree):
                 {k: self.type_hint(v)
                  for k, v in self.ntp[tree].typenames().items()}
-                for tree in self.ttree_only(self.ntp)}
+                for tree in self.ttree_only(self.ntp, trees=trees)}
 
     @classmethod
-    def ttree_only(cls, ntp, keey_highest_cycle_only=True):
-        result = []
+    def ttree_only(cls, ntp, keey_highest_cycle_only=True, trees=None):
+        """
+        Return keys of ``TTree`` objects in ``ntp``.
 
-        oldkey = None
-        for key in ntp:
-            if cls.classname(ntp[key]) == 'TTree':
-                if oldkey and (cls.tree_name(oldkey) != cls.tree_name(key) or
-                               not keey_highest_cycle_only):
-                    result.append(oldkey)
-                oldkey = key
-        result.append(oldkey)
+        Only the class names stored in the directory metadata are used, so no
+        object is read. Subdirectories are descended into only if they may
+        contain a tree in ``trees``, if specified.
+        """
+        cycles = {}
+        cls.find_ttrees(ntp, cycles, trees)
 
-        return result
+        if keey_highest_cycle_only:
+            return ['{};{}'.format(name, max(c)) for name, c in cycles.items()]
+        return ['{};{}'.format(name, i)
+                for name, c in cycles.items() for i in sorted(c)]
+
+    @classmethod
+    def find_ttrees(cls, directory, cycles, trees=None, prefix=''):
+        """
+        Collect cycle numbers of all ``TTree`` objects in ``directory`` into
+        the ``cycles`` dict, with the full tree names as keys.
+        """
+        visited = set()
+
+        for key, classname in directory.classnames(recursive=False).items():
+            name = prefix + cls.tree_name(key)
+
+            if classname == 'TTree':
+                if trees is None or name in trees:
+                    cycles.setdefault(name, []).append(cls.cycle(key))
+
+            elif classname in ('TDirectory', 'TDirectoryFile') and \
+                    name not in visited:
+                visited.add(name)
+                if trees is None or \
+                        any(t.startswith(name+'/') for t in trees):
+                    cls.find_ttrees(directory[key], cycles, trees, name+'/')
 
     @staticmethod
     def classname(obj):
@@ -47,6 +75,13 @@ class PyTupleDump:
     def tree_name(key):
         return key.split(';')[0]
 
+    @staticmethod
+    def cycle(key):
+        try:
+            return int(key.split(';')[1])
+        except (IndexError, ValueError):
+            return 0
+
     @staticmethod
     def type_hint(typename):
         hints = {
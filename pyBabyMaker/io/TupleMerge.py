@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun <syp at umd dot edu>
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+"""
+This module merges flat output trees of the same structure, e.g. the outputs of
+the shards of a generated binary, into a single ntuple.
+"""
+
+import uproot
+
+
+def merge_ntuples(output_filename, input_filenames, tree='tree',
+                  step_size='100 MB'):
+    """
+    Concatenate ``tree`` in all ``input_filenames``, in order, and write the
+    result to ``output_filename``. Return the number of merged entries.
+
+    The inputs are streamed in chunks of ``step_size``, so that they never need
+    to fit in memory. Jagged branches keep the names of their counter branches,
+    and the output file uses the compression settings of the first input.
+    """
+    if not input_filenames:
+        raise ValueError('No ntuple to merge.')
+
+    with uproot.open(input_filenames[0]) as ntp:
+        compression = ntp.file.compression
+        counters = {br: ntp[tree][br].count_branch.name
+                    for br in ntp[tree].keys()
+                    if ntp[tree][br].count_branch is not None}
+        # Counter branches are written along with the branches they count
+        branches = [br for br in ntp[tree].keys()
+                    if br not in counters.values()]
+        empty = ntp[tree].arrays(branches, entry_stop=0, library='ak')
+        types = {br: empty[br].type.content for br in branches}
+
+    entries = 0
+    with uproot.recreate(output_filename, compression=compression) as output:
+        output.mktree(tree, types, counter_name=lambda br: counters.get(
+            br, 'n' + br))
+
+        for ntp_filename in input_filenames:
+            with uproot.open(ntp_filename) as ntp:
+                for chunk in ntp[tree].iterate(
+                        branches, step_size=step_size, library='ak'):
+                    output[tree].extend({br: chunk[br] for br in branches})
+                    entries += len(chunk)
+
+    return entries
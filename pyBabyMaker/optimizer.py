@@ -0,0 +1,709 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun <syp at umd dot edu>
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+"""
+This module provides optimization passes over the resolved variables of an
+output tree. These work on the parse trees of the C++ expressions, so that
+only syntactically identical sub-expressions are considered to be the same.
+"""
+
+import math
+
+from functools import lru_cache
+
+from lark import Tree, Token
+from lark.exceptions import LarkError
+
+from pyBabyMaker.base import UniqueList
+from pyBabyMaker.boolean.syntax import cpp_boolean_parser_with_pos
+from pyBabyMaker.dag_resolver import Node
+
+
+###########
+# Helpers #
+###########
+
+# Integral types, in increasing conversion rank
+INTEGRAL_TYPES = [
+    'bool', 'Bool_t',
+    'char', 'Char_t', 'int8_t', 'unsigned char', 'UChar_t', 'uint8_t',
+    'short', 'Short_t', 'int16_t', 'unsigned short', 'UShort_t', 'uint16_t',
+    'int', 'Int_t', 'int32_t', 'unsigned int', 'unsigned', 'UInt_t',
+    'uint32_t',
+    'long', 'Long_t', 'long long', 'Long64_t', 'int64_t',
+    'unsigned long', 'ULong_t', 'unsigned long long', 'ULong64_t', 'uint64_t',
+]
+FLOAT_TYPES = ['float', 'Float_t']
+DOUBLE_TYPES = ['double', 'Double_t']
+
+COMPARISONS = ['eq', 'neq', 'gt', 'gte', 'lt', 'lte']
+ARITHMETICS = ['add', 'sub', 'mul', 'div']
+
+# Operations that never have side effects
+PURE_OPS = COMPARISONS + ARITHMETICS + [
+    'neg', 'comp', 'num', 'bool', 'var', 'fullname', 'arguments']
+
+# Operations whose result can be computed once if all operands are constant
+CONSTANT_OPS = COMPARISONS + ARITHMETICS + ['neg', 'comp', 'func_call']
+
+# Sizes of the integral types that are folded, in bits
+FOLDABLE_INTEGRAL_TYPES = {'int': 32, 'long': 64, 'long long': 64}
+INTEGRAL_SUFFIXES = {'int': '', 'long': 'L', 'long long': 'LL'}
+
+# Functions that can be evaluated at generation time
+FOLDABLE_FUNCTIONS = {
+    'abs': abs, 'fabs': math.fabs,
+    'sqrt': math.sqrt, 'pow': math.pow, 'hypot': math.hypot,
+    'exp': math.exp, 'log': math.log, 'log10': math.log10,
+    'sin': math.sin, 'cos': math.cos, 'tan': math.tan,
+    'asin': math.asin, 'acos': math.acos, 'atan': math.atan,
+    'atan2': math.atan2,
+    'sinh': math.sinh, 'cosh': math.cosh, 'tanh': math.tanh,
+    'TMath::Abs': abs, 'TMath::Sqrt': math.sqrt, 'TMath::Exp': math.exp,
+    'TMath::Log': math.log, 'TMath::Log10': math.log10,
+    'TMath::ATan2': math.atan2, 'TMath::Pi': lambda: math.pi,
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_expr_with_pos(expr):
+    """
+    Parse a C++ expression, keeping the positions of all sub-expressions.
+    Return ``None`` if the expression can't be parsed.
+
+    The returned tree is shared between calls and must not be modified.
+    """
+    try:
+        return cpp_boolean_parser_with_pos.parse(expr)
+    except LarkError:
+        return None
+
+
+def get_name(tree):
+    """
+    Return the (full) name of a ``var`` or ``func_call`` tree.
+    """
+    name = tree.children[0]
+    if isinstance(name, Tree):
+        return '::'.join(t.value for t in name.children)
+    return name.value
+
+
+def find_span(expr, tree):
+    """
+    Return the start and end positions of a parsed sub-expression in ``expr``.
+
+    The positions from the parser exclude the parentheses around the first and
+    last operands, e.g. ``(a+b)*(c+d)`` starts at ``a``. These are included
+    back so that the span is balanced.
+    """
+    start, end = tree.meta.start_pos, tree.meta.end_pos
+    depth = lowest = 0
+    for char in expr[start:end]:
+        depth += {'(': 1, ')': -1}.get(char, 0)
+        lowest = min(lowest, depth)
+
+    for _ in range(-lowest):
+        start = expr.rindex('(', 0, start)
+    for _ in range(depth - lowest):
+        end = expr.index(')', end) + 1
+
+    return start, end
+
+
+def find_vars(tree):
+    """
+    Return names of all variables in a parsed tree.
+    """
+    return UniqueList([get_name(t) for t in tree.find_data('var')])
+
+
+def tree_size(tree):
+    """
+    Return the number of operations in a parsed tree.
+    """
+    return sum(1 for _ in tree.iter_subtrees())
+
+
+def canonical_form(tree, names):
+    """
+    Return a hashable representation of a parsed tree, with variables replaced
+    by the values of ``names``, e.g. their full names.
+    """
+    if isinstance(tree, Token):
+        return tree.value
+    if tree.data == 'var':
+        name = get_name(tree)
+        return ('var', names.get(name, name))
+    return (tree.data,) + tuple(canonical_form(c, names) for c in tree.children)
+
+
+def literal_type(value):
+    """
+    Return the type of a numeric literal, or ``None`` if it is not a number.
+    """
+    value = value.strip().lower()
+    body = value.rstrip('ful')
+    try:
+        float(body)
+    except ValueError:
+        return None
+
+    if '.' in body or 'e' in body:
+        return 'float' if value.endswith('f') else 'double'
+    suffix = value[len(body):]
+    if 'll' in suffix:
+        return 'unsigned long long' if 'u' in suffix else 'long long'
+    if 'l' in suffix:
+        return 'unsigned long' if 'u' in suffix else 'long'
+    return 'unsigned int' if 'u' in suffix else 'int'
+
+
+def common_type(types):
+    """
+    Return the type of an arithmetic operation on operands of ``types``,
+    following the usual arithmetic conversions. Return ``None`` if one of the
+    types is not arithmetic.
+    """
+    if not types:
+        return None
+    for t in types:
+        if t not in INTEGRAL_TYPES + FLOAT_TYPES + DOUBLE_TYPES:
+            return None
+
+    if [t for t in types if t in DOUBLE_TYPES]:
+        return 'double'
+    if [t for t in types if t in FLOAT_TYPES]:
+        return 'float'
+    rank = max(INTEGRAL_TYPES.index(t) for t in types)
+    return INTEGRAL_TYPES[max(rank, INTEGRAL_TYPES.index('int'))]
+
+
+def infer_type(tree, var_types, pure_functions):
+    """
+    Infer the type of a parsed expression, with types of variables given in
+    ``var_types``. Return ``None`` if the type can't be inferred.
+
+    The return type of a function in ``pure_functions`` is either a C++ type,
+    ``'same'`` for the common type of its arguments (e.g. ``abs``), or
+    ``'cmath'`` for ``float`` if all arguments are ``float`` and ``double``
+    otherwise (e.g. ``sqrt``).
+    """
+    if isinstance(tree, Token):
+        return None
+
+    if tree.data in COMPARISONS + ['comp', 'op_and', 'op_or', 'bool']:
+        return 'bool'
+    if tree.data == 'num':
+        return literal_type(tree.children[0].value)
+    if tree.data == 'var':
+        return var_types.get(get_name(tree))
+    if tree.data in ARITHMETICS + ['neg']:
+        return common_type([infer_type(c, var_types, pure_functions)
+                            for c in tree.children])
+
+    if tree.data == 'func_call' and get_name(tree) in pure_functions:
+        rule = pure_functions[get_name(tree)]
+        args = [infer_type(c, var_types, pure_functions)
+                for c in tree.children[1].children] \
+            if len(tree.children) > 1 else []
+        arg_type = common_type(args)
+
+        if rule == 'same':
+            return arg_type
+        if rule == 'cmath':
+            if arg_type is None:
+                return None
+            return 'float' if arg_type == 'float' and \
+                not [a for a in args if a not in FLOAT_TYPES] else 'double'
+        return rule
+
+    return None
+
+
+def is_pure(tree, pure_functions):
+    """
+    Check if a parsed expression has no side effect.
+    """
+    for subtree in tree.iter_subtrees():
+        if subtree.data == 'func_call':
+            if get_name(subtree) not in pure_functions:
+                return False
+        elif subtree.data not in PURE_OPS:
+            return False
+    return True
+
+
+def find_candidates(tree, conditional=False):
+    """
+    Find sub-expressions that can be hoisted, in pre-order. Sub-expressions
+    that are only conditionally evaluated, i.e. in the right-hand side of
+    ``&&`` or ``||``, are skipped.
+    """
+    if not isinstance(tree, Tree):
+        return
+
+    if not conditional and \
+            tree.data in COMPARISONS + ARITHMETICS + ['comp', 'func_call']:
+        yield tree
+
+    for idx, child in enumerate(tree.children):
+        yield from find_candidates(
+            child, conditional or (tree.data in ['op_and', 'op_or'] and idx))
+
+
+def place_temps(phases, temps):
+    """
+    Insert each of the ``temps`` right before its first user in ``phases``,
+    after the temporaries it depends on.
+    """
+    temp_ids = {id(t) for t in temps}
+    placed = set()
+    result = []
+
+    def place(node, phase):
+        for child in node.children:
+            if id(child) in temp_ids and id(child) not in placed:
+                place(child, phase)
+                placed.add(id(child))
+                phase.append(child)
+
+    for nodes in phases:
+        phase = []
+        for node in nodes:
+            place(node, phase)
+            phase.append(node)
+        result.append(phase)
+
+    return result
+
+
+def find_users(phases):
+    """
+    Return the computed nodes in ``phases``, without duplicates, and a ``dict``
+    of their ids to the other nodes with the same key, e.g. the same variable
+    resolved in another phase.
+    """
+    users = {}
+    for nodes in phases:
+        for node in nodes:
+            if node.expr and not node.input and not node.literal:
+                users.setdefault(node.key, []).append(node)
+    siblings = {id(nodes[0]): nodes[1:] for nodes in users.values()}
+    return [nodes[0] for nodes in users.values()], siblings
+
+
+def sync_siblings(users, siblings):
+    """
+    Copy the expressions of modified ``users`` to their ``siblings``.
+    """
+    for user in users:
+        for sibling in siblings[id(user)]:
+            sibling.expr = user.expr
+            sibling.children = user.children
+
+
+def replace_spans(node, replacements, extra_children=[]):
+    """
+    Replace parsed sub-expressions of ``node.expr`` by the given texts, and
+    update the children of ``node`` accordingly.
+    """
+    expr = node.expr
+    spans = [find_span(expr, s) + (text,) for s, text in replacements]
+    # Replace from the right, so that the remaining positions are still valid
+    for start, end, text in sorted(spans, reverse=True):
+        expr = expr[:start] + text + expr[end:]
+
+    used_names = find_vars(parse_expr_with_pos(expr))
+    node.expr = expr
+    node.children = UniqueList(
+        [c for c in node.children if c.name in used_names] + extra_children)
+
+
+def rebuild_children(phases):
+    """
+    Rebuild the ``children`` of all nodes reachable from ``phases``.
+
+    ``replace_spans`` modifies ``Node.expr``, which is part of ``Node.key``,
+    so the hashed ``UniqueList`` containing a modified node is stale.
+    """
+    visited = set()
+
+    def visit(node):
+        if id(node) in visited:
+            return
+        visited.add(id(node))
+        for child in node.children:
+            visit(child)
+        node.children = UniqueList(list(node.children))
+
+    for nodes in phases:
+        for node in nodes:
+            visit(node)
+
+
+def fit_integral(value, var_type):
+    """
+    Return ``value`` and ``var_type`` if ``value`` can be represented by the
+    integral ``var_type``, and ``None`` otherwise.
+    """
+    bits = FOLDABLE_INTEGRAL_TYPES[var_type]
+    if -2**(bits-1) <= value < 2**(bits-1):
+        return value, var_type
+    return None
+
+
+def parse_number(value):
+    """
+    Return the value and type of a numeric literal, or ``None`` if it can't be
+    folded, e.g. for ``float`` and unsigned literals.
+    """
+    var_type = literal_type(value)
+    body = value.strip().lower().rstrip('ful')
+    try:
+        if var_type == 'double':
+            result = float(body)
+            return (result, var_type) if math.isfinite(result) else None
+        if var_type in FOLDABLE_INTEGRAL_TYPES:
+            digits = body.lstrip('+-')
+            if len(digits) > 1 and digits.startswith('0'):
+                return None  # Octal
+            return fit_integral(int(body), var_type)
+    except ValueError:
+        pass
+    return None
+
+
+def convert_number(value, var_type, target_type):
+    """
+    Convert a folded value to ``target_type``, e.g. the declared type of a
+    variable. Return ``None`` if the conversion is not supported.
+    """
+    if target_type in DOUBLE_TYPES:
+        return float(value), 'double'
+    if var_type in FOLDABLE_INTEGRAL_TYPES:
+        if target_type in ['int', 'Int_t', 'int32_t']:
+            return fit_integral(value, 'int')
+        if target_type in ['long', 'Long_t']:
+            return fit_integral(value, 'long')
+        if target_type in ['long long', 'Long64_t', 'int64_t']:
+            return fit_integral(value, 'long long')
+    return None
+
+
+def format_number(value, var_type):
+    """
+    Return a C++ literal of a folded value.
+    """
+    if var_type == 'double':
+        text = repr(value)
+    else:
+        text = str(value) + INTEGRAL_SUFFIXES[var_type]
+    return '({})'.format(text) if text.startswith('-') else text
+
+
+def evaluate(tree, values, pure_functions):
+    """
+    Evaluate a parsed arithmetic expression, with the values and types of
+    variables given in ``values``, following C++ semantics. Return the value
+    and its type, or ``None`` if the expression can't be folded, e.g. if it
+    overflows or calls a function not in ``FOLDABLE_FUNCTIONS``.
+    """
+    if not isinstance(tree, Tree):
+        return None
+    if tree.data == 'num':
+        return parse_number(tree.children[0].value)
+    if tree.data == 'var':
+        return values.get(get_name(tree))
+
+    if tree.data == 'func_call':
+        args = tree.children[1].children if len(tree.children) > 1 else []
+    elif tree.data in ARITHMETICS + ['neg']:
+        args = tree.children
+    else:
+        return None
+
+    args = [evaluate(a, values, pure_functions) for a in args]
+    if None in args:
+        return None
+    operands = [a for a, _ in args]
+    var_type = common_type([t for _, t in args])
+
+    try:
+        if tree.data == 'func_call':
+            name = get_name(tree)
+            if name not in FOLDABLE_FUNCTIONS or name not in pure_functions:
+                return None
+            rule = pure_functions[name]
+            if rule == 'same' and var_type in FOLDABLE_INTEGRAL_TYPES:
+                return fit_integral(
+                    int(FOLDABLE_FUNCTIONS[name](*operands)), var_type)
+            if rule not in ['same', 'cmath', 'double']:
+                return None
+            result = float(FOLDABLE_FUNCTIONS[name](
+                *[float(o) for o in operands]))
+            var_type = 'double'
+
+        elif var_type == 'double':
+            operands = [float(o) for o in operands]
+            if tree.data == 'neg':
+                result = -operands[0]
+            else:
+                a, b = operands
+                result = {'add': lambda: a + b, 'sub': lambda: a - b,
+                          'mul': lambda: a * b,
+                          'div': lambda: a / b}[tree.data]()
+
+        elif var_type in FOLDABLE_INTEGRAL_TYPES:
+            if tree.data == 'neg':
+                return fit_integral(-operands[0], var_type)
+            a, b = operands
+            if tree.data == 'div':
+                # Integral division truncates toward zero
+                quotient = abs(a) // abs(b)
+                return fit_integral(
+                    quotient if (a < 0) == (b < 0) else -quotient, var_type)
+            return fit_integral({'add': a + b, 'sub': a - b,
+                                 'mul': a * b}[tree.data], var_type)
+
+        else:
+            return None
+
+    except (ValueError, OverflowError, ZeroDivisionError, TypeError):
+        return None
+
+    return (result, var_type) if math.isfinite(result) else None
+
+
+##########
+# Passes #
+##########
+
+def eliminate_common_subexprs(phases, pure_functions, scope='cse'):
+    """
+    Hoist sub-expressions that are evaluated more than once per event into
+    temporary variables, named ``<scope>_subexpr<idx>``.
+
+    ``phases`` is a list of lists of resolved nodes, evaluated in order, e.g.
+    the variables needed by the selection, and the ones computed for events
+    passing it. A sub-expression is hoisted if it only contains arithmetic
+    operations, comparisons, and calls to ``pure_functions`` (see
+    ``infer_type``), if its type can be inferred, and if it is not in the
+    right-hand side of a ``&&`` or ``||``. Larger sub-expressions are hoisted
+    first.
+
+    Nodes are modified in place, and their ``children`` are rebuilt (see
+    ``rebuild_children``). Return the new phases, with each temporary
+    inserted right before its first user, and the list of temporaries.
+    """
+    # The same variable can be in multiple phases, possibly as different nodes
+    users, siblings = find_users(phases)
+    temps = []
+    skipped = set()
+
+    while True:
+        occurrences = {}
+        for user in users + temps:
+            tree = parse_expr_with_pos(user.expr)
+            if tree is None:
+                continue
+
+            names = {c.name: c.literal if c.literal else c.fname
+                     for c in user.children}
+            for subtree in find_candidates(tree):
+                if not is_pure(subtree, pure_functions):
+                    continue
+                key = canonical_form(subtree, names)
+                if key not in skipped:
+                    occurrences.setdefault(key, []).append((user, subtree))
+
+        repeated = sorted(
+            [(k, v) for k, v in occurrences.items() if len(v) > 1],
+            key=lambda kv: -tree_size(kv[1][0][1]))
+        if not repeated:
+            break
+
+        key, found = repeated[0]
+        user, subtree = found[0]
+        var_types = {c.name: c.type if not c.literal else
+                     literal_type(c.literal) for c in user.children}
+        var_type = infer_type(subtree, var_types, pure_functions)
+        if not var_type:
+            skipped.add(key)
+            continue
+
+        used_names = find_vars(subtree)
+        start, end = find_span(user.expr, subtree)
+        temp = Node(
+            'subexpr{}'.format(len(temps)), scope, var_type, user.expr[start:end],
+            children=UniqueList([c for c in user.children
+                                 if c.name in used_names]),
+            input=False, output=False)
+        temps.append(temp)
+
+        for user in UniqueList([u for u, _ in found]):
+            replace_spans(user, [(s, temp.name) for u, s in found if u is user],
+                          [temp])
+
+    sync_siblings(users, siblings)
+    phases = place_temps(phases, temps)
+    rebuild_children(phases)
+    return phases, temps
+
+
+def fold_constants(phases, pure_functions, scope='const'):
+    """
+    Compute expressions that only depend on literals once, instead of for each
+    event.
+
+    ``phases`` is a list of lists of resolved nodes, as in
+    ``eliminate_common_subexprs``. Literals that are numbers are constants, and
+    so are temporary variables whose expressions only contain constants,
+    arithmetic operations, comparisons and calls to ``pure_functions``.
+    Constant arithmetic sub-expressions are evaluated at generation time (see
+    ``evaluate``) and replaced by their values. Other constant sub-expressions
+    are hoisted into temporary variables, named ``<scope>_expr<idx>``, unless
+    they are in the right-hand side of a ``&&`` or ``||``.
+
+    Nodes are modified in place, and their ``children`` are rebuilt. Return
+    the new phases, without the constant variables, the list of constant
+    variables, which need to be computed only once, and a list of folded
+    expressions and their values.
+    """
+    users, siblings = find_users(phases)
+    invariant = []
+    temps = {}
+    folded = []
+    values = {}  # Values of constant variables, keyed by their ids
+
+    def constants_of(node):
+        result = {}
+        for child in node.children:
+            if child.literal:
+                value = parse_number(child.literal)
+                if value:
+                    result[child.name] = value
+            elif values.get(id(child)):
+                result[child.name] = values[id(child)]
+        return result
+
+    def is_constant(tree, constants):
+        return is_pure(tree, pure_functions) and \
+            all(n in constants for n in find_vars(tree))
+
+    # Sub-expressions of a constant variable are not hoisted on their own, as
+    # the whole variable is computed only once
+    def visit(node, tree, constants, replacements, conditional, whole):
+        if not isinstance(tree, Tree):
+            return
+
+        if tree.data in CONSTANT_OPS and is_constant(tree, constants):
+            result = evaluate(tree, constants_of(node), pure_functions)
+            if result:
+                text = format_number(*result)
+                folded.append((node.expr[slice(*find_span(node.expr, tree))],
+                               text))
+                replacements.append((tree, text))
+                return
+
+            var_types = {c.name: literal_type(c.literal) if c.literal else
+                         c.type for c in node.children}
+            var_type = infer_type(tree, var_types, pure_functions)
+            if not whole and not conditional and var_type:
+                names = {c.name: c.literal if c.literal else c.fname
+                         for c in node.children}
+                key = canonical_form(tree, names)
+                if key not in temps:
+                    used_names = find_vars(tree)
+                    temps[key] = Node(
+                        'expr{}'.format(len(temps)), scope, var_type,
+                        node.expr[slice(*find_span(node.expr, tree))],
+                        children=UniqueList([c for c in node.children
+                                             if c.name in used_names]),
+                        input=False, output=False)
+                    worklist.append((temps[key], True))
+                replacements.append((tree, temps[key]))
+                return
+
+        for idx, child in enumerate(tree.children):
+            visit(node, child, constants, replacements,
+                  conditional or (tree.data in ['op_and', 'op_or'] and idx),
+                  whole)
+
+    # Nodes are visited after their dependencies
+    worklist = [(u, False) for u in users]
+    for node, is_temp in worklist:
+        tree = parse_expr_with_pos(node.expr)
+        if tree is None:
+            continue
+
+        constants = {c.name for c in node.children
+                     if (c.literal and parse_number(c.literal)) or
+                     id(c) in values or c in temps.values()}
+        whole = is_temp or (not node.output and not node.fake and
+                            is_constant(tree, constants))
+
+        replacements = []
+        visit(node, tree, constants, replacements, False, whole)
+        if replacements:
+            replace_spans(
+                node, [(t, r if isinstance(r, str) else r.name)
+                       for t, r in replacements],
+                [r for _, r in replacements if not isinstance(r, str)])
+
+        if whole and not is_temp:
+            invariant.append(node)
+            value = evaluate(parse_expr_with_pos(node.expr),
+                             constants_of(node), pure_functions)
+            # Constant variables that can't be folded have an empty value
+            values[id(node)] = (value and convert_number(*value, node.type)) \
+                or ()
+
+    sync_siblings(users, siblings)
+
+    # Constant variables and temporaries, after their dependencies
+    result = UniqueList()
+
+    def emit(node):
+        for child in node.children:
+            if child in temps.values() or child in invariant:
+                emit(child)
+        result.append(node)
+
+    for node in invariant + list(temps.values()):
+        emit(node)
+
+    rebuild_children(phases + [result])
+    invariant_keys = {n.key for n in invariant}
+    phases = [[n for n in nodes if n.key not in invariant_keys]
+              for nodes in phases]
+    return phases, list(result), folded
+
+
+def eliminate_dead_vars(phases):
+    """
+    Remove the nodes in ``phases`` that are not needed by any output branch or
+    cut, e.g. temporary variables whose users are not resolved, and the input
+    branches that are only needed by these.
+
+    Return the new phases and the list of removed nodes.
+    """
+    live = set()
+
+    def mark(node):
+        if node.key not in live:
+            live.add(node.key)
+            for child in node.children:
+                mark(child)
+
+    for nodes in phases:
+        for node in nodes:
+            if node.output or node.fake:
+                mark(node)
+
+    removed = UniqueList([n for nodes in phases for n in nodes
+                          if n.key not in live])
+    phases = [[n for n in nodes if n.key in live] for nodes in phases]
+    return phases, list(removed)
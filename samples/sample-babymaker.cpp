@@ -3,10 +3,21 @@
 #include <TFile.h>
 #include <TTree.h>
 #include <TTreeReader.h>
+#include <TVirtualIndex.h>
+#include <TFriendElement.h>
+#include <TEntryList.h>
+#include <TDirectory.h>
 #include <TString.h>
 
 #include <vector>
+#include <string>
 #include <iostream>
+#include <fstream>
+#include <chrono>
+#include <utility>
+#include <algorithm>
+#include <cstdio>
+#include <cstdlib>
 
 #include <Math/Vector3D.h>
 #include <Math/Vector4D.h>
@@ -22,11 +33,236 @@
 using namespace std;
 using namespace ROOT::Math;
 
+// Only read needed branches, from the input tree and its friends, and prefetch
+// them in the read cache
+void setup_input_branches(TTree *tree, vector<string> branches, Long64_t cache_size) {
+  vector<TTree*> trees{tree};
+  if (auto friends = tree->GetListOfFriends()) {
+    for (auto elem : *friends) {
+      auto friend_tree = static_cast<TFriendElement*>(elem)->GetTree();
+      trees.push_back(friend_tree);
+
+      // Branches used to look up entries in indexed friend trees
+      if (auto index = friend_tree->GetTreeIndex()) {
+        branches.push_back(index->GetMajorName());
+        branches.push_back(index->GetMinorName());
+      }
+    }
+  }
+
+  for (auto t : trees) {
+    t->SetBranchStatus("*", 0);
+    t->SetCacheSize(cache_size);
+    for (auto &br : branches) {
+      // Look up branches by full name, so that sub-branches of split objects
+      // are found as well. Branches of the other trees are skipped.
+      UInt_t found = 0;
+      t->SetBranchStatus(br.c_str(), 1, &found);
+      if (found && t->GetBranch(br.c_str())) t->AddBranchToCache(br.c_str(), true);
+    }
+    t->StopCacheLearningPhase();
+  }
+}
+
+// Entries to be processed, from command line arguments
+struct RunOptions {
+  Long64_t first_entry = 0;
+  Long64_t last_entry = -1;  // Exclusive; -1 means up to the last entry
+  int shard_idx = 0;
+  int num_of_shards = 0;  // 0 means no sharding
+};
+
+RunOptions parse_options(int argc, char** argv) {
+  RunOptions opts;
+  for (int i = 3; i < argc; i++) {
+    string arg = argv[i];
+    if (arg == "--first-entry" && i+1 < argc)
+      opts.first_entry = atoll(argv[++i]);
+    else if (arg == "--last-entry" && i+1 < argc)
+      opts.last_entry = atoll(argv[++i]);
+    else if (arg == "--shard" && i+1 < argc &&
+             sscanf(argv[++i], "%d/%d", &opts.shard_idx, &opts.num_of_shards) == 2 &&
+             opts.shard_idx >= 0 && opts.shard_idx < opts.num_of_shards)
+      continue;
+    else {
+      cerr << "Invalid argument: " << arg << endl;
+      exit(1);
+    }
+  }
+  return opts;
+}
+
+TString shard_suffix(const RunOptions &opts) {
+  if (opts.num_of_shards <= 0) return "";
+  return TString::Format("_shard%dof%d",
+                         opts.shard_idx, opts.num_of_shards);
+}
+
+// Return the start of the first cluster at or after 'entry'
+Long64_t align_to_cluster(TTree *tree, Long64_t entry) {
+  auto clusters = tree->GetClusterIterator(entry);
+  Long64_t start;
+  while ((start = clusters()) < tree->GetEntries())
+    if (start >= entry) return start;
+  return tree->GetEntries();
+}
+
+// Return the [first, last) entry range to process. Shards are aligned to
+// cluster boundaries so that no basket is read by two shards.
+pair<Long64_t, Long64_t> entry_range(TTree *tree, const RunOptions &opts) {
+  auto num_of_entries = tree->GetEntries();
+  auto first = min(opts.first_entry, num_of_entries);
+  auto last = opts.last_entry < 0 ? num_of_entries : min(opts.last_entry, num_of_entries);
+  last = max(first, last);
+  if (opts.num_of_shards <= 0) return {first, last};
+
+  auto boundary = [&](int idx) {
+    if (idx == 0) return first;
+    if (idx == opts.num_of_shards) return last;
+    return min(last, align_to_cluster(tree, first + (last-first)*idx/opts.num_of_shards));
+  };
+  return {boundary(opts.shard_idx), boundary(opts.shard_idx+1)};
+}
+
+// Escape a string to be written in a JSON file, including control characters
+string json_escape(const string &str) {
+  string result;
+  for (unsigned char c : str) {
+    if (c == '"' || c == '\\') {
+      result += '\\';
+      result += c;
+    } else if (c == '\n') {
+      result += "\\n";
+    } else if (c == '\t') {
+      result += "\\t";
+    } else if (c == '\r') {
+      result += "\\r";
+    } else if (c < 0x20) {
+      char code[7];
+      snprintf(code, sizeof(code), "\\u%04x", c);
+      result += code;
+    } else {
+      result += c;
+    }
+  }
+  return result;
+}
+
+// Cut-flow of an output tree: for each cut, the number of events it is
+// evaluated on and passed by. In profile mode, the time spent on each cut is
+// measured as well.
+struct CutFlow {
+  vector<string> cuts;
+  vector<Long64_t> evaluated;
+  vector<Long64_t> passed;
+  vector<double> seconds;
+  bool profile;
+
+  CutFlow(vector<string> cuts, bool profile)
+      : cuts(cuts), evaluated(cuts.size(), 0), passed(cuts.size(), 0),
+        seconds(cuts.size(), 0), profile(profile) {}
+
+  template <typename F>
+  bool eval(size_t idx, F cut) {
+    bool result;
+    evaluated[idx]++;
+    if (profile) {
+      auto start = chrono::steady_clock::now();
+      result = cut();
+      seconds[idx] += chrono::duration<double>(chrono::steady_clock::now() - start).count();
+    } else {
+      result = cut();
+    }
+    if (result) passed[idx]++;
+    return result;
+  }
+};
+
+// Write cut-flow and throughput of an output tree to a JSON file
+void write_report(TString filename, const string &tree, const CutFlow &cutflow,
+                  Long64_t num_read, Long64_t num_written, double seconds,
+                  Long64_t bytes_read) {
+  ofstream report(filename.Data());
+  report << "{\n"
+         << "  \"tree\": \"" << json_escape(tree) << "\",\n"
+         << "  \"profile\": " << (cutflow.profile ? "true" : "false") << ",\n"
+         << "  \"events_read\": " << num_read << ",\n"
+         << "  \"events_written\": " << num_written << ",\n"
+         << "  \"wall_time_s\": " << seconds << ",\n"
+         << "  \"events_per_s\": " << (seconds > 0 ? num_read / seconds : 0) << ",\n"
+         << "  \"bytes_read\": " << bytes_read << ",\n"
+         << "  \"cuts\": [";
+  for (size_t i = 0; i < cutflow.cuts.size(); i++) {
+    report << (i ? "," : "") << "\n    {\"cut\": \"" << json_escape(cutflow.cuts[i])
+           << "\", \"evaluated\": " << cutflow.evaluated[i]
+           << ", \"passed\": " << cutflow.passed[i]
+           << ", \"time_s\": " << cutflow.seconds[i] << "}";
+  }
+  report << "\n  ]\n}\n";
+  cout << "Report written to: " << filename << endl;
+}
+
+// Copy output branches of the input tree without an event loop, if they are
+// all directly in the input tree. Entries are selected by 'sel', if not empty.
+// Return false if the tree can't be copied, e.g. if 'sel' can't be compiled as
+// a TTreeFormula, so that the event loop is used instead.
+bool clone_input_tree(TTree *input_tree, TFile *output_file, vector<string> branches, TString sel) {
+  for (auto &br : branches)
+    if (!input_tree->GetListOfBranches()->FindObject(br.c_str())) return false;
+
+  TEntryList *entries = nullptr;
+  if (!sel.IsNull()) {
+    input_tree->GetDirectory()->cd();
+    input_tree->SetBranchStatus("*", 1);
+    auto num_selected = input_tree->Draw(">>clone_entries", sel, "entrylist");
+    entries = static_cast<TEntryList*>(gDirectory->Get("clone_entries"));
+    if (num_selected < 0 || !entries) {
+      cerr << "Selection can't be evaluated by TTreeFormula, falling back to the event loop: "
+           << sel << endl;
+      delete entries;
+      output_file->cd();
+      return false;
+    }
+    input_tree->SetEntryList(entries);
+  }
+
+  input_tree->SetBranchStatus("*", 0);
+  for (auto &br : branches) input_tree->SetBranchStatus(br.c_str(), 1);
+
+  output_file->cd();
+  auto output = entries ? input_tree->CopyTree("") : input_tree->CloneTree(-1, "fast");
+  output->SetNameTitle("tree", "tree");
+
+  input_tree->SetEntryList(nullptr);
+  delete entries;
+  return true;
+}
+
 // Generator for each output tree: one tree per file
-void generator_ATuple(TTree *input_tree, TString output_prefix) {
+void generator_ATuple(TTree *input_tree, TString output_prefix, const RunOptions &opts) {
   cout << "Generating output ntuple: " << "ATuple" << endl;
-  auto output_file = new TFile(output_prefix + "ATuple" + ".root", "recreate");
+  auto output_file = new TFile(output_prefix + "ATuple" + shard_suffix(opts) + ".root", "recreate");
+  auto range = entry_range(input_tree, opts);
+  cout << "Processing entries [" << range.first << ", " << range.second << ")" << endl;
+
+  setup_input_branches(input_tree, {
+    "Y_ISOLATION_BDT",
+    "Y_PT",
+    "Y_PE",
+    "Y_PX",
+    "Y_PY",
+    "Y_PZ",
+    "runNumber",
+    "eventNumber",
+    "GpsTime",
+    "random_pt",
+    "D0_P",
+  }, 30000000);
+  // TTreeReader processes up to the last entry when given an empty range, so
+  // the event loop is skipped instead, leaving the output tree empty
+  bool empty_range = range.first >= range.second;
   TTreeReader reader(input_tree);
+  if (!empty_range) reader.SetEntriesRange(range.first, range.second);
   TTree output("tree", "tree");
 
   // Load needed branches from ntuple
@@ -76,46 +312,71 @@ void generator_ATuple(TTree *input_tree, TString output_prefix) {
   double calculation_alt_def;
   output.Branch("alt_def", &calculation_alt_def);
 
+  // Output tree storage settings
+
   // Define temporary variables
   double calculation_TempStuff;
   double calculation_some_var;
 
-  while (reader.Next()) {
-    // Define variables required by selection
-
-    if ((true) && ((*raw_Y_ISOLATION_BDT) > 0) && ((*raw_Y_PT) > 10000)) {
-      // Assign values for each output branch in this loop
-      keep_Y_PT = (*raw_Y_PT);
-      keep_Y_PE = (*raw_Y_PE);
-      keep_Y_PX = (*raw_Y_PX);
-      keep_Y_PY = (*raw_Y_PY);
-      keep_Y_PZ = (*raw_Y_PZ);
-      keep_runNumber = (*raw_runNumber);
-      keep_eventNumber = (*raw_eventNumber);
-      keep_GpsTime = (*raw_GpsTime);
-      keep_random_pt = (*raw_random_pt);
-      rename_y_pt = (*raw_Y_PT);
-      rename_y_px = (*raw_Y_PX);
-      rename_y_py = (*raw_Y_PY);
-      rename_y_pz = (*raw_Y_PZ);
-      calculation_TempStuff = (*raw_D0_P)+(*raw_Y_PT);
-      calculation_RandStuff = calculation_TempStuff*3.14;
-      calculation_some_var = rename_y_pt + rename_y_pz;
-      calculation_some_other_var = calculation_some_var*3.14;
-      calculation_alt_def = (*raw_Y_PE);
-
-      output.Fill();
-    }
+  // Compute variables that are the same for all events once
+
+  while (!empty_range && reader.Next()) {
+    // Compute the variables needed by each cut right before it, and skip the
+    // event as soon as a cut fails
+    if (!((*raw_Y_ISOLATION_BDT) > 0)) continue;
+    if (!((*raw_Y_PT) > 10000)) continue;
+
+    // Assign values for each output branch in this loop
+    keep_Y_PT = (*raw_Y_PT);
+    keep_Y_PE = (*raw_Y_PE);
+    keep_Y_PX = (*raw_Y_PX);
+    keep_Y_PY = (*raw_Y_PY);
+    keep_Y_PZ = (*raw_Y_PZ);
+    keep_runNumber = (*raw_runNumber);
+    keep_eventNumber = (*raw_eventNumber);
+    keep_GpsTime = (*raw_GpsTime);
+    keep_random_pt = (*raw_random_pt);
+    rename_y_pt = (*raw_Y_PT);
+    rename_y_px = (*raw_Y_PX);
+    rename_y_py = (*raw_Y_PY);
+    rename_y_pz = (*raw_Y_PZ);
+    calculation_TempStuff = (*raw_D0_P)+(*raw_Y_PT);
+    calculation_RandStuff = calculation_TempStuff*3.14;
+    calculation_some_var = rename_y_pt + rename_y_pz;
+    calculation_some_other_var = calculation_some_var*3.14;
+    calculation_alt_def = (*raw_Y_PE);
+
+    output.Fill();
   }
 
   output_file->Write();
   delete output_file;
 }
 
-void generator_AnotherTuple(TTree *input_tree, TString output_prefix) {
+void generator_AnotherTuple(TTree *input_tree, TString output_prefix, const RunOptions &opts) {
   cout << "Generating output ntuple: " << "AnotherTuple" << endl;
-  auto output_file = new TFile(output_prefix + "AnotherTuple" + ".root", "recreate");
+  auto output_file = new TFile(output_prefix + "AnotherTuple" + shard_suffix(opts) + ".root", "recreate");
+  auto range = entry_range(input_tree, opts);
+  cout << "Processing entries [" << range.first << ", " << range.second << ")" << endl;
+
+  setup_input_branches(input_tree, {
+    "Y_ISOLATION_BDT",
+    "Y_PT",
+    "Y_PE",
+    "Y_PX",
+    "Y_PY",
+    "Y_PZ",
+    "runNumber",
+    "eventNumber",
+    "GpsTime",
+    "random_pt",
+    "D0_P",
+  }, 30000000);
+  // TTreeReader processes up to the last entry when given an empty range, so
+  // the event loop is skipped instead, leaving the output tree empty
+  bool empty_range = range.first >= range.second;
   TTreeReader reader(input_tree);
+  if (!empty_range) reader.SetEntriesRange(range.first, range.second);
   TTree output("tree", "tree");
 
   // Load needed branches from ntuple
@@ -155,40 +416,145 @@ void generator_AnotherTuple(TTree *input_tree, TString output_prefix) {
   double calculation_RandStuff;
   output.Branch("RandStuff", &calculation_RandStuff);
 
+  // Output tree storage settings
+
   // Define temporary variables
   double calculation_TempStuff;
 
-  while (reader.Next()) {
-    // Define variables required by selection
+  // Compute variables that are the same for all events once
+
+  while (!empty_range && reader.Next()) {
+    // Compute the variables needed by each cut right before it, and skip the
+    // event as soon as a cut fails
+    if (!((*raw_Y_ISOLATION_BDT) > 0)) continue;
     rename_b0_pt = (*raw_Y_PT);
+    if (!(rename_b0_pt > 10000)) continue;
+    if (!((*raw_Y_PE) > (100 * pow(10, 3)))) continue;
 
-    if ((true) && ((*raw_Y_ISOLATION_BDT) > 0) && (rename_b0_pt > 10000) && ((*raw_Y_PE) > (100 * pow(10, 3)))) {
-      // Assign values for each output branch in this loop
-      rename_b0_pt = (*raw_Y_PT);
-      keep_Y_PT = (*raw_Y_PT);
-      keep_Y_PE = (*raw_Y_PE);
-      keep_Y_PX = (*raw_Y_PX);
-      keep_Y_PY = (*raw_Y_PY);
-      keep_Y_PZ = (*raw_Y_PZ);
-      keep_runNumber = (*raw_runNumber);
-      keep_eventNumber = (*raw_eventNumber);
-      keep_GpsTime = (*raw_GpsTime);
-      keep_random_pt = (*raw_random_pt);
-      calculation_TempStuff = (*raw_D0_P)+(*raw_Y_PT);
-      calculation_RandStuff = calculation_TempStuff*3.14;
-
-      output.Fill();
-    }
+    // Assign values for each output branch in this loop
+    rename_b0_pt = (*raw_Y_PT);
+    keep_Y_PT = (*raw_Y_PT);
+    keep_Y_PE = (*raw_Y_PE);
+    keep_Y_PX = (*raw_Y_PX);
+    keep_Y_PY = (*raw_Y_PY);
+    keep_Y_PZ = (*raw_Y_PZ);
+    keep_runNumber = (*raw_runNumber);
+    keep_eventNumber = (*raw_eventNumber);
+    keep_GpsTime = (*raw_GpsTime);
+    keep_random_pt = (*raw_random_pt);
+    calculation_TempStuff = (*raw_D0_P)+(*raw_Y_PT);
+    calculation_RandStuff = calculation_TempStuff*3.14;
+
+    output.Fill();
   }
 
   output_file->Write();
   delete output_file;
 }
 
-void generator_YetAnotherTuple(TTree *input_tree, TString output_prefix) {
+void generator_YetAnotherTuple(TTree *input_tree, TString output_prefix, const RunOptions &opts) {
   cout << "Generating output ntuple: " << "YetAnotherTuple" << endl;
-  auto output_file = new TFile(output_prefix + "YetAnotherTuple" + ".root", "recreate");
+  auto output_file = new TFile(output_prefix + "YetAnotherTuple" + shard_suffix(opts) + ".root", "recreate");
+  auto range = entry_range(input_tree, opts);
+  cout << "Processing entries [" << range.first << ", " << range.second << ")" << endl;
+
+  setup_input_branches(input_tree, {
+    "Y_ISOLATION_BDT",
+    "piminus_isMuon",
+    "Y_OWNPV_X",
+    "Y_OWNPV_Y",
+    "Y_OWNPV_Z",
+    "Y_OWNPV_XERR",
+    "Y_OWNPV_YERR",
+    "Y_OWNPV_ZERR",
+    "Y_OWNPV_CHI2",
+    "Y_OWNPV_NDOF",
+    "Y_PT",
+    "Y_PE",
+    "Y_PX",
+    "Y_PY",
+    "Y_PZ",
+    "Y_ISOLATION_CHI2",
+    "Y_ISOLATION_ANGLE",
+    "Y_ISOLATION_SC",
+    "Y_ISOLATION_CHARGE",
+    "Y_ISOLATION_Type",
+    "Y_ISOLATION_PE",
+    "Y_ISOLATION_PX",
+    "Y_ISOLATION_PY",
+    "Y_ISOLATION_PZ",
+    "Y_ISOLATION_PIDK",
+    "Y_ISOLATION_PIDp",
+    "Y_ISOLATION_NNk",
+    "Y_ISOLATION_NNpi",
+    "Y_ISOLATION_NNp",
+    "Y_ISOLATION_IsMuon",
+    "Y_ISOLATION_NNghost",
+    "Y_ISOLATION_TRUEID",
+    "Y_ISOLATION_CHI22",
+    "Y_ISOLATION_SC2",
+    "Y_ISOLATION_ANGLE2",
+    "Y_ISOLATION_BDT2",
+    "Y_ISOLATION_CHARGE2",
+    "Y_ISOLATION_Type2",
+    "Y_ISOLATION_PE2",
+    "Y_ISOLATION_PX2",
+    "Y_ISOLATION_PY2",
+    "Y_ISOLATION_PZ2",
+    "Y_ISOLATION_PIDK2",
+    "Y_ISOLATION_PIDp2",
+    "Y_ISOLATION_NNk2",
+    "Y_ISOLATION_NNpi2",
+    "Y_ISOLATION_NNp2",
+    "Y_ISOLATION_IsMuon2",
+    "Y_ISOLATION_NNghost2",
+    "Y_ISOLATION_TRUEID2",
+    "Y_ISOLATION_CHI23",
+    "Y_ISOLATION_SC3",
+    "Y_ISOLATION_BDT3",
+    "Y_ISOLATION_ANGLE3",
+    "Y_ISOLATION_CHARGE3",
+    "Y_ISOLATION_Type3",
+    "Y_ISOLATION_PE3",
+    "Y_ISOLATION_PX3",
+    "Y_ISOLATION_PY3",
+    "Y_ISOLATION_PZ3",
+    "Y_ISOLATION_PIDK3",
+    "Y_ISOLATION_PIDp3",
+    "Y_ISOLATION_NNk3",
+    "Y_ISOLATION_NNpi3",
+    "Y_ISOLATION_NNp3",
+    "Y_ISOLATION_IsMuon3",
+    "Y_ISOLATION_NNghost3",
+    "Y_ISOLATION_TRUEID3",
+    "Y_ISOLATION_CHI24",
+    "Y_ISOLATION_SC4",
+    "Y_ISOLATION_BDT4",
+    "Y_ISOLATION_ANGLE4",
+    "Y_ISOLATION_CHARGE4",
+    "Y_ISOLATION_Type4",
+    "Y_ISOLATION_PE4",
+    "Y_ISOLATION_PX4",
+    "Y_ISOLATION_PY4",
+    "Y_ISOLATION_PZ4",
+    "Y_ISOLATION_PIDK4",
+    "Y_ISOLATION_PIDp4",
+    "Y_ISOLATION_NNk4",
+    "Y_ISOLATION_NNpi4",
+    "Y_ISOLATION_NNp4",
+    "Y_ISOLATION_IsMuon4",
+    "Y_ISOLATION_NNghost4",
+    "Y_ISOLATION_TRUEID4",
+    "runNumber",
+    "eventNumber",
+    "GpsTime",
+    "D0_P",
+  }, 30000000);
+  // TTreeReader processes up to the last entry when given an empty range, so
+  // the event loop is skipped instead, leaving the output tree empty
+  bool empty_range = range.first >= range.second;
   TTreeReader reader(input_tree);
+  if (!empty_range) reader.SetEntriesRange(range.first, range.second);
   TTree output("tree", "tree");
 
   // Load needed branches from ntuple
@@ -473,114 +839,119 @@ void generator_YetAnotherTuple(TTree *input_tree, TString output_prefix) {
   double calculation_some_other_var;
   output.Branch("some_other_var", &calculation_some_other_var);
 
+  // Output tree storage settings
+
   // Define temporary variables
   double calculation_TempStuff;
   double calculation_some_var;
 
-  while (reader.Next()) {
-    // Define variables required by selection
-
-    if ((true) && ((*raw_Y_ISOLATION_BDT) > 0) && ((*raw_piminus_isMuon))) {
-      // Assign values for each output branch in this loop
-      keep_Y_OWNPV_X = (*raw_Y_OWNPV_X);
-      keep_Y_OWNPV_Y = (*raw_Y_OWNPV_Y);
-      keep_Y_OWNPV_Z = (*raw_Y_OWNPV_Z);
-      keep_Y_OWNPV_XERR = (*raw_Y_OWNPV_XERR);
-      keep_Y_OWNPV_YERR = (*raw_Y_OWNPV_YERR);
-      keep_Y_OWNPV_ZERR = (*raw_Y_OWNPV_ZERR);
-      keep_Y_OWNPV_CHI2 = (*raw_Y_OWNPV_CHI2);
-      keep_Y_OWNPV_NDOF = (*raw_Y_OWNPV_NDOF);
-      keep_Y_PT = (*raw_Y_PT);
-      keep_Y_PE = (*raw_Y_PE);
-      keep_Y_PX = (*raw_Y_PX);
-      keep_Y_PY = (*raw_Y_PY);
-      keep_Y_PZ = (*raw_Y_PZ);
-      keep_Y_ISOLATION_CHI2 = (*raw_Y_ISOLATION_CHI2);
-      keep_Y_ISOLATION_ANGLE = (*raw_Y_ISOLATION_ANGLE);
-      keep_Y_ISOLATION_SC = (*raw_Y_ISOLATION_SC);
-      keep_Y_ISOLATION_BDT = (*raw_Y_ISOLATION_BDT);
-      keep_Y_ISOLATION_CHARGE = (*raw_Y_ISOLATION_CHARGE);
-      keep_Y_ISOLATION_Type = (*raw_Y_ISOLATION_Type);
-      keep_Y_ISOLATION_PE = (*raw_Y_ISOLATION_PE);
-      keep_Y_ISOLATION_PX = (*raw_Y_ISOLATION_PX);
-      keep_Y_ISOLATION_PY = (*raw_Y_ISOLATION_PY);
-      keep_Y_ISOLATION_PZ = (*raw_Y_ISOLATION_PZ);
-      keep_Y_ISOLATION_PIDK = (*raw_Y_ISOLATION_PIDK);
-      keep_Y_ISOLATION_PIDp = (*raw_Y_ISOLATION_PIDp);
-      keep_Y_ISOLATION_NNk = (*raw_Y_ISOLATION_NNk);
-      keep_Y_ISOLATION_NNpi = (*raw_Y_ISOLATION_NNpi);
-      keep_Y_ISOLATION_NNp = (*raw_Y_ISOLATION_NNp);
-      keep_Y_ISOLATION_IsMuon = (*raw_Y_ISOLATION_IsMuon);
-      keep_Y_ISOLATION_NNghost = (*raw_Y_ISOLATION_NNghost);
-      keep_Y_ISOLATION_TRUEID = (*raw_Y_ISOLATION_TRUEID);
-      keep_Y_ISOLATION_CHI22 = (*raw_Y_ISOLATION_CHI22);
-      keep_Y_ISOLATION_SC2 = (*raw_Y_ISOLATION_SC2);
-      keep_Y_ISOLATION_ANGLE2 = (*raw_Y_ISOLATION_ANGLE2);
-      keep_Y_ISOLATION_BDT2 = (*raw_Y_ISOLATION_BDT2);
-      keep_Y_ISOLATION_CHARGE2 = (*raw_Y_ISOLATION_CHARGE2);
-      keep_Y_ISOLATION_Type2 = (*raw_Y_ISOLATION_Type2);
-      keep_Y_ISOLATION_PE2 = (*raw_Y_ISOLATION_PE2);
-      keep_Y_ISOLATION_PX2 = (*raw_Y_ISOLATION_PX2);
-      keep_Y_ISOLATION_PY2 = (*raw_Y_ISOLATION_PY2);
-      keep_Y_ISOLATION_PZ2 = (*raw_Y_ISOLATION_PZ2);
-      keep_Y_ISOLATION_PIDK2 = (*raw_Y_ISOLATION_PIDK2);
-      keep_Y_ISOLATION_PIDp2 = (*raw_Y_ISOLATION_PIDp2);
-      keep_Y_ISOLATION_NNk2 = (*raw_Y_ISOLATION_NNk2);
-      keep_Y_ISOLATION_NNpi2 = (*raw_Y_ISOLATION_NNpi2);
-      keep_Y_ISOLATION_NNp2 = (*raw_Y_ISOLATION_NNp2);
-      keep_Y_ISOLATION_IsMuon2 = (*raw_Y_ISOLATION_IsMuon2);
-      keep_Y_ISOLATION_NNghost2 = (*raw_Y_ISOLATION_NNghost2);
-      keep_Y_ISOLATION_TRUEID2 = (*raw_Y_ISOLATION_TRUEID2);
-      keep_Y_ISOLATION_CHI23 = (*raw_Y_ISOLATION_CHI23);
-      keep_Y_ISOLATION_SC3 = (*raw_Y_ISOLATION_SC3);
-      keep_Y_ISOLATION_BDT3 = (*raw_Y_ISOLATION_BDT3);
-      keep_Y_ISOLATION_ANGLE3 = (*raw_Y_ISOLATION_ANGLE3);
-      keep_Y_ISOLATION_CHARGE3 = (*raw_Y_ISOLATION_CHARGE3);
-      keep_Y_ISOLATION_Type3 = (*raw_Y_ISOLATION_Type3);
-      keep_Y_ISOLATION_PE3 = (*raw_Y_ISOLATION_PE3);
-      keep_Y_ISOLATION_PX3 = (*raw_Y_ISOLATION_PX3);
-      keep_Y_ISOLATION_PY3 = (*raw_Y_ISOLATION_PY3);
-      keep_Y_ISOLATION_PZ3 = (*raw_Y_ISOLATION_PZ3);
-      keep_Y_ISOLATION_PIDK3 = (*raw_Y_ISOLATION_PIDK3);
-      keep_Y_ISOLATION_PIDp3 = (*raw_Y_ISOLATION_PIDp3);
-      keep_Y_ISOLATION_NNk3 = (*raw_Y_ISOLATION_NNk3);
-      keep_Y_ISOLATION_NNpi3 = (*raw_Y_ISOLATION_NNpi3);
-      keep_Y_ISOLATION_NNp3 = (*raw_Y_ISOLATION_NNp3);
-      keep_Y_ISOLATION_IsMuon3 = (*raw_Y_ISOLATION_IsMuon3);
-      keep_Y_ISOLATION_NNghost3 = (*raw_Y_ISOLATION_NNghost3);
-      keep_Y_ISOLATION_TRUEID3 = (*raw_Y_ISOLATION_TRUEID3);
-      keep_Y_ISOLATION_CHI24 = (*raw_Y_ISOLATION_CHI24);
-      keep_Y_ISOLATION_SC4 = (*raw_Y_ISOLATION_SC4);
-      keep_Y_ISOLATION_BDT4 = (*raw_Y_ISOLATION_BDT4);
-      keep_Y_ISOLATION_ANGLE4 = (*raw_Y_ISOLATION_ANGLE4);
-      keep_Y_ISOLATION_CHARGE4 = (*raw_Y_ISOLATION_CHARGE4);
-      keep_Y_ISOLATION_Type4 = (*raw_Y_ISOLATION_Type4);
-      keep_Y_ISOLATION_PE4 = (*raw_Y_ISOLATION_PE4);
-      keep_Y_ISOLATION_PX4 = (*raw_Y_ISOLATION_PX4);
-      keep_Y_ISOLATION_PY4 = (*raw_Y_ISOLATION_PY4);
-      keep_Y_ISOLATION_PZ4 = (*raw_Y_ISOLATION_PZ4);
-      keep_Y_ISOLATION_PIDK4 = (*raw_Y_ISOLATION_PIDK4);
-      keep_Y_ISOLATION_PIDp4 = (*raw_Y_ISOLATION_PIDp4);
-      keep_Y_ISOLATION_NNk4 = (*raw_Y_ISOLATION_NNk4);
-      keep_Y_ISOLATION_NNpi4 = (*raw_Y_ISOLATION_NNpi4);
-      keep_Y_ISOLATION_NNp4 = (*raw_Y_ISOLATION_NNp4);
-      keep_Y_ISOLATION_IsMuon4 = (*raw_Y_ISOLATION_IsMuon4);
-      keep_Y_ISOLATION_NNghost4 = (*raw_Y_ISOLATION_NNghost4);
-      keep_Y_ISOLATION_TRUEID4 = (*raw_Y_ISOLATION_TRUEID4);
-      keep_runNumber = (*raw_runNumber);
-      keep_eventNumber = (*raw_eventNumber);
-      keep_GpsTime = (*raw_GpsTime);
-      rename_y_pt = (*raw_Y_PT);
-      rename_y_px = (*raw_Y_PX);
-      rename_y_py = (*raw_Y_PY);
-      rename_y_pz = (*raw_Y_PZ);
-      calculation_TempStuff = (*raw_D0_P)+(*raw_Y_PT);
-      calculation_RandStuff = calculation_TempStuff*3.14;
-      calculation_some_var = rename_y_pt + rename_y_pz;
-      calculation_some_other_var = calculation_some_var*3.14;
-
-      output.Fill();
-    }
+  // Compute variables that are the same for all events once
+
+  while (!empty_range && reader.Next()) {
+    // Compute the variables needed by each cut right before it, and skip the
+    // event as soon as a cut fails
+    if (!((*raw_Y_ISOLATION_BDT) > 0)) continue;
+    if (!((*raw_piminus_isMuon))) continue;
+
+    // Assign values for each output branch in this loop
+    keep_Y_OWNPV_X = (*raw_Y_OWNPV_X);
+    keep_Y_OWNPV_Y = (*raw_Y_OWNPV_Y);
+    keep_Y_OWNPV_Z = (*raw_Y_OWNPV_Z);
+    keep_Y_OWNPV_XERR = (*raw_Y_OWNPV_XERR);
+    keep_Y_OWNPV_YERR = (*raw_Y_OWNPV_YERR);
+    keep_Y_OWNPV_ZERR = (*raw_Y_OWNPV_ZERR);
+    keep_Y_OWNPV_CHI2 = (*raw_Y_OWNPV_CHI2);
+    keep_Y_OWNPV_NDOF = (*raw_Y_OWNPV_NDOF);
+    keep_Y_PT = (*raw_Y_PT);
+    keep_Y_PE = (*raw_Y_PE);
+    keep_Y_PX = (*raw_Y_PX);
+    keep_Y_PY = (*raw_Y_PY);
+    keep_Y_PZ = (*raw_Y_PZ);
+    keep_Y_ISOLATION_CHI2 = (*raw_Y_ISOLATION_CHI2);
+    keep_Y_ISOLATION_ANGLE = (*raw_Y_ISOLATION_ANGLE);
+    keep_Y_ISOLATION_SC = (*raw_Y_ISOLATION_SC);
+    keep_Y_ISOLATION_BDT = (*raw_Y_ISOLATION_BDT);
+    keep_Y_ISOLATION_CHARGE = (*raw_Y_ISOLATION_CHARGE);
+    keep_Y_ISOLATION_Type = (*raw_Y_ISOLATION_Type);
+    keep_Y_ISOLATION_PE = (*raw_Y_ISOLATION_PE);
+    keep_Y_ISOLATION_PX = (*raw_Y_ISOLATION_PX);
+    keep_Y_ISOLATION_PY = (*raw_Y_ISOLATION_PY);
+    keep_Y_ISOLATION_PZ = (*raw_Y_ISOLATION_PZ);
+    keep_Y_ISOLATION_PIDK = (*raw_Y_ISOLATION_PIDK);
+    keep_Y_ISOLATION_PIDp = (*raw_Y_ISOLATION_PIDp);
+    keep_Y_ISOLATION_NNk = (*raw_Y_ISOLATION_NNk);
+    keep_Y_ISOLATION_NNpi = (*raw_Y_ISOLATION_NNpi);
+    keep_Y_ISOLATION_NNp = (*raw_Y_ISOLATION_NNp);
+    keep_Y_ISOLATION_IsMuon = (*raw_Y_ISOLATION_IsMuon);
+    keep_Y_ISOLATION_NNghost = (*raw_Y_ISOLATION_NNghost);
+    keep_Y_ISOLATION_TRUEID = (*raw_Y_ISOLATION_TRUEID);
+    keep_Y_ISOLATION_CHI22 = (*raw_Y_ISOLATION_CHI22);
+    keep_Y_ISOLATION_SC2 = (*raw_Y_ISOLATION_SC2);
+    keep_Y_ISOLATION_ANGLE2 = (*raw_Y_ISOLATION_ANGLE2);
+    keep_Y_ISOLATION_BDT2 = (*raw_Y_ISOLATION_BDT2);
+    keep_Y_ISOLATION_CHARGE2 = (*raw_Y_ISOLATION_CHARGE2);
+    keep_Y_ISOLATION_Type2 = (*raw_Y_ISOLATION_Type2);
+    keep_Y_ISOLATION_PE2 = (*raw_Y_ISOLATION_PE2);
+    keep_Y_ISOLATION_PX2 = (*raw_Y_ISOLATION_PX2);
+    keep_Y_ISOLATION_PY2 = (*raw_Y_ISOLATION_PY2);
+    keep_Y_ISOLATION_PZ2 = (*raw_Y_ISOLATION_PZ2);
+    keep_Y_ISOLATION_PIDK2 = (*raw_Y_ISOLATION_PIDK2);
+    keep_Y_ISOLATION_PIDp2 = (*raw_Y_ISOLATION_PIDp2);
+    keep_Y_ISOLATION_NNk2 = (*raw_Y_ISOLATION_NNk2);
+    keep_Y_ISOLATION_NNpi2 = (*raw_Y_ISOLATION_NNpi2);
+    keep_Y_ISOLATION_NNp2 = (*raw_Y_ISOLATION_NNp2);
+    keep_Y_ISOLATION_IsMuon2 = (*raw_Y_ISOLATION_IsMuon2);
+    keep_Y_ISOLATION_NNghost2 = (*raw_Y_ISOLATION_NNghost2);
+    keep_Y_ISOLATION_TRUEID2 = (*raw_Y_ISOLATION_TRUEID2);
+    keep_Y_ISOLATION_CHI23 = (*raw_Y_ISOLATION_CHI23);
+    keep_Y_ISOLATION_SC3 = (*raw_Y_ISOLATION_SC3);
+    keep_Y_ISOLATION_BDT3 = (*raw_Y_ISOLATION_BDT3);
+    keep_Y_ISOLATION_ANGLE3 = (*raw_Y_ISOLATION_ANGLE3);
+    keep_Y_ISOLATION_CHARGE3 = (*raw_Y_ISOLATION_CHARGE3);
+    keep_Y_ISOLATION_Type3 = (*raw_Y_ISOLATION_Type3);
+    keep_Y_ISOLATION_PE3 = (*raw_Y_ISOLATION_PE3);
+    keep_Y_ISOLATION_PX3 = (*raw_Y_ISOLATION_PX3);
+    keep_Y_ISOLATION_PY3 = (*raw_Y_ISOLATION_PY3);
+    keep_Y_ISOLATION_PZ3 = (*raw_Y_ISOLATION_PZ3);
+    keep_Y_ISOLATION_PIDK3 = (*raw_Y_ISOLATION_PIDK3);
+    keep_Y_ISOLATION_PIDp3 = (*raw_Y_ISOLATION_PIDp3);
+    keep_Y_ISOLATION_NNk3 = (*raw_Y_ISOLATION_NNk3);
+    keep_Y_ISOLATION_NNpi3 = (*raw_Y_ISOLATION_NNpi3);
+    keep_Y_ISOLATION_NNp3 = (*raw_Y_ISOLATION_NNp3);
+    keep_Y_ISOLATION_IsMuon3 = (*raw_Y_ISOLATION_IsMuon3);
+    keep_Y_ISOLATION_NNghost3 = (*raw_Y_ISOLATION_NNghost3);
+    keep_Y_ISOLATION_TRUEID3 = (*raw_Y_ISOLATION_TRUEID3);
+    keep_Y_ISOLATION_CHI24 = (*raw_Y_ISOLATION_CHI24);
+    keep_Y_ISOLATION_SC4 = (*raw_Y_ISOLATION_SC4);
+    keep_Y_ISOLATION_BDT4 = (*raw_Y_ISOLATION_BDT4);
+    keep_Y_ISOLATION_ANGLE4 = (*raw_Y_ISOLATION_ANGLE4);
+    keep_Y_ISOLATION_CHARGE4 = (*raw_Y_ISOLATION_CHARGE4);
+    keep_Y_ISOLATION_Type4 = (*raw_Y_ISOLATION_Type4);
+    keep_Y_ISOLATION_PE4 = (*raw_Y_ISOLATION_PE4);
+    keep_Y_ISOLATION_PX4 = (*raw_Y_ISOLATION_PX4);
+    keep_Y_ISOLATION_PY4 = (*raw_Y_ISOLATION_PY4);
+    keep_Y_ISOLATION_PZ4 = (*raw_Y_ISOLATION_PZ4);
+    keep_Y_ISOLATION_PIDK4 = (*raw_Y_ISOLATION_PIDK4);
+    keep_Y_ISOLATION_PIDp4 = (*raw_Y_ISOLATION_PIDp4);
+    keep_Y_ISOLATION_NNk4 = (*raw_Y_ISOLATION_NNk4);
+    keep_Y_ISOLATION_NNpi4 = (*raw_Y_ISOLATION_NNpi4);
+    keep_Y_ISOLATION_NNp4 = (*raw_Y_ISOLATION_NNp4);
+    keep_Y_ISOLATION_IsMuon4 = (*raw_Y_ISOLATION_IsMuon4);
+    keep_Y_ISOLATION_NNghost4 = (*raw_Y_ISOLATION_NNghost4);
+    keep_Y_ISOLATION_TRUEID4 = (*raw_Y_ISOLATION_TRUEID4);
+    keep_runNumber = (*raw_runNumber);
+    keep_eventNumber = (*raw_eventNumber);
+    keep_GpsTime = (*raw_GpsTime);
+    rename_y_pt = (*raw_Y_PT);
+    rename_y_px = (*raw_Y_PX);
+    rename_y_py = (*raw_Y_PY);
+    rename_y_pz = (*raw_Y_PZ);
+    calculation_TempStuff = (*raw_D0_P)+(*raw_Y_PT);
+    calculation_RandStuff = calculation_TempStuff*3.14;
+    calculation_some_var = rename_y_pt + rename_y_pz;
+    calculation_some_other_var = calculation_some_var*3.14;
+
+    output.Fill();
   }
 
   output_file->Write();
@@ -588,9 +959,10 @@ void generator_YetAnotherTuple(TTree *input_tree, TString output_prefix) {
 }
 
 
-int main(int, char** argv) {
+int main(int argc, char** argv) {
   TString in_prefix  = TString(argv[1]) + "/";
   TString out_prefix = TString(argv[2]) + "/";
+  auto opts = parse_options(argc, argv);
 
   TFile *ntuple = new TFile(in_prefix + "../samples/sample.root");
   cout << "The ntuple being worked on is: " << "../samples/sample.root"
@@ -614,9 +986,9 @@ int main(int, char** argv) {
            friends_TupleB0_DecayTree.push_back(tmp_tree);
            cout << "Handling input tree: " << "TupleB0/DecayTree" << endl;
 
-  generator_ATuple(tree_TupleB0_DecayTree, out_prefix);
-  generator_AnotherTuple(tree_TupleB0_DecayTree, out_prefix);
-  generator_YetAnotherTuple(tree_TupleB0WSPi_DecayTree, out_prefix);
+  generator_ATuple(tree_TupleB0_DecayTree, out_prefix, opts);
+  generator_AnotherTuple(tree_TupleB0_DecayTree, out_prefix, opts);
+  generator_YetAnotherTuple(tree_TupleB0WSPi_DecayTree, out_prefix, opts);
 
   // Cleanups
   cout <<"Cleanups" << endl;
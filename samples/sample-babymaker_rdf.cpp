@@ -0,0 +1,664 @@
+// NOTE: Each output tree is expressed as an RDataFrame graph: calculations are
+//       Define'd, cuts are Filter'ed and output branches are Snapshot'ed.
+//       The graphs of all output trees sharing an input tree branch off a
+//       single RDataFrame, and all snapshots are booked lazily and run
+//       together with RunGraphs, so each input tree is read in one loop.
+//
+//       Requires ROOT >= 6.26 for RDataFrame::Redefine.
+//
+//       Usage: <binary> <input_prefix> <output_prefix> [<num_of_threads>]
+//       Implicit MT is only enabled if the number of threads is given (0 means
+//       all available cores). Note that with implicit MT, the order of the
+//       entries in the output trees is not preserved.
+
+#include <TFile.h>
+#include <TTree.h>
+#include <TString.h>
+#include <TInterpreter.h>
+#include <RVersion.h>
+#include <ROOT/RDataFrame.hxx>
+
+#include <vector>
+#include <string>
+#include <iostream>
+#include <cstdlib>
+
+#include <Math/Vector3D.h>
+#include <Math/Vector4D.h>
+#include <TMath.h>
+
+// System headers
+#include <cmath>
+#include <iostream>
+
+// User headers
+
+
+#if ROOT_VERSION_CODE < ROOT_VERSION(6, 26, 0)
+#error "The RDataFrame template requires ROOT >= 6.26 (RDataFrame::Redefine)"
+#endif
+
+using namespace std;
+using namespace ROOT::Math;
+
+// Make headers visible to the expressions compiled by RDataFrame
+void declare_headers() {
+  gInterpreter->Declare("#include <Math/Vector3D.h>");
+  gInterpreter->Declare("#include <Math/Vector4D.h>");
+  gInterpreter->Declare("#include <TMath.h>");
+  gInterpreter->Declare("#include <cmath>");
+  gInterpreter->Declare("#include <iostream>");
+  gInterpreter->Declare("using namespace std;");
+  gInterpreter->Declare("using namespace ROOT::Math;");
+}
+
+// Define a column, overriding the existing one with the same name if needed
+ROOT::RDF::RNode define(ROOT::RDF::RNode df, string name, string expr) {
+  if (df.HasColumn(name)) return df.Redefine(name, expr);
+  return df.Define(name, expr);
+}
+
+// Load needed branches of each input tree, for all output trees sharing it
+ROOT::RDF::RNode load_TupleB0_DecayTree(ROOT::RDF::RNode df) {
+  df = df.Alias("raw_Y_ISOLATION_BDT", "Y_ISOLATION_BDT");
+  df = df.Alias("raw_Y_PT", "Y_PT");
+  df = df.Alias("raw_Y_PE", "Y_PE");
+  df = df.Alias("raw_Y_PX", "Y_PX");
+  df = df.Alias("raw_Y_PY", "Y_PY");
+  df = df.Alias("raw_Y_PZ", "Y_PZ");
+  df = df.Alias("raw_runNumber", "runNumber");
+  df = df.Alias("raw_eventNumber", "eventNumber");
+  df = df.Alias("raw_GpsTime", "GpsTime");
+  df = df.Alias("raw_random_pt", "random_pt");
+  df = df.Alias("raw_D0_P", "D0_P");
+  return df;
+}
+
+ROOT::RDF::RNode load_TupleB0WSPi_DecayTree(ROOT::RDF::RNode df) {
+  df = df.Alias("raw_Y_ISOLATION_BDT", "Y_ISOLATION_BDT");
+  df = df.Alias("raw_piminus_isMuon", "piminus_isMuon");
+  df = df.Alias("raw_Y_OWNPV_X", "Y_OWNPV_X");
+  df = df.Alias("raw_Y_OWNPV_Y", "Y_OWNPV_Y");
+  df = df.Alias("raw_Y_OWNPV_Z", "Y_OWNPV_Z");
+  df = df.Alias("raw_Y_OWNPV_XERR", "Y_OWNPV_XERR");
+  df = df.Alias("raw_Y_OWNPV_YERR", "Y_OWNPV_YERR");
+  df = df.Alias("raw_Y_OWNPV_ZERR", "Y_OWNPV_ZERR");
+  df = df.Alias("raw_Y_OWNPV_CHI2", "Y_OWNPV_CHI2");
+  df = df.Alias("raw_Y_OWNPV_NDOF", "Y_OWNPV_NDOF");
+  df = df.Alias("raw_Y_PT", "Y_PT");
+  df = df.Alias("raw_Y_PE", "Y_PE");
+  df = df.Alias("raw_Y_PX", "Y_PX");
+  df = df.Alias("raw_Y_PY", "Y_PY");
+  df = df.Alias("raw_Y_PZ", "Y_PZ");
+  df = df.Alias("raw_Y_ISOLATION_CHI2", "Y_ISOLATION_CHI2");
+  df = df.Alias("raw_Y_ISOLATION_ANGLE", "Y_ISOLATION_ANGLE");
+  df = df.Alias("raw_Y_ISOLATION_SC", "Y_ISOLATION_SC");
+  df = df.Alias("raw_Y_ISOLATION_CHARGE", "Y_ISOLATION_CHARGE");
+  df = df.Alias("raw_Y_ISOLATION_Type", "Y_ISOLATION_Type");
+  df = df.Alias("raw_Y_ISOLATION_PE", "Y_ISOLATION_PE");
+  df = df.Alias("raw_Y_ISOLATION_PX", "Y_ISOLATION_PX");
+  df = df.Alias("raw_Y_ISOLATION_PY", "Y_ISOLATION_PY");
+  df = df.Alias("raw_Y_ISOLATION_PZ", "Y_ISOLATION_PZ");
+  df = df.Alias("raw_Y_ISOLATION_PIDK", "Y_ISOLATION_PIDK");
+  df = df.Alias("raw_Y_ISOLATION_PIDp", "Y_ISOLATION_PIDp");
+  df = df.Alias("raw_Y_ISOLATION_NNk", "Y_ISOLATION_NNk");
+  df = df.Alias("raw_Y_ISOLATION_NNpi", "Y_ISOLATION_NNpi");
+  df = df.Alias("raw_Y_ISOLATION_NNp", "Y_ISOLATION_NNp");
+  df = df.Alias("raw_Y_ISOLATION_IsMuon", "Y_ISOLATION_IsMuon");
+  df = df.Alias("raw_Y_ISOLATION_NNghost", "Y_ISOLATION_NNghost");
+  df = df.Alias("raw_Y_ISOLATION_TRUEID", "Y_ISOLATION_TRUEID");
+  df = df.Alias("raw_Y_ISOLATION_CHI22", "Y_ISOLATION_CHI22");
+  df = df.Alias("raw_Y_ISOLATION_SC2", "Y_ISOLATION_SC2");
+  df = df.Alias("raw_Y_ISOLATION_ANGLE2", "Y_ISOLATION_ANGLE2");
+  df = df.Alias("raw_Y_ISOLATION_BDT2", "Y_ISOLATION_BDT2");
+  df = df.Alias("raw_Y_ISOLATION_CHARGE2", "Y_ISOLATION_CHARGE2");
+  df = df.Alias("raw_Y_ISOLATION_Type2", "Y_ISOLATION_Type2");
+  df = df.Alias("raw_Y_ISOLATION_PE2", "Y_ISOLATION_PE2");
+  df = df.Alias("raw_Y_ISOLATION_PX2", "Y_ISOLATION_PX2");
+  df = df.Alias("raw_Y_ISOLATION_PY2", "Y_ISOLATION_PY2");
+  df = df.Alias("raw_Y_ISOLATION_PZ2", "Y_ISOLATION_PZ2");
+  df = df.Alias("raw_Y_ISOLATION_PIDK2", "Y_ISOLATION_PIDK2");
+  df = df.Alias("raw_Y_ISOLATION_PIDp2", "Y_ISOLATION_PIDp2");
+  df = df.Alias("raw_Y_ISOLATION_NNk2", "Y_ISOLATION_NNk2");
+  df = df.Alias("raw_Y_ISOLATION_NNpi2", "Y_ISOLATION_NNpi2");
+  df = df.Alias("raw_Y_ISOLATION_NNp2", "Y_ISOLATION_NNp2");
+  df = df.Alias("raw_Y_ISOLATION_IsMuon2", "Y_ISOLATION_IsMuon2");
+  df = df.Alias("raw_Y_ISOLATION_NNghost2", "Y_ISOLATION_NNghost2");
+  df = df.Alias("raw_Y_ISOLATION_TRUEID2", "Y_ISOLATION_TRUEID2");
+  df = df.Alias("raw_Y_ISOLATION_CHI23", "Y_ISOLATION_CHI23");
+  df = df.Alias("raw_Y_ISOLATION_SC3", "Y_ISOLATION_SC3");
+  df = df.Alias("raw_Y_ISOLATION_BDT3", "Y_ISOLATION_BDT3");
+  df = df.Alias("raw_Y_ISOLATION_ANGLE3", "Y_ISOLATION_ANGLE3");
+  df = df.Alias("raw_Y_ISOLATION_CHARGE3", "Y_ISOLATION_CHARGE3");
+  df = df.Alias("raw_Y_ISOLATION_Type3", "Y_ISOLATION_Type3");
+  df = df.Alias("raw_Y_ISOLATION_PE3", "Y_ISOLATION_PE3");
+  df = df.Alias("raw_Y_ISOLATION_PX3", "Y_ISOLATION_PX3");
+  df = df.Alias("raw_Y_ISOLATION_PY3", "Y_ISOLATION_PY3");
+  df = df.Alias("raw_Y_ISOLATION_PZ3", "Y_ISOLATION_PZ3");
+  df = df.Alias("raw_Y_ISOLATION_PIDK3", "Y_ISOLATION_PIDK3");
+  df = df.Alias("raw_Y_ISOLATION_PIDp3", "Y_ISOLATION_PIDp3");
+  df = df.Alias("raw_Y_ISOLATION_NNk3", "Y_ISOLATION_NNk3");
+  df = df.Alias("raw_Y_ISOLATION_NNpi3", "Y_ISOLATION_NNpi3");
+  df = df.Alias("raw_Y_ISOLATION_NNp3", "Y_ISOLATION_NNp3");
+  df = df.Alias("raw_Y_ISOLATION_IsMuon3", "Y_ISOLATION_IsMuon3");
+  df = df.Alias("raw_Y_ISOLATION_NNghost3", "Y_ISOLATION_NNghost3");
+  df = df.Alias("raw_Y_ISOLATION_TRUEID3", "Y_ISOLATION_TRUEID3");
+  df = df.Alias("raw_Y_ISOLATION_CHI24", "Y_ISOLATION_CHI24");
+  df = df.Alias("raw_Y_ISOLATION_SC4", "Y_ISOLATION_SC4");
+  df = df.Alias("raw_Y_ISOLATION_BDT4", "Y_ISOLATION_BDT4");
+  df = df.Alias("raw_Y_ISOLATION_ANGLE4", "Y_ISOLATION_ANGLE4");
+  df = df.Alias("raw_Y_ISOLATION_CHARGE4", "Y_ISOLATION_CHARGE4");
+  df = df.Alias("raw_Y_ISOLATION_Type4", "Y_ISOLATION_Type4");
+  df = df.Alias("raw_Y_ISOLATION_PE4", "Y_ISOLATION_PE4");
+  df = df.Alias("raw_Y_ISOLATION_PX4", "Y_ISOLATION_PX4");
+  df = df.Alias("raw_Y_ISOLATION_PY4", "Y_ISOLATION_PY4");
+  df = df.Alias("raw_Y_ISOLATION_PZ4", "Y_ISOLATION_PZ4");
+  df = df.Alias("raw_Y_ISOLATION_PIDK4", "Y_ISOLATION_PIDK4");
+  df = df.Alias("raw_Y_ISOLATION_PIDp4", "Y_ISOLATION_PIDp4");
+  df = df.Alias("raw_Y_ISOLATION_NNk4", "Y_ISOLATION_NNk4");
+  df = df.Alias("raw_Y_ISOLATION_NNpi4", "Y_ISOLATION_NNpi4");
+  df = df.Alias("raw_Y_ISOLATION_NNp4", "Y_ISOLATION_NNp4");
+  df = df.Alias("raw_Y_ISOLATION_IsMuon4", "Y_ISOLATION_IsMuon4");
+  df = df.Alias("raw_Y_ISOLATION_NNghost4", "Y_ISOLATION_NNghost4");
+  df = df.Alias("raw_Y_ISOLATION_TRUEID4", "Y_ISOLATION_TRUEID4");
+  df = df.Alias("raw_runNumber", "runNumber");
+  df = df.Alias("raw_eventNumber", "eventNumber");
+  df = df.Alias("raw_GpsTime", "GpsTime");
+  df = df.Alias("raw_D0_P", "D0_P");
+  return df;
+}
+
+// Generator for each output tree: one tree per file
+ROOT::RDF::RResultHandle generator_ATuple(ROOT::RDF::RNode df, TString output_prefix) {
+  cout << "Generating output ntuple: " << "ATuple" << endl;
+
+  // Define variables that only depend on literals; like any other column,
+  // RDataFrame still evaluates them for each event
+
+  // Define variables required by selection
+
+  df = df.Filter(R"cut(true)cut");
+  df = df.Filter(R"cut(raw_Y_ISOLATION_BDT > 0)cut");
+  df = df.Filter(R"cut(raw_Y_PT > 10000)cut");
+
+  // Define variables for each output branch
+  df = define(df, "keep_Y_PT", R"expr(static_cast<double>(raw_Y_PT))expr");
+  df = define(df, "keep_Y_PE", R"expr(static_cast<double>(raw_Y_PE))expr");
+  df = define(df, "keep_Y_PX", R"expr(static_cast<double>(raw_Y_PX))expr");
+  df = define(df, "keep_Y_PY", R"expr(static_cast<double>(raw_Y_PY))expr");
+  df = define(df, "keep_Y_PZ", R"expr(static_cast<double>(raw_Y_PZ))expr");
+  df = define(df, "keep_runNumber", R"expr(static_cast<UInt_t>(raw_runNumber))expr");
+  df = define(df, "keep_eventNumber", R"expr(static_cast<ULong64_t>(raw_eventNumber))expr");
+  df = define(df, "keep_GpsTime", R"expr(static_cast<ULong64_t>(raw_GpsTime))expr");
+  df = define(df, "keep_random_pt", R"expr(static_cast<double>(raw_random_pt))expr");
+  df = define(df, "rename_y_pt", R"expr(static_cast<double>(raw_Y_PT))expr");
+  df = define(df, "rename_y_px", R"expr(static_cast<double>(raw_Y_PX))expr");
+  df = define(df, "rename_y_py", R"expr(static_cast<double>(raw_Y_PY))expr");
+  df = define(df, "rename_y_pz", R"expr(static_cast<double>(raw_Y_PZ))expr");
+  df = define(df, "calculation_TempStuff", R"expr(static_cast<double>(raw_D0_P+raw_Y_PT))expr");
+  df = define(df, "calculation_RandStuff", R"expr(static_cast<double>(calculation_TempStuff*3.14))expr");
+  df = define(df, "calculation_some_var", R"expr(static_cast<double>(rename_y_pt + rename_y_pz))expr");
+  df = define(df, "calculation_some_other_var", R"expr(static_cast<double>(calculation_some_var*3.14))expr");
+  df = define(df, "calculation_alt_def", R"expr(static_cast<double>(raw_Y_PE))expr");
+
+  // Define output branches
+  vector<string> output_brs;
+  df = define(df, "Y_PT", "keep_Y_PT");
+  output_brs.push_back("Y_PT");
+  df = define(df, "Y_PE", "keep_Y_PE");
+  output_brs.push_back("Y_PE");
+  df = define(df, "Y_PX", "keep_Y_PX");
+  output_brs.push_back("Y_PX");
+  df = define(df, "Y_PY", "keep_Y_PY");
+  output_brs.push_back("Y_PY");
+  df = define(df, "Y_PZ", "keep_Y_PZ");
+  output_brs.push_back("Y_PZ");
+  df = define(df, "runNumber", "keep_runNumber");
+  output_brs.push_back("runNumber");
+  df = define(df, "eventNumber", "keep_eventNumber");
+  output_brs.push_back("eventNumber");
+  df = define(df, "GpsTime", "keep_GpsTime");
+  output_brs.push_back("GpsTime");
+  df = define(df, "random_pt", "keep_random_pt");
+  output_brs.push_back("random_pt");
+  df = define(df, "y_pt", "rename_y_pt");
+  output_brs.push_back("y_pt");
+  df = define(df, "y_px", "rename_y_px");
+  output_brs.push_back("y_px");
+  df = define(df, "y_py", "rename_y_py");
+  output_brs.push_back("y_py");
+  df = define(df, "y_pz", "rename_y_pz");
+  output_brs.push_back("y_pz");
+  df = define(df, "RandStuff", "calculation_RandStuff");
+  output_brs.push_back("RandStuff");
+  df = define(df, "some_other_var", "calculation_some_other_var");
+  output_brs.push_back("some_other_var");
+  df = define(df, "alt_def", "calculation_alt_def");
+  output_brs.push_back("alt_def");
+
+  ROOT::RDF::RSnapshotOptions opts;
+  opts.fLazy = true;
+  return df.Snapshot("tree", string(output_prefix + "ATuple" + ".root"), output_brs, opts);
+}
+
+ROOT::RDF::RResultHandle generator_AnotherTuple(ROOT::RDF::RNode df, TString output_prefix) {
+  cout << "Generating output ntuple: " << "AnotherTuple" << endl;
+
+  // Define variables that only depend on literals; like any other column,
+  // RDataFrame still evaluates them for each event
+
+  // Define variables required by selection
+  df = define(df, "rename_b0_pt", R"expr(static_cast<double>(raw_Y_PT))expr");
+
+  df = df.Filter(R"cut(true)cut");
+  df = df.Filter(R"cut(raw_Y_ISOLATION_BDT > 0)cut");
+  df = df.Filter(R"cut(rename_b0_pt > 10000)cut");
+  df = df.Filter(R"cut(raw_Y_PE > (100 * pow(10, 3)))cut");
+
+  // Define variables for each output branch
+  df = define(df, "rename_b0_pt", R"expr(static_cast<double>(raw_Y_PT))expr");
+  df = define(df, "keep_Y_PT", R"expr(static_cast<double>(raw_Y_PT))expr");
+  df = define(df, "keep_Y_PE", R"expr(static_cast<double>(raw_Y_PE))expr");
+  df = define(df, "keep_Y_PX", R"expr(static_cast<double>(raw_Y_PX))expr");
+  df = define(df, "keep_Y_PY", R"expr(static_cast<double>(raw_Y_PY))expr");
+  df = define(df, "keep_Y_PZ", R"expr(static_cast<double>(raw_Y_PZ))expr");
+  df = define(df, "keep_runNumber", R"expr(static_cast<UInt_t>(raw_runNumber))expr");
+  df = define(df, "keep_eventNumber", R"expr(static_cast<ULong64_t>(raw_eventNumber))expr");
+  df = define(df, "keep_GpsTime", R"expr(static_cast<ULong64_t>(raw_GpsTime))expr");
+  df = define(df, "keep_random_pt", R"expr(static_cast<double>(raw_random_pt))expr");
+  df = define(df, "calculation_TempStuff", R"expr(static_cast<double>(raw_D0_P+raw_Y_PT))expr");
+  df = define(df, "calculation_RandStuff", R"expr(static_cast<double>(calculation_TempStuff*3.14))expr");
+
+  // Define output branches
+  vector<string> output_brs;
+  df = define(df, "b0_pt", "rename_b0_pt");
+  output_brs.push_back("b0_pt");
+  df = define(df, "Y_PT", "keep_Y_PT");
+  output_brs.push_back("Y_PT");
+  df = define(df, "Y_PE", "keep_Y_PE");
+  output_brs.push_back("Y_PE");
+  df = define(df, "Y_PX", "keep_Y_PX");
+  output_brs.push_back("Y_PX");
+  df = define(df, "Y_PY", "keep_Y_PY");
+  output_brs.push_back("Y_PY");
+  df = define(df, "Y_PZ", "keep_Y_PZ");
+  output_brs.push_back("Y_PZ");
+  df = define(df, "runNumber", "keep_runNumber");
+  output_brs.push_back("runNumber");
+  df = define(df, "eventNumber", "keep_eventNumber");
+  output_brs.push_back("eventNumber");
+  df = define(df, "GpsTime", "keep_GpsTime");
+  output_brs.push_back("GpsTime");
+  df = define(df, "random_pt", "keep_random_pt");
+  output_brs.push_back("random_pt");
+  df = define(df, "RandStuff", "calculation_RandStuff");
+  output_brs.push_back("RandStuff");
+
+  ROOT::RDF::RSnapshotOptions opts;
+  opts.fLazy = true;
+  return df.Snapshot("tree", string(output_prefix + "AnotherTuple" + ".root"), output_brs, opts);
+}
+
+ROOT::RDF::RResultHandle generator_YetAnotherTuple(ROOT::RDF::RNode df, TString output_prefix) {
+  cout << "Generating output ntuple: " << "YetAnotherTuple" << endl;
+
+  // Define variables that only depend on literals; like any other column,
+  // RDataFrame still evaluates them for each event
+
+  // Define variables required by selection
+
+  df = df.Filter(R"cut(true)cut");
+  df = df.Filter(R"cut(raw_Y_ISOLATION_BDT > 0)cut");
+  df = df.Filter(R"cut(raw_piminus_isMuon)cut");
+
+  // Define variables for each output branch
+  df = define(df, "keep_Y_OWNPV_X", R"expr(static_cast<double>(raw_Y_OWNPV_X))expr");
+  df = define(df, "keep_Y_OWNPV_Y", R"expr(static_cast<double>(raw_Y_OWNPV_Y))expr");
+  df = define(df, "keep_Y_OWNPV_Z", R"expr(static_cast<double>(raw_Y_OWNPV_Z))expr");
+  df = define(df, "keep_Y_OWNPV_XERR", R"expr(static_cast<double>(raw_Y_OWNPV_XERR))expr");
+  df = define(df, "keep_Y_OWNPV_YERR", R"expr(static_cast<double>(raw_Y_OWNPV_YERR))expr");
+  df = define(df, "keep_Y_OWNPV_ZERR", R"expr(static_cast<double>(raw_Y_OWNPV_ZERR))expr");
+  df = define(df, "keep_Y_OWNPV_CHI2", R"expr(static_cast<double>(raw_Y_OWNPV_CHI2))expr");
+  df = define(df, "keep_Y_OWNPV_NDOF", R"expr(static_cast<int32_t>(raw_Y_OWNPV_NDOF))expr");
+  df = define(df, "keep_Y_PT", R"expr(static_cast<double>(raw_Y_PT))expr");
+  df = define(df, "keep_Y_PE", R"expr(static_cast<double>(raw_Y_PE))expr");
+  df = define(df, "keep_Y_PX", R"expr(static_cast<double>(raw_Y_PX))expr");
+  df = define(df, "keep_Y_PY", R"expr(static_cast<double>(raw_Y_PY))expr");
+  df = define(df, "keep_Y_PZ", R"expr(static_cast<double>(raw_Y_PZ))expr");
+  df = define(df, "keep_Y_ISOLATION_CHI2", R"expr(static_cast<double>(raw_Y_ISOLATION_CHI2))expr");
+  df = define(df, "keep_Y_ISOLATION_ANGLE", R"expr(static_cast<double>(raw_Y_ISOLATION_ANGLE))expr");
+  df = define(df, "keep_Y_ISOLATION_SC", R"expr(static_cast<int32_t>(raw_Y_ISOLATION_SC))expr");
+  df = define(df, "keep_Y_ISOLATION_BDT", R"expr(static_cast<double>(raw_Y_ISOLATION_BDT))expr");
+  df = define(df, "keep_Y_ISOLATION_CHARGE", R"expr(static_cast<float>(raw_Y_ISOLATION_CHARGE))expr");
+  df = define(df, "keep_Y_ISOLATION_Type", R"expr(static_cast<float>(raw_Y_ISOLATION_Type))expr");
+  df = define(df, "keep_Y_ISOLATION_PE", R"expr(static_cast<float>(raw_Y_ISOLATION_PE))expr");
+  df = define(df, "keep_Y_ISOLATION_PX", R"expr(static_cast<float>(raw_Y_ISOLATION_PX))expr");
+  df = define(df, "keep_Y_ISOLATION_PY", R"expr(static_cast<float>(raw_Y_ISOLATION_PY))expr");
+  df = define(df, "keep_Y_ISOLATION_PZ", R"expr(static_cast<float>(raw_Y_ISOLATION_PZ))expr");
+  df = define(df, "keep_Y_ISOLATION_PIDK", R"expr(static_cast<float>(raw_Y_ISOLATION_PIDK))expr");
+  df = define(df, "keep_Y_ISOLATION_PIDp", R"expr(static_cast<float>(raw_Y_ISOLATION_PIDp))expr");
+  df = define(df, "keep_Y_ISOLATION_NNk", R"expr(static_cast<float>(raw_Y_ISOLATION_NNk))expr");
+  df = define(df, "keep_Y_ISOLATION_NNpi", R"expr(static_cast<float>(raw_Y_ISOLATION_NNpi))expr");
+  df = define(df, "keep_Y_ISOLATION_NNp", R"expr(static_cast<float>(raw_Y_ISOLATION_NNp))expr");
+  df = define(df, "keep_Y_ISOLATION_IsMuon", R"expr(static_cast<float>(raw_Y_ISOLATION_IsMuon))expr");
+  df = define(df, "keep_Y_ISOLATION_NNghost", R"expr(static_cast<float>(raw_Y_ISOLATION_NNghost))expr");
+  df = define(df, "keep_Y_ISOLATION_TRUEID", R"expr(static_cast<int32_t>(raw_Y_ISOLATION_TRUEID))expr");
+  df = define(df, "keep_Y_ISOLATION_CHI22", R"expr(static_cast<double>(raw_Y_ISOLATION_CHI22))expr");
+  df = define(df, "keep_Y_ISOLATION_SC2", R"expr(static_cast<int32_t>(raw_Y_ISOLATION_SC2))expr");
+  df = define(df, "keep_Y_ISOLATION_ANGLE2", R"expr(static_cast<double>(raw_Y_ISOLATION_ANGLE2))expr");
+  df = define(df, "keep_Y_ISOLATION_BDT2", R"expr(static_cast<double>(raw_Y_ISOLATION_BDT2))expr");
+  df = define(df, "keep_Y_ISOLATION_CHARGE2", R"expr(static_cast<float>(raw_Y_ISOLATION_CHARGE2))expr");
+  df = define(df, "keep_Y_ISOLATION_Type2", R"expr(static_cast<float>(raw_Y_ISOLATION_Type2))expr");
+  df = define(df, "keep_Y_ISOLATION_PE2", R"expr(static_cast<float>(raw_Y_ISOLATION_PE2))expr");
+  df = define(df, "keep_Y_ISOLATION_PX2", R"expr(static_cast<float>(raw_Y_ISOLATION_PX2))expr");
+  df = define(df, "keep_Y_ISOLATION_PY2", R"expr(static_cast<float>(raw_Y_ISOLATION_PY2))expr");
+  df = define(df, "keep_Y_ISOLATION_PZ2", R"expr(static_cast<float>(raw_Y_ISOLATION_PZ2))expr");
+  df = define(df, "keep_Y_ISOLATION_PIDK2", R"expr(static_cast<float>(raw_Y_ISOLATION_PIDK2))expr");
+  df = define(df, "keep_Y_ISOLATION_PIDp2", R"expr(static_cast<float>(raw_Y_ISOLATION_PIDp2))expr");
+  df = define(df, "keep_Y_ISOLATION_NNk2", R"expr(static_cast<float>(raw_Y_ISOLATION_NNk2))expr");
+  df = define(df, "keep_Y_ISOLATION_NNpi2", R"expr(static_cast<float>(raw_Y_ISOLATION_NNpi2))expr");
+  df = define(df, "keep_Y_ISOLATION_NNp2", R"expr(static_cast<float>(raw_Y_ISOLATION_NNp2))expr");
+  df = define(df, "keep_Y_ISOLATION_IsMuon2", R"expr(static_cast<float>(raw_Y_ISOLATION_IsMuon2))expr");
+  df = define(df, "keep_Y_ISOLATION_NNghost2", R"expr(static_cast<float>(raw_Y_ISOLATION_NNghost2))expr");
+  df = define(df, "keep_Y_ISOLATION_TRUEID2", R"expr(static_cast<int32_t>(raw_Y_ISOLATION_TRUEID2))expr");
+  df = define(df, "keep_Y_ISOLATION_CHI23", R"expr(static_cast<double>(raw_Y_ISOLATION_CHI23))expr");
+  df = define(df, "keep_Y_ISOLATION_SC3", R"expr(static_cast<int32_t>(raw_Y_ISOLATION_SC3))expr");
+  df = define(df, "keep_Y_ISOLATION_BDT3", R"expr(static_cast<double>(raw_Y_ISOLATION_BDT3))expr");
+  df = define(df, "keep_Y_ISOLATION_ANGLE3", R"expr(static_cast<double>(raw_Y_ISOLATION_ANGLE3))expr");
+  df = define(df, "keep_Y_ISOLATION_CHARGE3", R"expr(static_cast<float>(raw_Y_ISOLATION_CHARGE3))expr");
+  df = define(df, "keep_Y_ISOLATION_Type3", R"expr(static_cast<float>(raw_Y_ISOLATION_Type3))expr");
+  df = define(df, "keep_Y_ISOLATION_PE3", R"expr(static_cast<float>(raw_Y_ISOLATION_PE3))expr");
+  df = define(df, "keep_Y_ISOLATION_PX3", R"expr(static_cast<float>(raw_Y_ISOLATION_PX3))expr");
+  df = define(df, "keep_Y_ISOLATION_PY3", R"expr(static_cast<float>(raw_Y_ISOLATION_PY3))expr");
+  df = define(df, "keep_Y_ISOLATION_PZ3", R"expr(static_cast<float>(raw_Y_ISOLATION_PZ3))expr");
+  df = define(df, "keep_Y_ISOLATION_PIDK3", R"expr(static_cast<float>(raw_Y_ISOLATION_PIDK3))expr");
+  df = define(df, "keep_Y_ISOLATION_PIDp3", R"expr(static_cast<float>(raw_Y_ISOLATION_PIDp3))expr");
+  df = define(df, "keep_Y_ISOLATION_NNk3", R"expr(static_cast<float>(raw_Y_ISOLATION_NNk3))expr");
+  df = define(df, "keep_Y_ISOLATION_NNpi3", R"expr(static_cast<float>(raw_Y_ISOLATION_NNpi3))expr");
+  df = define(df, "keep_Y_ISOLATION_NNp3", R"expr(static_cast<float>(raw_Y_ISOLATION_NNp3))expr");
+  df = define(df, "keep_Y_ISOLATION_IsMuon3", R"expr(static_cast<float>(raw_Y_ISOLATION_IsMuon3))expr");
+  df = define(df, "keep_Y_ISOLATION_NNghost3", R"expr(static_cast<float>(raw_Y_ISOLATION_NNghost3))expr");
+  df = define(df, "keep_Y_ISOLATION_TRUEID3", R"expr(static_cast<int32_t>(raw_Y_ISOLATION_TRUEID3))expr");
+  df = define(df, "keep_Y_ISOLATION_CHI24", R"expr(static_cast<double>(raw_Y_ISOLATION_CHI24))expr");
+  df = define(df, "keep_Y_ISOLATION_SC4", R"expr(static_cast<int32_t>(raw_Y_ISOLATION_SC4))expr");
+  df = define(df, "keep_Y_ISOLATION_BDT4", R"expr(static_cast<double>(raw_Y_ISOLATION_BDT4))expr");
+  df = define(df, "keep_Y_ISOLATION_ANGLE4", R"expr(static_cast<double>(raw_Y_ISOLATION_ANGLE4))expr");
+  df = define(df, "keep_Y_ISOLATION_CHARGE4", R"expr(static_cast<float>(raw_Y_ISOLATION_CHARGE4))expr");
+  df = define(df, "keep_Y_ISOLATION_Type4", R"expr(static_cast<float>(raw_Y_ISOLATION_Type4))expr");
+  df = define(df, "keep_Y_ISOLATION_PE4", R"expr(static_cast<float>(raw_Y_ISOLATION_PE4))expr");
+  df = define(df, "keep_Y_ISOLATION_PX4", R"expr(static_cast<float>(raw_Y_ISOLATION_PX4))expr");
+  df = define(df, "keep_Y_ISOLATION_PY4", R"expr(static_cast<float>(raw_Y_ISOLATION_PY4))expr");
+  df = define(df, "keep_Y_ISOLATION_PZ4", R"expr(static_cast<float>(raw_Y_ISOLATION_PZ4))expr");
+  df = define(df, "keep_Y_ISOLATION_PIDK4", R"expr(static_cast<float>(raw_Y_ISOLATION_PIDK4))expr");
+  df = define(df, "keep_Y_ISOLATION_PIDp4", R"expr(static_cast<float>(raw_Y_ISOLATION_PIDp4))expr");
+  df = define(df, "keep_Y_ISOLATION_NNk4", R"expr(static_cast<float>(raw_Y_ISOLATION_NNk4))expr");
+  df = define(df, "keep_Y_ISOLATION_NNpi4", R"expr(static_cast<float>(raw_Y_ISOLATION_NNpi4))expr");
+  df = define(df, "keep_Y_ISOLATION_NNp4", R"expr(static_cast<float>(raw_Y_ISOLATION_NNp4))expr");
+  df = define(df, "keep_Y_ISOLATION_IsMuon4", R"expr(static_cast<float>(raw_Y_ISOLATION_IsMuon4))expr");
+  df = define(df, "keep_Y_ISOLATION_NNghost4", R"expr(static_cast<float>(raw_Y_ISOLATION_NNghost4))expr");
+  df = define(df, "keep_Y_ISOLATION_TRUEID4", R"expr(static_cast<int32_t>(raw_Y_ISOLATION_TRUEID4))expr");
+  df = define(df, "keep_runNumber", R"expr(static_cast<UInt_t>(raw_runNumber))expr");
+  df = define(df, "keep_eventNumber", R"expr(static_cast<ULong64_t>(raw_eventNumber))expr");
+  df = define(df, "keep_GpsTime", R"expr(static_cast<ULong64_t>(raw_GpsTime))expr");
+  df = define(df, "rename_y_pt", R"expr(static_cast<double>(raw_Y_PT))expr");
+  df = define(df, "rename_y_px", R"expr(static_cast<double>(raw_Y_PX))expr");
+  df = define(df, "rename_y_py", R"expr(static_cast<double>(raw_Y_PY))expr");
+  df = define(df, "rename_y_pz", R"expr(static_cast<double>(raw_Y_PZ))expr");
+  df = define(df, "calculation_TempStuff", R"expr(static_cast<double>(raw_D0_P+raw_Y_PT))expr");
+  df = define(df, "calculation_RandStuff", R"expr(static_cast<double>(calculation_TempStuff*3.14))expr");
+  df = define(df, "calculation_some_var", R"expr(static_cast<double>(rename_y_pt + rename_y_pz))expr");
+  df = define(df, "calculation_some_other_var", R"expr(static_cast<double>(calculation_some_var*3.14))expr");
+
+  // Define output branches
+  vector<string> output_brs;
+  df = define(df, "Y_OWNPV_X", "keep_Y_OWNPV_X");
+  output_brs.push_back("Y_OWNPV_X");
+  df = define(df, "Y_OWNPV_Y", "keep_Y_OWNPV_Y");
+  output_brs.push_back("Y_OWNPV_Y");
+  df = define(df, "Y_OWNPV_Z", "keep_Y_OWNPV_Z");
+  output_brs.push_back("Y_OWNPV_Z");
+  df = define(df, "Y_OWNPV_XERR", "keep_Y_OWNPV_XERR");
+  output_brs.push_back("Y_OWNPV_XERR");
+  df = define(df, "Y_OWNPV_YERR", "keep_Y_OWNPV_YERR");
+  output_brs.push_back("Y_OWNPV_YERR");
+  df = define(df, "Y_OWNPV_ZERR", "keep_Y_OWNPV_ZERR");
+  output_brs.push_back("Y_OWNPV_ZERR");
+  df = define(df, "Y_OWNPV_CHI2", "keep_Y_OWNPV_CHI2");
+  output_brs.push_back("Y_OWNPV_CHI2");
+  df = define(df, "Y_OWNPV_NDOF", "keep_Y_OWNPV_NDOF");
+  output_brs.push_back("Y_OWNPV_NDOF");
+  df = define(df, "Y_PT", "keep_Y_PT");
+  output_brs.push_back("Y_PT");
+  df = define(df, "Y_PE", "keep_Y_PE");
+  output_brs.push_back("Y_PE");
+  df = define(df, "Y_PX", "keep_Y_PX");
+  output_brs.push_back("Y_PX");
+  df = define(df, "Y_PY", "keep_Y_PY");
+  output_brs.push_back("Y_PY");
+  df = define(df, "Y_PZ", "keep_Y_PZ");
+  output_brs.push_back("Y_PZ");
+  df = define(df, "Y_ISOLATION_CHI2", "keep_Y_ISOLATION_CHI2");
+  output_brs.push_back("Y_ISOLATION_CHI2");
+  df = define(df, "Y_ISOLATION_ANGLE", "keep_Y_ISOLATION_ANGLE");
+  output_brs.push_back("Y_ISOLATION_ANGLE");
+  df = define(df, "Y_ISOLATION_SC", "keep_Y_ISOLATION_SC");
+  output_brs.push_back("Y_ISOLATION_SC");
+  df = define(df, "Y_ISOLATION_BDT", "keep_Y_ISOLATION_BDT");
+  output_brs.push_back("Y_ISOLATION_BDT");
+  df = define(df, "Y_ISOLATION_CHARGE", "keep_Y_ISOLATION_CHARGE");
+  output_brs.push_back("Y_ISOLATION_CHARGE");
+  df = define(df, "Y_ISOLATION_Type", "keep_Y_ISOLATION_Type");
+  output_brs.push_back("Y_ISOLATION_Type");
+  df = define(df, "Y_ISOLATION_PE", "keep_Y_ISOLATION_PE");
+  output_brs.push_back("Y_ISOLATION_PE");
+  df = define(df, "Y_ISOLATION_PX", "keep_Y_ISOLATION_PX");
+  output_brs.push_back("Y_ISOLATION_PX");
+  df = define(df, "Y_ISOLATION_PY", "keep_Y_ISOLATION_PY");
+  output_brs.push_back("Y_ISOLATION_PY");
+  df = define(df, "Y_ISOLATION_PZ", "keep_Y_ISOLATION_PZ");
+  output_brs.push_back("Y_ISOLATION_PZ");
+  df = define(df, "Y_ISOLATION_PIDK", "keep_Y_ISOLATION_PIDK");
+  output_brs.push_back("Y_ISOLATION_PIDK");
+  df = define(df, "Y_ISOLATION_PIDp", "keep_Y_ISOLATION_PIDp");
+  output_brs.push_back("Y_ISOLATION_PIDp");
+  df = define(df, "Y_ISOLATION_NNk", "keep_Y_ISOLATION_NNk");
+  output_brs.push_back("Y_ISOLATION_NNk");
+  df = define(df, "Y_ISOLATION_NNpi", "keep_Y_ISOLATION_NNpi");
+  output_brs.push_back("Y_ISOLATION_NNpi");
+  df = define(df, "Y_ISOLATION_NNp", "keep_Y_ISOLATION_NNp");
+  output_brs.push_back("Y_ISOLATION_NNp");
+  df = define(df, "Y_ISOLATION_IsMuon", "keep_Y_ISOLATION_IsMuon");
+  output_brs.push_back("Y_ISOLATION_IsMuon");
+  df = define(df, "Y_ISOLATION_NNghost", "keep_Y_ISOLATION_NNghost");
+  output_brs.push_back("Y_ISOLATION_NNghost");
+  df = define(df, "Y_ISOLATION_TRUEID", "keep_Y_ISOLATION_TRUEID");
+  output_brs.push_back("Y_ISOLATION_TRUEID");
+  df = define(df, "Y_ISOLATION_CHI22", "keep_Y_ISOLATION_CHI22");
+  output_brs.push_back("Y_ISOLATION_CHI22");
+  df = define(df, "Y_ISOLATION_SC2", "keep_Y_ISOLATION_SC2");
+  output_brs.push_back("Y_ISOLATION_SC2");
+  df = define(df, "Y_ISOLATION_ANGLE2", "keep_Y_ISOLATION_ANGLE2");
+  output_brs.push_back("Y_ISOLATION_ANGLE2");
+  df = define(df, "Y_ISOLATION_BDT2", "keep_Y_ISOLATION_BDT2");
+  output_brs.push_back("Y_ISOLATION_BDT2");
+  df = define(df, "Y_ISOLATION_CHARGE2", "keep_Y_ISOLATION_CHARGE2");
+  output_brs.push_back("Y_ISOLATION_CHARGE2");
+  df = define(df, "Y_ISOLATION_Type2", "keep_Y_ISOLATION_Type2");
+  output_brs.push_back("Y_ISOLATION_Type2");
+  df = define(df, "Y_ISOLATION_PE2", "keep_Y_ISOLATION_PE2");
+  output_brs.push_back("Y_ISOLATION_PE2");
+  df = define(df, "Y_ISOLATION_PX2", "keep_Y_ISOLATION_PX2");
+  output_brs.push_back("Y_ISOLATION_PX2");
+  df = define(df, "Y_ISOLATION_PY2", "keep_Y_ISOLATION_PY2");
+  output_brs.push_back("Y_ISOLATION_PY2");
+  df = define(df, "Y_ISOLATION_PZ2", "keep_Y_ISOLATION_PZ2");
+  output_brs.push_back("Y_ISOLATION_PZ2");
+  df = define(df, "Y_ISOLATION_PIDK2", "keep_Y_ISOLATION_PIDK2");
+  output_brs.push_back("Y_ISOLATION_PIDK2");
+  df = define(df, "Y_ISOLATION_PIDp2", "keep_Y_ISOLATION_PIDp2");
+  output_brs.push_back("Y_ISOLATION_PIDp2");
+  df = define(df, "Y_ISOLATION_NNk2", "keep_Y_ISOLATION_NNk2");
+  output_brs.push_back("Y_ISOLATION_NNk2");
+  df = define(df, "Y_ISOLATION_NNpi2", "keep_Y_ISOLATION_NNpi2");
+  output_brs.push_back("Y_ISOLATION_NNpi2");
+  df = define(df, "Y_ISOLATION_NNp2", "keep_Y_ISOLATION_NNp2");
+  output_brs.push_back("Y_ISOLATION_NNp2");
+  df = define(df, "Y_ISOLATION_IsMuon2", "keep_Y_ISOLATION_IsMuon2");
+  output_brs.push_back("Y_ISOLATION_IsMuon2");
+  df = define(df, "Y_ISOLATION_NNghost2", "keep_Y_ISOLATION_NNghost2");
+  output_brs.push_back("Y_ISOLATION_NNghost2");
+  df = define(df, "Y_ISOLATION_TRUEID2", "keep_Y_ISOLATION_TRUEID2");
+  output_brs.push_back("Y_ISOLATION_TRUEID2");
+  df = define(df, "Y_ISOLATION_CHI23", "keep_Y_ISOLATION_CHI23");
+  output_brs.push_back("Y_ISOLATION_CHI23");
+  df = define(df, "Y_ISOLATION_SC3", "keep_Y_ISOLATION_SC3");
+  output_brs.push_back("Y_ISOLATION_SC3");
+  df = define(df, "Y_ISOLATION_BDT3", "keep_Y_ISOLATION_BDT3");
+  output_brs.push_back("Y_ISOLATION_BDT3");
+  df = define(df, "Y_ISOLATION_ANGLE3", "keep_Y_ISOLATION_ANGLE3");
+  output_brs.push_back("Y_ISOLATION_ANGLE3");
+  df = define(df, "Y_ISOLATION_CHARGE3", "keep_Y_ISOLATION_CHARGE3");
+  output_brs.push_back("Y_ISOLATION_CHARGE3");
+  df = define(df, "Y_ISOLATION_Type3", "keep_Y_ISOLATION_Type3");
+  output_brs.push_back("Y_ISOLATION_Type3");
+  df = define(df, "Y_ISOLATION_PE3", "keep_Y_ISOLATION_PE3");
+  output_brs.push_back("Y_ISOLATION_PE3");
+  df = define(df, "Y_ISOLATION_PX3", "keep_Y_ISOLATION_PX3");
+  output_brs.push_back("Y_ISOLATION_PX3");
+  df = define(df, "Y_ISOLATION_PY3", "keep_Y_ISOLATION_PY3");
+  output_brs.push_back("Y_ISOLATION_PY3");
+  df = define(df, "Y_ISOLATION_PZ3", "keep_Y_ISOLATION_PZ3");
+  output_brs.push_back("Y_ISOLATION_PZ3");
+  df = define(df, "Y_ISOLATION_PIDK3", "keep_Y_ISOLATION_PIDK3");
+  output_brs.push_back("Y_ISOLATION_PIDK3");
+  df = define(df, "Y_ISOLATION_PIDp3", "keep_Y_ISOLATION_PIDp3");
+  output_brs.push_back("Y_ISOLATION_PIDp3");
+  df = define(df, "Y_ISOLATION_NNk3", "keep_Y_ISOLATION_NNk3");
+  output_brs.push_back("Y_ISOLATION_NNk3");
+  df = define(df, "Y_ISOLATION_NNpi3", "keep_Y_ISOLATION_NNpi3");
+  output_brs.push_back("Y_ISOLATION_NNpi3");
+  df = define(df, "Y_ISOLATION_NNp3", "keep_Y_ISOLATION_NNp3");
+  output_brs.push_back("Y_ISOLATION_NNp3");
+  df = define(df, "Y_ISOLATION_IsMuon3", "keep_Y_ISOLATION_IsMuon3");
+  output_brs.push_back("Y_ISOLATION_IsMuon3");
+  df = define(df, "Y_ISOLATION_NNghost3", "keep_Y_ISOLATION_NNghost3");
+  output_brs.push_back("Y_ISOLATION_NNghost3");
+  df = define(df, "Y_ISOLATION_TRUEID3", "keep_Y_ISOLATION_TRUEID3");
+  output_brs.push_back("Y_ISOLATION_TRUEID3");
+  df = define(df, "Y_ISOLATION_CHI24", "keep_Y_ISOLATION_CHI24");
+  output_brs.push_back("Y_ISOLATION_CHI24");
+  df = define(df, "Y_ISOLATION_SC4", "keep_Y_ISOLATION_SC4");
+  output_brs.push_back("Y_ISOLATION_SC4");
+  df = define(df, "Y_ISOLATION_BDT4", "keep_Y_ISOLATION_BDT4");
+  output_brs.push_back("Y_ISOLATION_BDT4");
+  df = define(df, "Y_ISOLATION_ANGLE4", "keep_Y_ISOLATION_ANGLE4");
+  output_brs.push_back("Y_ISOLATION_ANGLE4");
+  df = define(df, "Y_ISOLATION_CHARGE4", "keep_Y_ISOLATION_CHARGE4");
+  output_brs.push_back("Y_ISOLATION_CHARGE4");
+  df = define(df, "Y_ISOLATION_Type4", "keep_Y_ISOLATION_Type4");
+  output_brs.push_back("Y_ISOLATION_Type4");
+  df = define(df, "Y_ISOLATION_PE4", "keep_Y_ISOLATION_PE4");
+  output_brs.push_back("Y_ISOLATION_PE4");
+  df = define(df, "Y_ISOLATION_PX4", "keep_Y_ISOLATION_PX4");
+  output_brs.push_back("Y_ISOLATION_PX4");
+  df = define(df, "Y_ISOLATION_PY4", "keep_Y_ISOLATION_PY4");
+  output_brs.push_back("Y_ISOLATION_PY4");
+  df = define(df, "Y_ISOLATION_PZ4", "keep_Y_ISOLATION_PZ4");
+  output_brs.push_back("Y_ISOLATION_PZ4");
+  df = define(df, "Y_ISOLATION_PIDK4", "keep_Y_ISOLATION_PIDK4");
+  output_brs.push_back("Y_ISOLATION_PIDK4");
+  df = define(df, "Y_ISOLATION_PIDp4", "keep_Y_ISOLATION_PIDp4");
+  output_brs.push_back("Y_ISOLATION_PIDp4");
+  df = define(df, "Y_ISOLATION_NNk4", "keep_Y_ISOLATION_NNk4");
+  output_brs.push_back("Y_ISOLATION_NNk4");
+  df = define(df, "Y_ISOLATION_NNpi4", "keep_Y_ISOLATION_NNpi4");
+  output_brs.push_back("Y_ISOLATION_NNpi4");
+  df = define(df, "Y_ISOLATION_NNp4", "keep_Y_ISOLATION_NNp4");
+  output_brs.push_back("Y_ISOLATION_NNp4");
+  df = define(df, "Y_ISOLATION_IsMuon4", "keep_Y_ISOLATION_IsMuon4");
+  output_brs.push_back("Y_ISOLATION_IsMuon4");
+  df = define(df, "Y_ISOLATION_NNghost4", "keep_Y_ISOLATION_NNghost4");
+  output_brs.push_back("Y_ISOLATION_NNghost4");
+  df = define(df, "Y_ISOLATION_TRUEID4", "keep_Y_ISOLATION_TRUEID4");
+  output_brs.push_back("Y_ISOLATION_TRUEID4");
+  df = define(df, "runNumber", "keep_runNumber");
+  output_brs.push_back("runNumber");
+  df = define(df, "eventNumber", "keep_eventNumber");
+  output_brs.push_back("eventNumber");
+  df = define(df, "GpsTime", "keep_GpsTime");
+  output_brs.push_back("GpsTime");
+  df = define(df, "y_pt", "rename_y_pt");
+  output_brs.push_back("y_pt");
+  df = define(df, "y_px", "rename_y_px");
+  output_brs.push_back("y_px");
+  df = define(df, "y_py", "rename_y_py");
+  output_brs.push_back("y_py");
+  df = define(df, "y_pz", "rename_y_pz");
+  output_brs.push_back("y_pz");
+  df = define(df, "RandStuff", "calculation_RandStuff");
+  output_brs.push_back("RandStuff");
+  df = define(df, "some_other_var", "calculation_some_other_var");
+  output_brs.push_back("some_other_var");
+
+  ROOT::RDF::RSnapshotOptions opts;
+  opts.fLazy = true;
+  return df.Snapshot("tree", string(output_prefix + "YetAnotherTuple" + ".root"), output_brs, opts);
+}
+
+
+int main(int argc, char** argv) {
+  TString in_prefix  = TString(argv[1]) + "/";
+  TString out_prefix = TString(argv[2]) + "/";
+
+  if (argc > 3) {
+    ROOT::EnableImplicitMT(atoi(argv[3]));
+    cout << "Number of threads: " << ROOT::GetThreadPoolSize() << endl;
+  }
+  declare_headers();
+
+  TFile *ntuple = new TFile(in_prefix + "../samples/sample.root");
+  cout << "The ntuple being worked on is: " << "../samples/sample.root"
+    << endl;
+
+  vector<TFile*> friend_ntuples;
+    friend_ntuples.push_back(new TFile(in_prefix + "../samples/sample_friend.root"));
+    cout << "Additional friend ntuple: " << "../samples/sample_friend.root" << endl;
+
+  // Define input trees and container to store associated friend trees
+  auto tree_TupleB0_DecayTree = static_cast<TTree*>(ntuple->Get("TupleB0/DecayTree"));
+  vector<TTree*> friends_TupleB0_DecayTree;
+  auto tree_TupleB0WSPi_DecayTree = static_cast<TTree*>(ntuple->Get("TupleB0WSPi/DecayTree"));
+  vector<TTree*> friends_TupleB0WSPi_DecayTree;
+
+  // Handle friend trees
+  TTree* tmp_tree;
+  tmp_tree = static_cast<TTree*>(friend_ntuples[0]->Get("TupleB0/DecayTree"));
+           tmp_tree->BuildIndex("runNumber", "eventNumber");
+  tree_TupleB0_DecayTree->AddFriend(tmp_tree, "0", true);
+           friends_TupleB0_DecayTree.push_back(tmp_tree);
+           cout << "Handling input tree: " << "TupleB0/DecayTree" << endl;
+
+  {
+    // Build one RDataFrame per input tree and branch the graphs of all its
+    // output trees off it, then fill them in a single loop per input tree
+    vector<ROOT::RDF::RResultHandle> snapshots;
+    ROOT::RDataFrame df_TupleB0_DecayTree(*tree_TupleB0_DecayTree);
+    auto input_TupleB0_DecayTree = load_TupleB0_DecayTree(df_TupleB0_DecayTree);
+    snapshots.push_back(generator_ATuple(input_TupleB0_DecayTree, out_prefix));
+    snapshots.push_back(generator_AnotherTuple(input_TupleB0_DecayTree, out_prefix));
+    ROOT::RDataFrame df_TupleB0WSPi_DecayTree(*tree_TupleB0WSPi_DecayTree);
+    auto input_TupleB0WSPi_DecayTree = load_TupleB0WSPi_DecayTree(df_TupleB0WSPi_DecayTree);
+    snapshots.push_back(generator_YetAnotherTuple(input_TupleB0WSPi_DecayTree, out_prefix));
+    ROOT::RDF::RunGraphs(snapshots);
+  }
+
+  // Cleanups
+  cout <<"Cleanups" << endl;
+  delete ntuple;
+    for (auto tree : friends_TupleB0_DecayTree) delete tree;
+    for (auto tree : friends_TupleB0WSPi_DecayTree) delete tree;
+  for (auto ntp : friend_ntuples) delete ntp;
+
+  return 0;
+}
+
@@ -2,22 +2,30 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Mon Oct 25, 2021 at 09:37 PM +0200
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 
+import json
 import yaml
 import pytest
+import shutil
 
 from collections import defaultdict
 from os import pardir
 from os.path import join as J
 from os.path import dirname, realpath
 from math import isclose
+from collections import Counter
+from copy import deepcopy
+from time import sleep
+from unittest.mock import patch
 
 from pyBabyMaker.babymaker import BabyMaker, BabyConfigParser, BabyResolver
+from pyBabyMaker.babymaker import PatternSet, run_per_file
 from pyBabyMaker.dag_resolver import Node, Variable
 from pyBabyMaker.base import UniqueList
 from pyBabyMaker.io.NestedYAMLLoader import NestedYAMLLoader
 from pyBabyMaker.io.TupleDump import PyTupleDump
+from pyBabyMaker.boolean.utils import cpp_expr_cache
 
 PWD = dirname(realpath(__file__))
 PARDIR = J(PWD, pardir)
@@ -26,6 +34,20 @@ SAMPLE_ROOT   = '../samples/sample.root'
 SAMPLE_FRIEND = '../samples/sample_friend.root'
 SAMPLE_TMPL   = J(PARDIR, 'pyBabyMaker', 'cpp_templates', 'babymaker.cpp')
 SAMPLE_CPP    = J(PARDIR, 'samples', 'sample-babymaker.cpp')
+SAMPLE_SINGLE_PASS_TMPL = J(PARDIR, 'pyBabyMaker', 'cpp_templates',
+                            'babymaker_single_pass.cpp')
+SAMPLE_SINGLE_PASS_CPP  = J(PARDIR, 'samples',
+                            'sample-babymaker_single_pass.cpp')
+SAMPLE_MT_TMPL = J(PARDIR, 'pyBabyMaker', 'cpp_templates', 'babymaker_mt.cpp')
+SAMPLE_MT_CPP  = J(PARDIR, 'samples', 'sample-babymaker_mt.cpp')
+SAMPLE_RDF_TMPL = J(PARDIR, 'pyBabyMaker', 'cpp_templates', 'babymaker_rdf.cpp')
+SAMPLE_RDF_CPP  = J(PARDIR, 'samples', 'sample-babymaker_rdf.cpp')
+SAMPLE_LAZY_TMPL = J(PARDIR, 'pyBabyMaker', 'cpp_templates',
+                     'babymaker_lazy.cpp')
+SAMPLE_LAZY_CPP  = J(PARDIR, 'samples', 'sample-babymaker_lazy.cpp')
+SAMPLE_CHAIN_TMPL = J(PARDIR, 'pyBabyMaker', 'cpp_templates',
+                      'babymaker_chain.cpp')
+SAMPLE_CHAIN_CPP  = J(PARDIR, 'samples', 'sample-babymaker_chain.cpp')
 
 
 #############################
@@ -44,6 +66,394 @@ def test_BabyMaker_cpp_gen(tmp_path):
         assert gen_cpp_content == [line.strip() for line in f.readlines()]
 
 
+def test_BabyMaker_cpp_gen_single_pass(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_SINGLE_PASS_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'}, debug=True)
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')[1:]]
+
+    with open(SAMPLE_SINGLE_PASS_CPP, 'r') as f:
+        assert gen_cpp_content == [line.strip() for line in f.readlines()]
+
+
+def test_BabyMaker_cpp_gen_mt(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_MT_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'}, debug=True)
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')[1:]]
+
+    with open(SAMPLE_MT_CPP, 'r') as f:
+        assert gen_cpp_content == [line.strip() for line in f.readlines()]
+
+
+def test_BabyMaker_cpp_gen_rdf(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_RDF_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'}, debug=True)
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')[1:]]
+
+    with open(SAMPLE_RDF_CPP, 'r') as f:
+        assert gen_cpp_content == [line.strip() for line in f.readlines()]
+
+    # One RDataFrame, hence one event loop, per input tree
+    dataframes = [line for line in gen_cpp_content
+                  if line.startswith('ROOT::RDataFrame df_')]
+    assert dataframes == [
+        'ROOT::RDataFrame df_TupleB0_DecayTree(*tree_TupleB0_DecayTree);',
+        'ROOT::RDataFrame df_TupleB0WSPi_DecayTree(*tree_TupleB0WSPi_DecayTree);',
+    ]
+
+
+def test_BabyMaker_cpp_gen_lazy(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_LAZY_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'}, debug=True)
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')[1:]]
+
+    with open(SAMPLE_LAZY_CPP, 'r') as f:
+        assert gen_cpp_content == [line.strip() for line in f.readlines()]
+
+
+def test_BabyMaker_cpp_gen_chain(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_CHAIN_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'}, debug=True)
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')[1:]]
+
+    with open(SAMPLE_CHAIN_CPP, 'r') as f:
+        assert gen_cpp_content == [line.strip() for line in f.readlines()]
+
+
+def test_BabyMaker_cpp_gen_output_settings(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'}, directive_override={
+        'compression': 'LZ4', 'output/ATuple/compression': 'ZSTD',
+        'auto_flush': '1000'})
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')]
+
+    assert gen_cpp_content.count('output_file->SetCompressionSettings(505);') \
+        == 1
+    assert gen_cpp_content.count('output_file->SetCompressionSettings(404);') \
+        == 2
+    assert gen_cpp_content.count('output.SetAutoFlush(1000);') == 3
+    assert not [line for line in gen_cpp_content if 'SetBasketSize' in line]
+
+
+def test_BabyMaker_cpp_gen_instrument(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'},
+                  directive_override={'output/ATuple/instrument': 'true'})
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')]
+
+    assert gen_cpp_content.count(
+        'if (!cutflow.eval(2, [&] { return ((*raw_Y_PT) > 10000); })) '
+        'continue;') == 1
+    assert gen_cpp_content.count('CutFlow cutflow(cuts, false);') == 1
+    assert gen_cpp_content.count('num_written++;') == 1
+    assert 'R"cut(raw_Y_PT > 10000)cut",' in gen_cpp_content
+    assert 'write_report(output_prefix + "ATuple" + shard_suffix(opts) + ' \
+        '"_report.json",' in gen_cpp_content
+
+
+def test_BabyMaker_cpp_gen_profile_cuts(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'},
+                  directive_override={'output/ATuple/profile_cuts': 'true'})
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')]
+
+    assert gen_cpp_content.count('CutFlow cutflow(cuts, true);') == 1
+    # Cuts still short-circuit, as earlier cuts may guard later ones
+    assert gen_cpp_content.count(
+        'if (!cutflow.eval(2, [&] { return ((*raw_Y_PT) > 10000); })) '
+        'continue;') == 1
+    assert not [line for line in gen_cpp_content
+                if line.startswith('range.second = min(')]
+
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'},
+                  directive_override={'output/ATuple/profile_cuts': 'true',
+                                      'output/ATuple/profile_events': '1000'})
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')]
+    assert gen_cpp_content.count(
+        'range.second = min(range.second, range.first + 1000);') == 1
+
+    # The number of events is only limited in profile mode
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'},
+                  directive_override={'output/ATuple/profile_events': '1000'})
+    assert 'range.first + 1000' not in gen_cpp.read_text()
+
+
+def test_BabyMaker_cpp_gen_empty_range(tmp_path):
+    # An empty shard, or a first entry past the end of the tree, gives an
+    # empty range, for which TTreeReader would process all remaining entries
+    for tmpl, override in [
+            (SAMPLE_TMPL, {}),
+            (SAMPLE_TMPL, {'output/ATuple/instrument': 'true'}),
+            (SAMPLE_LAZY_TMPL, {})]:
+        gen_cpp = tmp_path / 'gen_cpp.cpp'
+        babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                              tmpl, use_reformatter=False)
+        babymaker.gen(gen_cpp, literals={'pi': '3.14'},
+                      directive_override=override)
+        gen_cpp_content = [line.strip()
+                           for line in gen_cpp.read_text().split('\n')]
+
+        ranges = [line for line in gen_cpp_content
+                  if 'SetEntriesRange' in line]
+        loops = [line for line in gen_cpp_content if 'reader.Next()' in line]
+        assert len(ranges) == 3
+        assert set(ranges) == {
+            'if (!empty_range) reader.SetEntriesRange(range.first, '
+            'range.second);'}
+        assert len(loops) == 3
+        assert set(loops) == {'while (!empty_range && reader.Next()) {'}
+        assert gen_cpp_content.count(
+            'bool empty_range = range.first >= range.second;') == 3
+
+
+def test_BabyMaker_cpp_gen_cse_guard(tmp_path):
+    # A shared sub-expression must not be computed before the cut guarding it
+    config = tmp_path / 'guard.yml'
+    config.write_text(yaml.dump({'output': {'Guard': {
+        'input': 'TupleB0/DecayTree',
+        'calculation': {'ratio': 'ULong64_t; eventNumber/runNumber'},
+        'selection': ['runNumber != 0', 'eventNumber/runNumber > 1'],
+        'cse': True,
+    }}}))
+
+    for tmpl in [SAMPLE_TMPL, SAMPLE_SINGLE_PASS_TMPL]:
+        for override in [{}, {'output/Guard/profile_cuts': 'true'}]:
+            if tmpl == SAMPLE_SINGLE_PASS_TMPL and override:
+                continue
+            gen_cpp = tmp_path / 'gen_cpp.cpp'
+            babymaker = BabyMaker(str(config), SAMPLE_ROOT, [SAMPLE_FRIEND],
+                                  tmpl, use_reformatter=False)
+            babymaker.gen(gen_cpp, directive_override=override)
+            gen_cpp_content = [line.strip()
+                               for line in gen_cpp.read_text().split('\n')]
+
+            # The guard skips the rest of the event when it fails, before the
+            # division is computed
+            guard = [idx for idx, line in enumerate(gen_cpp_content)
+                     if '(*raw_runNumber) != 0' in line]
+            division = gen_cpp_content.index(
+                'cse_subexpr0 = (*raw_eventNumber)/(*raw_runNumber);')
+            assert len(guard) == 1
+            assert gen_cpp_content[guard[0]].startswith('if (!')
+            assert gen_cpp_content[guard[0]].endswith(
+                ('continue;', 'return;'))
+            assert guard[0] < division
+            assert not [line for line in gen_cpp_content[guard[0]:division]
+                        if line.startswith('}')]
+
+
+def test_BabyMaker_cpp_gen_selection_profile(tmp_path):
+    gen_cpp = tmp_path / "gen_cpp.cpp"
+    profile = tmp_path / "ATuple_report.json"
+    profile.write_text(json.dumps({'tree': 'ATuple', 'profile': True, 'cuts': [
+        {'cut': 'true', 'evaluated': 100, 'passed': 100, 'time_s': 0},
+        {'cut': 'raw_Y_ISOLATION_BDT > 0', 'evaluated': 100, 'passed': 90,
+         'time_s': 1e-4},
+        {'cut': 'raw_Y_PT > 10000', 'evaluated': 100, 'passed': 10,
+         'time_s': 1e-4},
+    ]}))
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_TMPL, use_reformatter=False)
+    babymaker.gen(gen_cpp, literals={'pi': '3.14'},
+                  selection_profile=[str(profile)])
+    gen_cpp_content = [line.strip()
+                       for line in gen_cpp.read_text().split('\n')]
+
+    # Only ATuple is reordered
+    cuts = [line for line in gen_cpp_content if line.endswith('continue;')
+            and line.startswith('if (!(')]
+    assert cuts[:5] == [
+        'if (!((*raw_Y_PT) > 10000)) continue;',
+        'if (!((*raw_Y_ISOLATION_BDT) > 0)) continue;',
+        'if (!((*raw_Y_ISOLATION_BDT) > 0)) continue;',
+        'if (!(rename_b0_pt > 10000)) continue;',
+        'if (!((*raw_Y_PE) > (100 * pow(10, 3)))) continue;',
+    ]
+
+
+def test_BabyMaker_load_selection_profile(tmp_path):
+    reports = []
+    for idx, passed in enumerate([3, 4]):
+        reports.append(tmp_path / 'ATuple_shard{}of2_report.json'.format(idx))
+        reports[-1].write_text(json.dumps({
+            'tree': 'ATuple', 'profile': True, 'cuts': [
+                {'cut': 'a > 0', 'evaluated': 10, 'passed': passed,
+                 'time_s': 0.5}]}))
+
+    assert BabyMaker.load_selection_profile(reports) == {'ATuple': {
+        'a > 0': {'evaluated': 20, 'passed': 7, 'time_s': 1.0}}}
+
+    reports[0].write_text(json.dumps({'tree': 'ATuple', 'profile': False,
+                                      'cuts': []}))
+    with pytest.raises(ValueError):
+        BabyMaker.load_selection_profile(reports)
+
+
+def test_BabyMaker_expand_filenames(tmp_path):
+    for name in ['b.root', 'a.root', 'c.txt']:
+        (tmp_path / name).touch()
+    filelist = tmp_path / 'files.txt'
+    filelist.write_text('# Comment\nx.root\n\ny.root\n')
+
+    assert BabyMaker.expand_filenames('x.root') == ['x.root']
+    assert BabyMaker.expand_filenames('x.root,y.root') == ['x.root', 'y.root']
+    assert BabyMaker.expand_filenames(str(tmp_path / '*.root')) == [
+        str(tmp_path / 'a.root'), str(tmp_path / 'b.root')]
+    assert BabyMaker.expand_filenames('@'+str(filelist)) == [
+        'x.root', 'y.root']
+    assert BabyMaker.expand_filenames(['x.root', 'y.root,z.root']) == [
+        'x.root', 'y.root', 'z.root']
+
+    with pytest.raises(ValueError):
+        BabyMaker.expand_filenames(str(tmp_path / '*.none'))
+
+
+def test_BabyMaker_multiple_files(tmp_path, monkeypatch):
+    ntuples = [str(tmp_path / 'sample{}.root'.format(i)) for i in range(2)]
+    for ntp in ntuples:
+        shutil.copy(SAMPLE_ROOT, ntp)
+
+    babymaker = BabyMaker(SAMPLE_YAML, ','.join(ntuples),
+                          [SAMPLE_FRIEND], SAMPLE_CHAIN_TMPL,
+                          cache_dir=str(tmp_path / 'cache'))
+    assert babymaker.ntuple_filename == ntuples[0]
+    assert babymaker.friend_filenames == [SAMPLE_FRIEND]
+
+    directive, _ = babymaker.process(literals={'pi': '3.14'})
+    assert list(directive['trees']) == [
+        'ATuple', 'AnotherTuple', 'YetAnotherTuple']
+
+    # The verified files are cached as well, so unchanged files are not
+    # opened again
+    assert len(babymaker.schema_cache.entries()) == 3
+
+    def no_dump(*args, **kwargs):
+        raise AssertionError('Cached ntuple was opened')
+
+    monkeypatch.setattr('pyBabyMaker.io.TupleDump.PyTupleDump', no_dump)
+    directive, _ = babymaker.process(literals={'pi': '3.14'})
+    assert list(directive['trees']) == [
+        'ATuple', 'AnotherTuple', 'YetAnotherTuple']
+
+
+def test_BabyMaker_multiple_files_mismatch():
+    babymaker = BabyMaker(SAMPLE_YAML, [SAMPLE_ROOT, SAMPLE_FRIEND], [],
+                          SAMPLE_CHAIN_TMPL)
+
+    with pytest.raises(ValueError) as e:
+        babymaker.dump_ntuples()
+    assert e.value.args[0] == \
+        'Ntuple structures differ from the first file: {}'.format(
+            SAMPLE_FRIEND)
+
+
+def test_BabyMaker_multiple_files_single_file_template():
+    with pytest.raises(ValueError) as e:
+        BabyMaker(SAMPLE_YAML, [SAMPLE_ROOT, SAMPLE_ROOT], [], SAMPLE_TMPL)
+    assert e.value.args[0] == \
+        'Template {} only processes a single file, but got: {}, {}'.format(
+            SAMPLE_TMPL, SAMPLE_ROOT, SAMPLE_ROOT)
+
+    with pytest.raises(ValueError):
+        BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [[SAMPLE_FRIEND, SAMPLE_FRIEND]],
+                  SAMPLE_TMPL)
+
+
+def test_BabyMaker_multiple_files_friend_mismatch():
+    ntuples = [SAMPLE_ROOT] * 3
+    friends = [SAMPLE_FRIEND] * 2
+
+    with pytest.raises(ValueError) as e:
+        BabyMaker(SAMPLE_YAML, ntuples, [friends], SAMPLE_CHAIN_TMPL)
+    assert e.value.args[0] == \
+        'Friend ntuple has 2 files, but main ntuple has 3: {0}, {0}'.format(
+            SAMPLE_FRIEND)
+
+    # A single friend file is shared by all main files
+    babymaker = BabyMaker(SAMPLE_YAML, ntuples, [SAMPLE_FRIEND],
+                          SAMPLE_CHAIN_TMPL)
+    assert babymaker.friend_filenames_all == [[SAMPLE_FRIEND]]
+
+
+def test_run_per_file(tmp_path):
+    binary = tmp_path / 'postprocess'
+    binary.write_text("""#!/bin/sh
+if [ "$1" = "--num-of-files" ]; then echo 3; exit 0; fi
+echo "$@" > "$2/$4.log"
+[ "$4" != "1" ]
+""")
+    binary.chmod(0o755)
+
+    assert run_per_file(str(binary), 'in', str(tmp_path), jobs=2) == [0, 1, 0]
+    for idx in range(3):
+        assert (tmp_path / '{}.log'.format(idx)).read_text() == \
+            'in {} --file {}\n'.format(tmp_path, idx)
+
+
+def test_BabyMaker_dump_selected_trees():
+    babymaker = BabyMaker(SAMPLE_YAML, SAMPLE_ROOT, [SAMPLE_FRIEND],
+                          SAMPLE_TMPL)
+    parsed_config = babymaker.read(SAMPLE_YAML)
+
+    with patch.object(BabyMaker, 'dump', wraps=BabyMaker.dump) as m:
+        trees, tree_relations = babymaker.dump_ntuples(
+            ['TupleB0WSPi/DecayTree'],
+            babymaker.find_input_trees(parsed_config))
+
+    assert [c.args[2] for c in m.call_args_list] == [
+        ['TupleB0/DecayTree'], ['TupleB0/DecayTree']]
+    assert list(trees) == ['TupleB0/DecayTree']
+    assert tree_relations == {'TupleB0/DecayTree': [True]}
+
+
+def test_BabyMaker_dump_parallel_ordering():
+    dumped = {
+        'main': {'t1': {'a': 'int'}, 't2': {'b': 'int'}},
+        'f1': {'t1': {'c': 'int'}},
+        'f2': {'t2': {'d': 'int'}},
+        'f3': {'t1': {'e': 'int'}, 't2': {'f': 'int'}},
+    }
+    delays = {'main': 0.03, 'f1': 0.02, 'f2': 0.01, 'f3': 0}
+
+    def fake_dump(ntp, cache=None, trees=None):
+        sleep(delays[ntp])
+        return deepcopy(dumped[ntp])
+
+    babymaker = BabyMaker(SAMPLE_YAML, 'main', ['f1', 'f2', 'f3'], SAMPLE_TMPL,
+                          dump_workers=4)
+    with patch.object(BabyMaker, 'dump', side_effect=fake_dump):
+        trees, tree_relations = babymaker.dump_ntuples()
+
+    assert list(trees) == ['t1', 't2']
+    assert trees['t1'] == {'a': 'int', 'c': 'int', 'e': 'int'}
+    assert tree_relations == {'t1': [True, False, True],
+                              't2': [False, True, True]}
+
+
 ##########################
 # Parse YAML config file #
 ##########################
@@ -132,6 +542,32 @@ def test_BabyConfigParser_parse_ATuple(realistic_BabyConfigParser):
     ]
 
 
+def test_BabyConfigParser_parse_each_expr_once(load_files):
+    parsed = Counter()
+    extracted = Counter()
+    parse = cpp_expr_cache.parser.parse
+    fast_path = cpp_expr_cache.fast_path
+
+    def counting_parse(expr):
+        parsed[expr] += 1
+        return parse(expr)
+
+    def counting_fast_path(expr):
+        extracted[expr] += 1
+        return fast_path(expr)
+
+    cpp_expr_cache.clear()
+    with patch.object(cpp_expr_cache, 'parser') as m, \
+            patch.object(cpp_expr_cache, 'fast_path', counting_fast_path):
+        m.parse.side_effect = counting_parse
+        BabyConfigParser(*load_files, literals={'pi': '3.14'}).parse()
+    cpp_expr_cache.clear()
+
+    assert 'TempStuff*pi' in extracted
+    assert set(extracted.values()) == {1}
+    assert set(parsed.values()) <= {1}
+
+
 def test_BabyConfigParser_parse_AnotherTuple(realistic_BabyConfigParser):
     directive = realistic_BabyConfigParser.parse()
 
@@ -191,6 +627,336 @@ def test_BabyConfigParser_parse_YetAnotherTuple(realistic_BabyConfigParser):
     ]
 
 
+def test_BabyConfigParser_parse_input_groups(realistic_BabyConfigParser):
+    directive = realistic_BabyConfigParser.parse()
+    groups = directive['input_groups']
+
+    assert list(groups) == ['TupleB0/DecayTree', 'TupleB0WSPi/DecayTree']
+    assert groups['TupleB0/DecayTree']['outputs'] == ['ATuple', 'AnotherTuple']
+    assert groups['TupleB0WSPi/DecayTree']['outputs'] == ['YetAnotherTuple']
+
+    # Branches needed by any of the output trees are loaded exactly once
+    shared = groups['TupleB0/DecayTree']
+    assert shared['input_br'] == [
+        'raw_Y_ISOLATION_BDT',
+        'raw_Y_PT',
+        'raw_Y_PE',
+        'raw_Y_PX',
+        'raw_Y_PY',
+        'raw_Y_PZ',
+        'raw_runNumber',
+        'raw_eventNumber',
+        'raw_GpsTime',
+        'raw_D0_P',
+    ]
+    assert shared['input_br'] == [v.fname for v in shared['input']]
+    for tree in shared['outputs']:
+        assert set(directive['trees'][tree]['input']) <= set(shared['input'])
+
+
+def test_BabyConfigParser_parse_pre_post_sel_input(realistic_BabyConfigParser):
+    directive = realistic_BabyConfigParser.parse()
+    config = directive['trees']['AnotherTuple']
+
+    assert [v.name for v in config['pre_sel_input']] == [
+        'Y_ISOLATION_BDT', 'Y_PT', 'Y_PE']
+    assert [v.name for v in config['post_sel_input']] == [
+        'Y_PX', 'Y_PY', 'Y_PZ', 'runNumber', 'eventNumber', 'GpsTime',
+        'D0_P']
+
+    for config in directive['trees'].values():
+        assert set(config['pre_sel_input']) | set(config['post_sel_input']) \
+            == set(config['input'])
+        assert not set(config['pre_sel_input']) & \
+            set(config['post_sel_input'])
+
+
+def test_BabyConfigParser_parse_clone(load_files):
+    _, dumped_ntuple = load_files
+    parsed_config = {'output': {
+        'Slim': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*']},
+        'SlimSel': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*'],
+                    'selection': ['Y_PT > 10000', 'Y_ISOLATION_BDT > 0']},
+        'SlimRename': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*'],
+                       'rename': {'Y_PT': 'pt'}},
+        'SlimNoClone': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*'],
+                        'fast_clone': False},
+        'SlimFunc': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*'],
+                     'selection': ['abs(Y_PT) > 10000']},
+        'SlimIntDiv': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*'],
+                       'selection': ['runNumber / 2 > 1']},
+        'SlimFloatDiv': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*'],
+                         'selection': ['Y_PT / 2 > 1']},
+        'SlimCompressed': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*'],
+                           'compression': 'LZ4'},
+    }}
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+    trees = directive['trees']
+
+    assert trees['Slim']['clone'] == 'fast'
+    assert trees['Slim']['clone_sel'] == ''
+    assert trees['SlimSel']['clone'] == 'copy'
+    assert trees['SlimSel']['clone_sel'] == \
+        '(Y_PT > 10000) && (Y_ISOLATION_BDT > 0)'
+    assert trees['SlimRename']['clone'] is None
+    assert trees['SlimNoClone']['clone'] is None
+    # Cuts that TTreeFormula doesn't evaluate as C++ does
+    assert trees['SlimFunc']['clone'] is None
+    assert trees['SlimIntDiv']['clone'] is None
+    assert trees['SlimFloatDiv']['clone'] == 'copy'
+    # Fast cloning doesn't recompress baskets
+    assert trees['SlimCompressed']['clone'] is None
+
+
+def test_BabyConfigParser_parse_instrument(load_files):
+    _, dumped_ntuple = load_files
+    parsed_config = {'instrument': True, 'output': {
+        'Slim': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*']},
+        'SlimQuiet': {'input': 'TupleB0/DecayTree', 'keep': ['Y_P.*'],
+                      'instrument': False},
+    }}
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+    trees = directive['trees']
+
+    assert trees['Slim']['instrument'] is True
+    assert trees['Slim']['clone'] is None
+    assert trees['SlimQuiet']['instrument'] is False
+    assert trees['SlimQuiet']['clone'] == 'fast'
+
+
+def test_BabyConfigParser_reorder_selection(load_files):
+    _, dumped_ntuple = load_files
+    parsed_config = {'output': {'Sel': {
+        'input': 'TupleB0/DecayTree',
+        'keep': ['Y_PT'],
+        'calculation': {'pe_gev': 'double; Y_PE / 1000'},
+        'selection': ['Y_PT > 10000', 'Y_PT < 90000', 'pe_gev > 1',
+                      'Y_PX > 0', 'Y_PY > 0'],
+    }}}
+    profile = {'Sel': {
+        'raw_Y_PT > 10000': {'evaluated': 10, 'passed': 5, 'time_s': 5},
+        'raw_Y_PT < 90000': {'evaluated': 10, 'passed': 1, 'time_s': 1},
+        'calculation_pe_gev > 1': {'evaluated': 10, 'passed': 1, 'time_s': 1},
+        'raw_Y_PY > 0': {'evaluated': 10, 'passed': 10, 'time_s': 1},
+    }}
+    directive = BabyConfigParser(parsed_config, dumped_ntuple,
+                                 selection_profile=profile).parse()
+    config = directive['trees']['Sel']
+
+    # Cuts on the same input branch 'Y_PT' are reordered, but 'Y_PX > 0' is
+    # not profiled, so it keeps its order w.r.t. the preceding cuts
+    assert config['sel'] == [
+        'true', 'raw_Y_PT < 90000', 'calculation_pe_gev > 1',
+        'raw_Y_PT > 10000', 'raw_Y_PX > 0', 'raw_Y_PY > 0']
+    assert [v.fname for v in config['pre_sel_vars']] == \
+        ['calculation_pe_gev']
+    assert [v.name for v in config['pre_sel_input']] == \
+        ['Y_PT', 'Y_PE', 'Y_PX', 'Y_PY']
+
+    # Same profile, same ordering
+    assert BabyConfigParser(parsed_config, dumped_ntuple,
+                            selection_profile=profile).parse()['trees'][
+                                'Sel']['sel'] == config['sel']
+
+
+def test_BabyConfigParser_reorder_selection_shared_var(load_files):
+    _, dumped_ntuple = load_files
+    parsed_config = {'output': {'Sel': {
+        'input': 'TupleB0/DecayTree',
+        'keep': ['Y_PT'],
+        'calculation': {'pe_gev': 'double; Y_PE / 1000'},
+        'selection': ['pe_gev > 1', 'pe_gev < 5', 'Y_PT > 10000'],
+    }}}
+    profile = {'Sel': {
+        'calculation_pe_gev > 1': {'evaluated': 10, 'passed': 5, 'time_s': 5},
+        'calculation_pe_gev < 5': {'evaluated': 10, 'passed': 1, 'time_s': 1},
+        'raw_Y_PT > 10000': {'evaluated': 10, 'passed': 1, 'time_s': 1},
+    }}
+    config = BabyConfigParser(parsed_config, dumped_ntuple,
+                              selection_profile=profile).parse()['trees']['Sel']
+
+    # 'pe_gev < 5' shares the computed 'pe_gev' with the first cut
+    assert config['sel'] == [
+        'true', 'raw_Y_PT > 10000', 'calculation_pe_gev > 1',
+        'calculation_pe_gev < 5']
+
+
+def test_BabyConfigParser_parse_selection_steps(load_files):
+    _, dumped_ntuple = load_files
+    parsed_config = {'output': {'Sel': {
+        'input': 'TupleB0/DecayTree',
+        'keep': ['Y_PT'],
+        'calculation': {
+            'pt_gev': 'double; Y_PT / 1000',
+            'pe_gev': 'double; Y_PE / 1000',
+            'ratio': 'double; pt_gev / pe_gev',
+        },
+        'selection': ['Y_PX > 0', 'pt_gev > 1', 'ratio < 1', 'pe_gev > 1'],
+    }}}
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+    steps = directive['trees']['Sel']['sel_steps']
+
+    assert [s['cut'] for s in steps] == \
+        directive['trees']['Sel']['sel'][1:]
+    assert [[v.fname for v in s['vars']] for s in steps] == [
+        [],
+        ['calculation_pt_gev'],
+        ['calculation_pe_gev', 'calculation_ratio'],
+        [],
+    ]
+
+
+def test_BabyConfigParser_parse_cse(load_files):
+    _, dumped_ntuple = load_files
+    parsed_config = {'output': {'Sel': {
+        'input': 'TupleB0/DecayTree',
+        'calculation': {
+            'pt': 'double; sqrt(Y_PX*Y_PX + Y_PY*Y_PY)',
+            'pt_gev': 'double; sqrt(Y_PX*Y_PX + Y_PY*Y_PY) / 1000',
+            'my_pt': 'double; my_sqrt(Y_PX*Y_PX + Y_PY*Y_PY)',
+        },
+        'selection': ['sqrt(Y_PX*Y_PX + Y_PY*Y_PY) > 1000'],
+        'cse': True,
+    }}}
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+    config = directive['trees']['Sel']
+
+    assert config['sel'] == ['true', 'cse_subexpr0 > 1000']
+    assert [(v.fname, v.rval) for v in config['pre_sel_vars']] == [
+        ('cse_subexpr1', 'raw_Y_PX*raw_Y_PX + raw_Y_PY*raw_Y_PY'),
+        ('cse_subexpr0', 'sqrt(cse_subexpr1)'),
+    ]
+    assert [(v.fname, v.rval) for v in config['post_sel_vars']] == [
+        ('calculation_pt', 'cse_subexpr0'),
+        ('calculation_pt_gev', 'cse_subexpr0 / 1000'),
+        ('calculation_my_pt', 'my_sqrt(cse_subexpr1)'),
+    ]
+    assert [v.fname for v in config['tmp']] == ['cse_subexpr1', 'cse_subexpr0']
+
+    # User-defined pure functions
+    parsed_config['output']['Sel']['pure_functions'] = {'my_sqrt': 'double'}
+    parsed_config['output']['Sel']['calculation']['my_pt_gev'] = \
+        'double; my_sqrt(Y_PX*Y_PX + Y_PY*Y_PY) / 1000'
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+    assert [v.rval for v in directive['trees']['Sel']['post_sel_vars']
+            if v.name.startswith('my_pt')] == ['cse_subexpr1',
+                                               'cse_subexpr1 / 1000']
+
+    # Disabled
+    parsed_config['output']['Sel']['cse'] = False
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+    assert directive['trees']['Sel']['sel'] == \
+        ['true', 'sqrt(raw_Y_PX*raw_Y_PX + raw_Y_PY*raw_Y_PY) > 1000']
+    assert directive['trees']['Sel']['tmp'] == []
+
+
+def test_BabyConfigParser_parse_fold_constants(load_files):
+    _, dumped_ntuple = load_files
+    parsed_config = {'output': {'Sel': {
+        'input': 'TupleB0/DecayTree',
+        'calculation': {
+            'pt_scaled': 'double; Y_PT * scale',
+            'scale': '^double; pi / 180 * pow(10, 3)',
+            'norm': '^double; my_norm(pi)',
+            'pt_norm': 'double; Y_PT / norm',
+        },
+        'selection': ['Y_PE > (100 * pow(10, 3))'],
+        'pure_functions': {'my_norm': 'double'},
+        'fold_constants': True,
+        'cse': True,
+    }}}
+    directive = BabyConfigParser(parsed_config, dumped_ntuple,
+                                 literals={'pi': '3.14'}).parse()
+    config = directive['trees']['Sel']
+
+    assert config['sel'] == ['true', 'raw_Y_PE > (100000.0)']
+    assert [(v.fname, v.rval) for v in config['loop_invariant']] == [
+        ('calculation_scale', '17.444444444444446'),
+        ('calculation_norm', 'my_norm(3.14)'),
+    ]
+    assert [(v.fname, v.rval) for v in config['post_sel_vars']] == [
+        ('calculation_pt_scaled', 'raw_Y_PT * calculation_scale'),
+        ('calculation_pt_norm', 'raw_Y_PT / calculation_norm'),
+    ]
+    assert [v.fname for v in config['tmp']] == \
+        ['calculation_scale', 'calculation_norm']
+    assert config['folded'] == [
+        '100 * pow(10, 3) -> 100000.0',
+        'pi / 180 * pow(10, 3) -> 17.444444444444446',
+    ]
+
+    debug = BabyMaker.directive_debug(directive)
+    assert '### Folded expressions\n - 100 * pow(10, 3) -> 100000.0\n' in debug
+    assert '### Loop-invariant variables\n - double calculation_scale = ' \
+        '17.444444444444446\n' in debug
+
+    # Disabled; the repeated 'pow(10, 3)' is then computed once per event
+    parsed_config['output']['Sel']['fold_constants'] = False
+    directive = BabyConfigParser(parsed_config, dumped_ntuple,
+                                 literals={'pi': '3.14'}).parse()
+    assert directive['trees']['Sel']['sel'] == \
+        ['true', 'raw_Y_PE > (100 * cse_subexpr0)']
+    assert directive['trees']['Sel']['loop_invariant'] == []
+
+
+def test_BabyConfigParser_parse_dead_vars(load_files):
+    _, dumped_ntuple = load_files
+    parsed_config = {'output': {'Sel': {
+        'input': 'TupleB0/DecayTree',
+        'keep': ['Y_PT'],
+        'calculation': {
+            'p_gev': '^double; D0_P / 1000',
+            'pe_gev': '^double; Y_PE / 1000',
+            # 'no_such_branch' can't be resolved, so 'p_gev' is unused
+            'ratio': 'double; p_gev / no_such_branch',
+        },
+        'selection': ['pe_gev > 1'],
+        'eliminate_dead_vars': True,
+    }}}
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+    config = directive['trees']['Sel']
+
+    assert [v.fname for v in config['dead_vars']] == ['calculation_p_gev']
+    assert config['dead_input_br'] == ['raw_D0_P']
+    assert config['input_br'] == ['raw_Y_PE', 'raw_Y_PT']
+    assert [v.fname for v in config['tmp']] == ['calculation_pe_gev']
+
+    debug = BabyMaker.directive_debug(directive)
+    assert '### Removed variables\n - double calculation_p_gev = ' \
+        'raw_D0_P / 1000\n' in debug
+    assert '### Removed input branches\n - raw_D0_P\n' in debug
+
+    # Disabled by default
+    del parsed_config['output']['Sel']['eliminate_dead_vars']
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+    assert directive['trees']['Sel']['dead_vars'] == []
+    assert 'raw_D0_P' in directive['trees']['Sel']['input_br']
+
+
+def test_BabyConfigParser_parse_clone_realistic(realistic_BabyConfigParser):
+    directive = realistic_BabyConfigParser.parse()
+
+    for config in directive['trees'].values():
+        assert config['clone'] is None
+
+
+def test_BabyConfigParser_parse_cache_size(load_files):
+    parsed_config, dumped_ntuple = load_files
+    parsed_config['cache_size'] = 10000000
+    parsed_config['output']['ATuple']['cache_size'] = 50000000
+    directive = BabyConfigParser(parsed_config, dumped_ntuple).parse()
+
+    assert directive['trees']['ATuple']['cache_size'] == 50000000
+    assert directive['trees']['AnotherTuple']['cache_size'] == 10000000
+
+
+def test_BabyConfigParser_parse_default_cache_size(realistic_BabyConfigParser):
+    directive = realistic_BabyConfigParser.parse()
+
+    for config in directive['trees'].values():
+        assert config['cache_size'] == 30000000
+
+
 ###################################
 # Test individual parse functions #
 ###################################
@@ -320,6 +1086,20 @@ def test_BabyConfigParser_parse_calculation_invalid_spec(make_namespace):
         'Illegal specification for TEMP: ^double Y_PX+1 FUNC(Y_PX, 1).'
 
 
+def test_BabyConfigParser_parse_compression():
+    assert BabyConfigParser.parse_compression({}) is None
+    assert BabyConfigParser.parse_compression({'compression': 0}) == 0
+    assert BabyConfigParser.parse_compression({'compression': 207}) == 207
+    assert BabyConfigParser.parse_compression({'compression': 'LZ4'}) == 404
+    assert BabyConfigParser.parse_compression({'compression': 'zstd:9'}) == 509
+
+
+def test_BabyConfigParser_parse_compression_invalid_spec():
+    with pytest.raises(ValueError) as e:
+        BabyConfigParser.parse_compression({'compression': 'LZ5:4'})
+    assert e.value.args[0] == 'Illegal compression setting: LZ5:4.'
+
+
 ############################
 # Test variable resolution #
 ############################
@@ -481,6 +1261,41 @@ def test_BabyConfigParser_match_partial_match():
     assert BabyConfigParser.match(['quick', 'brown', 'fox'], 'fox2')
 
 
+def test_BabyConfigParser_match_invalid_regex(capsys):
+    patterns = ['quick', 'brown(', 'fox']
+    for _ in range(3):
+        assert BabyConfigParser.match(patterns, 'fox')
+        assert not BabyConfigParser.match(patterns, 'brown(')
+
+    assert capsys.readouterr().out.count('Invalid regex: brown(') <= 1
+
+
+def test_BabyConfigParser_match_non_string(capsys):
+    patterns = ['quick', None, 42, ['fox']]
+    assert BabyConfigParser.match(patterns, 'quick')
+    assert not BabyConfigParser.match(patterns, 'None')
+    assert not BabyConfigParser.match(patterns, '42')
+
+    out = capsys.readouterr().out
+    assert 'Invalid regex: None' in out
+    assert 'Invalid regex: 42' in out
+    assert "Invalid regex: ['fox']" in out
+
+
+def test_PatternSet_cached():
+    patterns = ['^Y_P\\w$', 'random_pt']
+    assert PatternSet.get(patterns) is PatternSet.get(list(patterns))
+    assert PatternSet.get(patterns).search('Y_PT')
+    assert not PatternSet.get(patterns).search('Y_PTT')
+
+
+def test_PatternSet_backreference():
+    patterns = ['(x)\\1', '(y)\\1', '(?i)z']
+    assert PatternSet.get(patterns).search('yy')
+    assert PatternSet.get(patterns).search('Z')
+    assert not PatternSet.get(patterns).search('xy')
+
+
 def test_BabyMaker_parse_ext_directive():
     output = BabyMaker.parse_ext_directive({
         'a/b/c': '1', 'a/b/d': '2', 'a/c': 'false', 'a/d': 'stuff'
@@ -2,14 +2,15 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Thu Mar 11, 2021 at 12:26 AM +0100
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 
 import pytest
 import os
 
+from copy import copy, deepcopy
 from unittest.mock import patch
 
-from pyBabyMaker.base import UniqueList
+from pyBabyMaker.base import UniqueList, LazyParser
 from pyBabyMaker.base import BaseMaker
 from pyBabyMaker.base import update_config
 
@@ -121,6 +122,126 @@ def test_UniqueList_insert_duplicate(default_UniqueList):
     assert default_UniqueList == [1, 2, 3]
 
 
+def test_UniqueList_extend(default_UniqueList):
+    default_UniqueList.extend([3, 4, 4, 5])
+    assert default_UniqueList == [1, 2, 3, 4, 5]
+
+
+def test_UniqueList_contains(default_UniqueList):
+    assert 3 in default_UniqueList
+    assert 4 not in default_UniqueList
+    assert [3] not in default_UniqueList
+
+
+def test_UniqueList_unhashable():
+    test_list = UniqueList([[1], 2, [1], {'a': 1}, 2, {'a': 1}])
+    test_list.append([1])
+    assert test_list == [[1], 2, {'a': 1}]
+    assert [1] in test_list
+
+
+def test_UniqueList_remove(default_UniqueList):
+    default_UniqueList.remove(1)
+    default_UniqueList.append(1)
+    assert default_UniqueList == [2, 3, 1]
+
+
+def test_UniqueList_pop(default_UniqueList):
+    assert default_UniqueList.pop() == 3
+    default_UniqueList.append(3)
+    assert default_UniqueList == [1, 2, 3]
+
+
+def test_UniqueList_setitem(default_UniqueList):
+    default_UniqueList[0] = 2
+    assert default_UniqueList == [2, 3]
+    default_UniqueList.append(1)
+    assert default_UniqueList == [2, 3, 1]
+
+
+def test_UniqueList_copy(default_UniqueList):
+    for test_list in [copy(default_UniqueList), deepcopy(default_UniqueList)]:
+        assert isinstance(test_list, UniqueList)
+        assert test_list == [1, 2, 3]
+        test_list.append(1)
+        test_list.append(4)
+        assert test_list == [1, 2, 3, 4]
+
+
+def test_UniqueList_linear_scaling():
+    class Counted:
+        eq_calls = 0
+
+        def __init__(self, value):
+            self.value = value
+
+        def __hash__(self):
+            return hash(self.value)
+
+        def __eq__(self, other):
+            Counted.eq_calls += 1
+            return self.value == other.value
+
+    size = 1000
+    test_list = UniqueList(Counted(i) for i in range(size))
+    test_list += [Counted(i) for i in range(size)]
+    for i in range(size):
+        test_list.append(Counted(i))
+        assert Counted(i) in test_list
+
+    # Membership is checked with the companion set: a linear scan would need
+    # ~size**2 / 2 comparisons
+    assert len(test_list) == size
+    assert Counted.eq_calls <= 4 * size
+
+
+# LazyParser ###################################################################
+
+def test_LazyParser_lazy(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+
+    with patch('lark.Lark') as m:
+        parser = LazyParser('start: "a"', parser='lalr')
+        m.assert_not_called()
+
+        parser.parse('a')
+        parser.parse('a')
+        m.assert_called_once_with('start: "a"', parser='lalr',
+                                  cache=parser.cache_path())
+
+
+def test_LazyParser_cache_path(tmp_path, monkeypatch):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    cache_dir = tmp_path / 'pyBabyMaker' / 'lark'
+
+    parser = LazyParser('start: "a"', parser='lalr')
+    cache = parser.cache_path()
+    assert os.path.dirname(cache) == str(cache_dir)
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+
+    # Different grammars and options are cached separately
+    assert LazyParser('start: "b"', parser='lalr').cache_path() != cache
+    assert LazyParser('start: "a"', parser='lalr',
+                      propagate_positions=True).cache_path() != cache
+    assert LazyParser('start: "a"', parser='lalr').cache_path() == cache
+
+    # Don't load tables from a directory that others can write to
+    os.chmod(cache_dir, 0o777)
+    assert parser.cache_path() is False
+
+
+def test_LazyParser_parse(tmp_path):
+    cache = str(tmp_path / 'parser.cache')
+    parser = LazyParser('start: "a" NAME\n%import common.CNAME -> NAME',
+                        cache=cache, parser='lalr')
+    assert parser.parse('ab').children[0] == 'b'
+    assert os.path.exists(cache)
+
+    parser_cached = LazyParser(parser.grammar, cache=cache, parser='lalr')
+    assert parser_cached.parse('ac').children[0] == 'c'
+    assert parser_cached.options['parser'] == 'lalr'
+
+
 ##############
 # Base maker #
 ##############
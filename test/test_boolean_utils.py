@@ -2,9 +2,19 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Tue Jun 22, 2021 at 02:46 AM +0200
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+
+import json
+import pytest
+import random
+
+from unittest.mock import MagicMock
+from lark.exceptions import UnexpectedInput
 
 from pyBabyMaker.boolean.utils import find_all_args, find_all_vars
+from pyBabyMaker.boolean.cache import ParseCache, extract_vars, extract_args
+from pyBabyMaker.boolean.tokenizer import fast_extract
+from pyBabyMaker.boolean.syntax import cpp_boolean_parser, cpp_boolean_grammar
 
 
 def test_find_all_args_simple():
@@ -48,3 +58,206 @@ def test_find_all_vars_with_method_calls():
 
 def test_find_all_vars_with_full_name_func_calls():
     assert find_all_vars('TMath::Sqrt(arg1, arg2)') == ['arg1', 'arg2']
+
+
+#########
+# Cache #
+#########
+
+@pytest.fixture
+def counting_parser():
+    parser = MagicMock()
+    parser.parse.side_effect = cpp_boolean_parser.parse
+    return parser
+
+
+def test_ParseCache_memoize(counting_parser):
+    cache = ParseCache(counting_parser, cpp_boolean_grammar)
+
+    for _ in range(3):
+        result = cache.get('FUNC(a, b) > c')
+        assert result.vars == ['a', 'b', 'c']
+        assert result.args == ['a', 'b']
+
+    counting_parser.parse.assert_called_once_with('FUNC(a, b) > c')
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+
+def test_ParseCache_lru_eviction(counting_parser):
+    cache = ParseCache(counting_parser, cpp_boolean_grammar, maxsize=2)
+
+    for expr in ['a', 'b', 'a', 'c', 'a', 'b']:
+        cache.get(expr)
+
+    assert list(cache.memory) == ['a', 'b']
+    assert counting_parser.parse.call_count == 4
+
+
+def test_ParseCache_disk(tmp_path, counting_parser):
+    cache = ParseCache(counting_parser, cpp_boolean_grammar,
+                       cache_dir=str(tmp_path))
+    cache.get('a+b')
+    cache.save()
+
+    parser = MagicMock()
+    parser.parse.side_effect = RuntimeError
+    cache_new = ParseCache(parser, cpp_boolean_grammar,
+                           cache_dir=str(tmp_path))
+    assert cache_new.get('a+b').vars == ['a', 'b']
+    parser.parse.assert_not_called()
+
+
+def test_ParseCache_disk_json(tmp_path, counting_parser):
+    cache = ParseCache(counting_parser, cpp_boolean_grammar,
+                       cache_dir=str(tmp_path))
+    cache.get('FUNC(a, b) > c')
+    cache.save()
+
+    # Only variables and arguments are stored, as plain data
+    with open(cache.disk_path) as f:
+        assert json.load(f) == {
+            'FUNC(a, b) > c': [['a', 'b', 'c'], ['a', 'b']]}
+
+    cache_new = ParseCache(counting_parser, cpp_boolean_grammar,
+                           cache_dir=str(tmp_path))
+    assert cache_new.tree('FUNC(a, b) > c').data == 'gt'
+    assert counting_parser.parse.call_count == 2
+
+
+def test_ParseCache_disk_lru_eviction(tmp_path, counting_parser):
+    cache = ParseCache(counting_parser, cpp_boolean_grammar,
+                       cache_dir=str(tmp_path), disk_maxsize=2)
+    for expr in ['a+b', 'b+c']:
+        cache.get(expr)
+    cache.save()
+
+    cache = ParseCache(counting_parser, cpp_boolean_grammar,
+                       cache_dir=str(tmp_path), disk_maxsize=2)
+    for expr in ['a+b', 'c+d']:
+        cache.get(expr)
+    cache.save()
+
+    # 'b+c' is the least recently used entry
+    with open(cache.disk_path) as f:
+        assert list(json.load(f)) == ['a+b', 'c+d']
+
+
+def test_ParseCache_disk_grammar_change(tmp_path, counting_parser):
+    cache = ParseCache(counting_parser, cpp_boolean_grammar,
+                       cache_dir=str(tmp_path))
+    cache.get('a+b')
+    cache.save()
+
+    cache_new = ParseCache(counting_parser, cpp_boolean_grammar+' ',
+                           cache_dir=str(tmp_path))
+    cache_new.get('a+b')
+    assert counting_parser.parse.call_count == 2
+
+
+#############
+# Fast path #
+#############
+
+FAST_PATH_CORPUS = [
+    'Y_PT > 10000',
+    'D0_P+Y_PT',
+    'TempStuff*pi',
+    'y_pt + y_pz',
+    'a+b*c',
+    'a*b+c/d-e',
+    '(a+b)*(c-d)',
+    'a>b>c',
+    '!a+b > c',
+    'a == !b',
+    '-a*-(b+c)',
+    '- -a',
+    '-3+a',
+    '+3+a',
+    'a -3',
+    '1.e5f*a',
+    '.5*a + 5.*b - 1ul*c + 2LL',
+    'true && a || false',
+    'Y_PE > (100 * pow(10, 3))',
+    'k_PT + pi_PT > 1400.0*MeV',
+    'TMath::Sqrt(arg1, arg2)',
+    'std::sqrt(x*x + y*y) < ROOT::Math::Pi{}',
+    'f()',
+    'f(a,)',
+    'FUNC1(arg1, arg2, Rand(arg3, arg4, FUNC2(arg5 * 2.3, arg6 + arg7)))',
+    '!(FUNC1(arg1, arg2) > 1 && FUNC2(FUNC3(arg3, arg4, FUNC4(1, 2)) +'
+    'arg6)) <= 3 || FUNC6(arg7 != 3, arg8, arg9*FUNC7())',
+    '!(FUNC1{arg1, arg2} && FUNC2{FUNC3{arg3, arg4, FUNC4{1, 2}} + arg6})||'
+    'FUNC6{arg7, arg8, arg9*FUNC7{arg10+arg11}}',
+    'a\t+ b',
+    'MU_PID(mu_is_mu, mu_pid_mu) && TEST(mu_pid_mu, mu_is_mu) > 0',
+]
+
+FALLBACK_CORPUS = [
+    'arg1->test(arg2, arg3) && arg4->call()',
+    'arg5.call(arg6) || arg7.arg8',
+    'TMath::Pi',
+    'trueish > 1',
+    'a % b',
+    'x[0] > 1',
+    '!!a',
+    '-f(x)',
+    '0x1F',
+    'a\n+b',
+    'f(a,,)',
+    '(a+b',
+]
+
+
+def lark_extract(expr):
+    tree = cpp_boolean_parser.parse(expr)
+    return extract_vars(tree), extract_args(tree)
+
+
+def random_expr(rng, depth=0):
+    names = ['a', 'b', 'c', 'Y_PT', 'mu_PIDmu', 'a']
+    if depth > 3 or rng.random() < 0.3:
+        return rng.choice(names + ['1', '2.5f', '-3', 'true', '1e3'])
+
+    choice = rng.random()
+    if choice < 0.5:
+        op = rng.choice(['+', '-', '*', '/', '>', '<=', '==', '!=', '&&',
+                         '||'])
+        return '{} {} {}'.format(random_expr(rng, depth+1), op,
+                                 random_expr(rng, depth+1))
+    elif choice < 0.6:
+        return '({})'.format(random_expr(rng, depth+1))
+    elif choice < 0.7:
+        return '-({})'.format(random_expr(rng, depth+1))
+    elif choice < 0.75:
+        return '!({})'.format(random_expr(rng, depth+1))
+    else:
+        func = rng.choice(['f', 'GEV2', 'TMath::Sqrt', 'std::pow'])
+        args = ', '.join(random_expr(rng, depth+1)
+                         for _ in range(rng.randint(0, 3)))
+        return '{}({})'.format(func, args)
+
+
+@pytest.mark.parametrize('expr', FAST_PATH_CORPUS)
+def test_fast_extract_differential(expr):
+    assert fast_extract(expr) == lark_extract(expr)
+
+
+@pytest.mark.parametrize('expr', FALLBACK_CORPUS)
+def test_fast_extract_fallback(expr):
+    assert fast_extract(expr) is None
+
+
+def test_fast_extract_differential_random():
+    rng = random.Random(42)
+    for _ in range(1000):
+        expr = random_expr(rng)
+        result = fast_extract(expr)
+        try:
+            expected = lark_extract(expr)
+        except UnexpectedInput:
+            assert result is None, expr
+            continue
+
+        if result is not None:  # Falling back is always fine
+            assert result == expected, expr
@@ -2,11 +2,11 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Tue Aug 31, 2021 at 08:49 PM +0200
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 
 from collections import defaultdict
 
-from pyBabyMaker.dag_resolver import Variable, Node
+from pyBabyMaker.dag_resolver import Variable, Node, NodeRegistry
 from pyBabyMaker.dag_resolver import resolve_var, resolve_vars_in_scope, \
     resolve_scope
 
@@ -69,6 +69,34 @@ def test_Node_sub():
     assert var.rval == 'scope1_a+scope2_b'
 
 
+def test_Node_hash():
+    var1 = Node('test', 'raw', expr='a+b')
+    var2 = Node('test', 'raw', expr='a+b', children=[Node('a', 'raw')])
+    var3 = Node('test', 'raw', expr='a-b')
+
+    assert var1.key == ('test', 'raw', None, 'a+b')
+    assert hash(var1) == hash(var2)
+    assert len({var1, var2, var3}) == 2
+
+
+def test_NodeRegistry_unique():
+    registry = NodeRegistry([Node('a', 'raw'), Node('b', 'raw')])
+    registry += [Node('a', 'raw'), Node('c', 'raw')]
+    registry.append(Node('b', 'raw'))
+
+    assert registry == [Node('a', 'raw'), Node('b', 'raw'), Node('c', 'raw')]
+    assert Node('c', 'raw') in registry
+    assert Node('c', 'calc') not in registry
+
+
+def test_NodeRegistry_get():
+    node = Node('a', 'rename', expr='x', children=[Node('x', 'raw')])
+    registry = NodeRegistry([node])
+
+    assert registry.get(Node('a', 'rename', expr='x')) is node
+    assert registry.get(Node('a', 'rename', expr='y')) is None
+
+
 #############################
 # Resolve a single variable #
 #############################
@@ -356,6 +384,23 @@ def test_reslove_vars_in_scope_vars_partial():
     ]
 
 
+def test_resolve_vars_in_scope_large():
+    size = 10000
+    scopes = {
+        'calc': {'v{}'.format(i): Variable('v{}'.format(i),
+                                           rvals=['x{0}+x{1}'.format(
+                                               i, (i+1) % size)])
+                 for i in range(size)},
+        'raw': {'x{}'.format(i): Variable('x{}'.format(i))
+                for i in range(size)}
+    }
+    resolved, unresolved = resolve_vars_in_scope(
+        scopes['calc'].values(), 'calc', scopes, ordering=['calc', 'raw'])
+
+    assert len(resolved) == 2*size
+    assert unresolved == []
+
+
 ###########################################
 # Resolve all variables in a single scope #
 ###########################################
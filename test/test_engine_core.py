@@ -8,6 +8,7 @@ import pytest
 
 from pyBabyMaker.engine.core import helper_flatten
 from pyBabyMaker.engine.core import template_transformer, template_evaluator
+from pyBabyMaker.engine.core import template_include
 
 
 def test_helper_flatten_trivial():
@@ -207,3 +208,36 @@ def test_template_evaluator_if_stmt_proper_complex():
     assert template_evaluator(result) == [
         '  cout << 3 <<endl;\n',
     ]
+
+
+def test_template_evaluator_if_stmt_neq_none():
+    file_content = [
+        '// {% if directive.a != (none:) then %}\n',
+        '  cout << /* {% directive.a %} */ <<endl;\n',
+        '// {% endif %}\n',
+    ]
+
+    # Case 1
+    result = template_transformer(file_content, {'a': 0})
+    assert template_evaluator(result) == [
+        '  cout << 0 <<endl;\n',
+    ]
+
+    # Case 2
+    result = template_transformer(file_content, {'a': None})
+    assert template_evaluator(result) == []
+
+
+def test_template_include(tmp_path):
+    (tmp_path / 'include').mkdir()
+    (tmp_path / 'include' / 'a.cpp').write_text(
+        'int a = 1;\n// {% include: "b.cpp" %}\n')
+    (tmp_path / 'include' / 'b.cpp').write_text('int b = /* {% directive.b %} */;\n')
+    file_content = [
+        'int x = 0;\n',
+        '// {% include: "include/a.cpp" %}\n',
+    ]
+    result = template_transformer(
+        template_include(file_content, str(tmp_path)), {'b': 2})
+    assert template_evaluator(result) == [
+        'int x = 0;\n', 'int a = 1;\n', 'int b = 2;\n']
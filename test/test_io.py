@@ -2,14 +2,23 @@
 #
 # Author: Yipeng Sun <syp at umd dot edu>
 # License: BSD 2-clause
-# Last Change: Thu Mar 11, 2021 at 12:30 AM +0100
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
 
 import os
+import shutil
 import pytest
 import yaml
+import uproot
+import numpy as np
+import awkward as ak
 
+from unittest.mock import patch
+
+from pyBabyMaker.base import BaseMaker
 from pyBabyMaker.io.NestedYAMLLoader import NestedYAMLLoader
 from pyBabyMaker.io.TupleDump import PyTupleDump
+from pyBabyMaker.io.SchemaCache import SchemaCache
+from pyBabyMaker.io.TupleMerge import merge_ntuples
 
 PWD = os.path.dirname(os.path.realpath(__file__))
 PARDIR = os.path.join(PWD, os.pardir)
@@ -40,3 +49,177 @@ def test_PyTupleDump():
 
     assert result['TupleB0/DecayTree']['CaloPrsE'] == 'float'
     assert result['TupleB0WSPi/DecayTree']['D0_ENDVERTEX_COV_'] == 'float[3][3]'
+
+
+@pytest.fixture
+def ntp_copy(tmp_path):
+    path = str(tmp_path / 'sample.root')
+    shutil.copy(SAMPLE_NTP, path)
+    return path
+
+
+def test_SchemaCache_roundtrip(tmp_path, ntp_copy):
+    cache = SchemaCache(str(tmp_path / 'cache'))
+    assert cache.get(ntp_copy) is None
+
+    cache.put(ntp_copy, {'tree': {'br': 'float'}})
+    assert cache.get(ntp_copy) == {'tree': {'br': 'float'}}
+
+
+def test_SchemaCache_invalidate(tmp_path, ntp_copy):
+    cache = SchemaCache(str(tmp_path / 'cache'), checksum_bytes=1024)
+    cache.put(ntp_copy, {'tree': {'br': 'float'}})
+
+    stat = os.stat(ntp_copy)
+    os.utime(ntp_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns+10**9))
+    assert cache.get(ntp_copy) is None
+
+
+def test_SchemaCache_evict(tmp_path):
+    cache = SchemaCache(str(tmp_path / 'cache'), max_entries=2)
+    ntps = []
+    for i in range(3):
+        ntp = tmp_path / 'ntp{}.root'.format(i)
+        ntp.write_text(str(i))
+        ntps.append(str(ntp))
+
+    cache.put(ntps[0], {'tree': {}})
+    cache.put(ntps[1], {'tree': {}})
+    os.utime(cache.path(cache.key(ntps[1])), ns=(0, 0))  # Least recently used
+    cache.put(ntps[2], {'tree': {}})
+
+    assert len(cache.entries()) == 2
+    assert cache.get(ntps[0]) is not None
+    assert cache.get(ntps[1]) is None
+
+
+def test_BaseMaker_dump_cached(tmp_path, ntp_copy):
+    cache = SchemaCache(str(tmp_path / 'cache'))
+    result = BaseMaker.dump(ntp_copy, cache)
+
+    with patch('pyBabyMaker.io.TupleDump.PyTupleDump') as m:
+        assert BaseMaker.dump(ntp_copy, cache) == result
+        m.assert_not_called()
+
+
+class FakeDirectory:
+    def __init__(self, content):
+        self.content = content
+        self.read = []
+
+    def classnames(self, recursive=False):
+        return {k: v if isinstance(v, str) else v[0]
+                for k, v in self.content.items()}
+
+    def __getitem__(self, key):
+        self.read.append(key)
+        return self.content[key][1]
+
+
+@pytest.fixture
+def fake_ntp():
+    return FakeDirectory({
+        'hist;1': 'TH1D',
+        'TupleA;1': ('TDirectoryFile', FakeDirectory({
+            'DecayTree;2': 'TTree',
+            'DecayTree;1': 'TTree',
+            'hist;1': 'TH1D',
+        })),
+        'TupleB;1': ('TDirectory', FakeDirectory({
+            'DecayTree;1': 'TTree',
+        })),
+        'tree;3': 'TTree',
+        'tree;4': 'TTree',
+    })
+
+
+def test_PyTupleDump_ttree_only(fake_ntp):
+    assert PyTupleDump.ttree_only(fake_ntp) == [
+        'TupleA/DecayTree;2', 'TupleB/DecayTree;1', 'tree;4']
+    assert fake_ntp.read == ['TupleA;1', 'TupleB;1']
+
+
+def test_PyTupleDump_ttree_only_all_cycles(fake_ntp):
+    assert PyTupleDump.ttree_only(fake_ntp, False) == [
+        'TupleA/DecayTree;1', 'TupleA/DecayTree;2', 'TupleB/DecayTree;1',
+        'tree;3', 'tree;4']
+
+
+def test_PyTupleDump_ttree_only_selected(fake_ntp):
+    assert PyTupleDump.ttree_only(
+        fake_ntp, trees=['TupleB/DecayTree', 'TupleC/DecayTree']) == [
+            'TupleB/DecayTree;1']
+    assert fake_ntp.read == ['TupleB;1']
+
+
+def test_PyTupleDump_selected():
+    result = PyTupleDump(SAMPLE_NTP).dump(['TupleB0/DecayTree', 'Nope/Tree'])
+
+    assert list(result) == ['TupleB0/DecayTree']
+    assert result['TupleB0/DecayTree']['CaloPrsE'] == 'float'
+
+
+def test_SchemaCache_partial(tmp_path, ntp_copy):
+    cache = SchemaCache(str(tmp_path / 'cache'))
+    cache.put(ntp_copy, {'a': {'br': 'float'}}, ['a', 'b'])
+
+    assert cache.get(ntp_copy) is None
+    assert cache.get(ntp_copy, ['a']) == {'a': {'br': 'float'}}
+    assert cache.get(ntp_copy, ['a', 'b']) == {'a': {'br': 'float'}}
+    assert cache.get(ntp_copy, ['c']) is None
+
+    cache.put(ntp_copy, {'c': {'br': 'int'}}, ['c'])
+    assert cache.get(ntp_copy, ['a', 'c']) == {
+        'a': {'br': 'float'}, 'c': {'br': 'int'}}
+
+    cache.put(ntp_copy, {'a': {'br': 'float'}, 'd': {}})
+    assert cache.get(ntp_copy) == {'a': {'br': 'float'}, 'd': {}}
+    assert cache.get(ntp_copy, ['b', 'd']) == {'d': {}}
+
+
+def test_merge_ntuples(tmp_path):
+    shards = []
+    for idx in range(3):
+        path = str(tmp_path / 'ATuple_shard{}of3.root'.format(idx))
+        with uproot.recreate(path) as ntp:
+            ntp.mktree('tree', {'a': 'int64', 'b': 'bool'})
+            ntp['tree'].extend({'a': np.arange(idx*2, idx*2+2),
+                                'b': np.array([True, False])})
+        shards.append(path)
+
+    merged = str(tmp_path / 'ATuple.root')
+    assert merge_ntuples(merged, shards) == 6
+
+    with uproot.open(merged) as ntp:
+        assert ntp.classnames() == {'tree;1': 'TTree'}
+        result = ntp['tree'].arrays(library='np')
+    assert result['a'].tolist() == [0, 1, 2, 3, 4, 5]
+    assert result['b'].tolist() == [True, False]*3
+
+
+def test_merge_ntuples_jagged(tmp_path):
+    shards = []
+    for idx in range(2):
+        path = str(tmp_path / 'ATuple_shard{}of2.root'.format(idx))
+        with uproot.recreate(path, compression=uproot.LZMA(5)) as ntp:
+            ntp.mktree('tree', {'a': 'int32', 'x': 'var * float64'},
+                       counter_name=lambda br: 'nx')
+            ntp['tree'].extend({'a': np.array([idx, idx], dtype=np.int32),
+                                'x': ak.Array([[1.0*idx], [2.0, 3.0]])})
+        shards.append(path)
+
+    merged = str(tmp_path / 'ATuple.root')
+    # Read one entry at a time
+    assert merge_ntuples(merged, shards, step_size=1) == 4
+
+    with uproot.open(merged) as ntp:
+        assert ntp.file.compression == uproot.LZMA(5)
+        assert sorted(ntp['tree'].keys()) == ['a', 'nx', 'x']
+        result = ntp['tree'].arrays(library='ak')
+    assert result['a'].tolist() == [0, 0, 1, 1]
+    assert result['x'].tolist() == [[0.0], [2.0, 3.0], [1.0], [2.0, 3.0]]
+
+
+def test_merge_ntuples_no_input(tmp_path):
+    with pytest.raises(ValueError):
+        merge_ntuples(str(tmp_path / 'merged.root'), [])
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun <syp at umd dot edu>
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+
+from pyBabyMaker.base import UniqueList
+from pyBabyMaker.dag_resolver import Node
+from pyBabyMaker.optimizer import parse_expr_with_pos, find_span, \
+    literal_type, common_type, infer_type, is_pure, find_candidates, \
+    parse_number, format_number, evaluate, \
+    eliminate_common_subexprs, fold_constants, eliminate_dead_vars
+
+
+PURE_FUNCTIONS = {'sqrt': 'cmath', 'pow': 'cmath', 'abs': 'same',
+                  'TMath::Pi': 'double', 'my_f': 'double'}
+
+
+###########
+# Helpers #
+###########
+
+def test_find_span():
+    expr = 'x > (a+b)*(c+d)'
+    tree = parse_expr_with_pos(expr)
+
+    assert expr[slice(*find_span(expr, tree.children[1]))] == '(a+b)*(c+d)'
+    assert expr[slice(*find_span(expr, tree))] == expr
+
+
+def test_literal_type():
+    assert literal_type('3') == 'int'
+    assert literal_type('3u') == 'unsigned int'
+    assert literal_type('3LL') == 'long long'
+    assert literal_type('3.14') == 'double'
+    assert literal_type('1e3') == 'double'
+    assert literal_type('3.14f') == 'float'
+    assert literal_type('pi') is None
+
+
+def test_common_type():
+    assert common_type(['bool', 'short']) == 'int'
+    assert common_type(['int', 'UInt_t']) == 'UInt_t'
+    assert common_type(['int', 'Long64_t']) == 'Long64_t'
+    assert common_type(['int', 'float']) == 'float'
+    assert common_type(['Float_t', 'Double_t']) == 'double'
+    assert common_type(['double', 'TLorentzVector']) is None
+    assert common_type([]) is None
+
+
+def test_infer_type():
+    var_types = {'a': 'int', 'b': 'float', 'c': 'TVector3'}
+
+    def infer(expr):
+        return infer_type(parse_expr_with_pos(expr), var_types,
+                          PURE_FUNCTIONS)
+
+    assert infer('a/2') == 'int'
+    assert infer('a/2.0') == 'double'
+    assert infer('a*b') == 'float'
+    assert infer('a > b') == 'bool'
+    assert infer('sqrt(a)') == 'double'
+    assert infer('sqrt(b)') == 'float'
+    assert infer('abs(a)') == 'int'
+    assert infer('TMath::Pi()*a') == 'double'
+    assert infer('c.Mag()') is None
+    assert infer('f(a)') is None
+
+
+def test_is_pure():
+    def pure(expr):
+        return is_pure(parse_expr_with_pos(expr), PURE_FUNCTIONS)
+
+    assert pure('sqrt(a*a + b*b) > 1')
+    assert not pure('f(a)')
+    assert not pure('v.size()')
+
+
+def test_find_candidates():
+    tree = parse_expr_with_pos('a*b > 1 && c/d > 1')
+    candidates = [t.data for t in find_candidates(tree)]
+
+    assert candidates == ['gt', 'mul']
+
+
+def test_parse_number():
+    assert parse_number('3') == (3, 'int')
+    assert parse_number('-3L') == (-3, 'long')
+    assert parse_number('3.14') == (3.14, 'double')
+    assert parse_number('1e3') == (1000.0, 'double')
+    assert parse_number('3.14f') is None
+    assert parse_number('3u') is None
+    assert parse_number('010') is None
+    assert parse_number('3000000000') is None
+    assert parse_number('nan') is None
+
+
+def test_format_number():
+    assert format_number(3, 'int') == '3'
+    assert format_number(3, 'long long') == '3LL'
+    assert format_number(1000.0, 'double') == '1000.0'
+    assert format_number(-0.0, 'double') == '(-0.0)'
+
+
+def test_evaluate():
+    def fold(expr, values={}):
+        return evaluate(parse_expr_with_pos(expr), values, PURE_FUNCTIONS)
+
+    assert fold('100 * pow(10, 3)') == (100000.0, 'double')
+    assert fold('7 / 2') == (3, 'int')
+    assert fold('-7 / 2') == (-3, 'int')
+    assert fold('7 / 2.') == (3.5, 'double')
+    assert fold('abs(-3)') == (3, 'int')
+    assert fold('2 * pi', {'pi': (3.14, 'double')}) == (6.28, 'double')
+    assert fold('TMath::Pi()')[1] == 'double'
+
+    assert fold('1 / 0') is None
+    assert fold('2147483647 + 1') is None
+    assert fold('sqrt(-1)') is None
+    assert fold('my_f(1)') is None
+    assert fold('1 > 0') is None
+    assert fold('x + 1') is None
+
+
+##########
+# Passes #
+##########
+
+def test_eliminate_common_subexprs():
+    raw_a = Node('a', 'raw', 'double', input=True, output=False)
+    raw_b = Node('b', 'raw', 'double', input=True, output=False)
+    cut = Node('sel0', 'selection', expr='sqrt(a*a + b*b) > 1',
+               children=[raw_a, raw_b], output=False)
+    pt = Node('pt', 'calculation', 'double', 'sqrt(a*a + b*b)',
+              children=[raw_a, raw_b])
+    ratio = Node('ratio', 'calculation', 'double', 'a*a / (a*a + b*b)',
+                 children=[raw_a, raw_b])
+
+    (pre, post), temps = eliminate_common_subexprs(
+        [[raw_a, raw_b, cut], [pt, ratio]], PURE_FUNCTIONS)
+
+    assert [(t.fname, t.type, t.rval) for t in temps] == [
+        ('cse_subexpr0', 'double', 'sqrt(cse_subexpr1)'),
+        ('cse_subexpr1', 'double', 'cse_subexpr2 + raw_b*raw_b'),
+        ('cse_subexpr2', 'double', 'raw_a*raw_a'),
+    ]
+    assert pre == [raw_a, raw_b, temps[2], temps[1], temps[0], cut]
+    assert post == [pt, ratio]
+    assert cut.rval == 'cse_subexpr0 > 1'
+    assert pt.rval == 'cse_subexpr0'
+    assert ratio.rval == 'cse_subexpr2 / (cse_subexpr1)'
+
+
+def test_eliminate_common_subexprs_rehash():
+    # 'pt' is rewritten while it is a child of 'pt_gev', whose children must
+    # still find it by its new key
+    raw_a = Node('a', 'raw', 'double', input=True, output=False)
+    raw_b = Node('b', 'raw', 'double', input=True, output=False)
+    pt = Node('pt', 'calculation', 'double', 'sqrt(a*a + b*b) + 1',
+              children=[raw_a, raw_b], output=False)
+    pt_gev = Node('pt_gev', 'calculation', 'double', 'pt / 1000',
+                  children=UniqueList([pt]))
+    cut = Node('sel0', 'selection', expr='sqrt(a*a + b*b) > 1',
+               children=[raw_a, raw_b], output=False)
+
+    (pre, post), temps = eliminate_common_subexprs(
+        [[raw_a, raw_b, cut], [pt, pt_gev]], PURE_FUNCTIONS)
+
+    assert pt.rval == 'cse_subexpr0 + 1'
+    assert pt in pt_gev.children
+    assert temps[0] in pt.children
+
+
+def test_eliminate_common_subexprs_conditional():
+    raw_a = Node('a', 'raw', 'double', input=True, output=False)
+    raw_b = Node('b', 'raw', 'double', input=True, output=False)
+    cut = Node('sel0', 'selection', expr='b != 0 && a/b > 1',
+               children=[raw_a, raw_b], output=False)
+    ratio = Node('ratio', 'calculation', 'double', 'a/b',
+                 children=[raw_a, raw_b])
+
+    (pre, post), temps = eliminate_common_subexprs(
+        [[raw_a, raw_b, cut], [ratio]], PURE_FUNCTIONS)
+
+    assert temps == []
+    assert cut.rval == 'raw_b != 0 && raw_a/raw_b > 1'
+
+
+def test_eliminate_common_subexprs_impure():
+    raw_a = Node('a', 'raw', 'double', input=True, output=False)
+    x = Node('x', 'calculation', 'double', 'rand(a) + 1', children=[raw_a])
+    y = Node('y', 'calculation', 'double', 'rand(a) + 2', children=[raw_a])
+
+    _, temps = eliminate_common_subexprs([[raw_a, x, y]], PURE_FUNCTIONS)
+
+    assert temps == []
+
+
+def test_fold_constants():
+    pi = Node('pi', 'literals', literal='3.14')
+    raw_a = Node('a', 'raw', 'double', input=True, output=False)
+    cut = Node('sel0', 'selection', expr='a > (100 * pow(10, 3))',
+               children=[raw_a], output=False)
+    k = Node('k', 'calculation', 'double', 'pi*2', children=[pi],
+             output=False)
+    m = Node('m', 'calculation', 'double', 'my_f(pow(pi, 2)) + 1',
+             children=[pi], output=False)
+    x = Node('x', 'calculation', 'double', 'a*k + my_f(pi) - 7/2 + k*3',
+             children=UniqueList([raw_a, k, pi]))
+
+    (pre, post), invariant, folded = fold_constants(
+        [[raw_a, cut], [k, m, x]], PURE_FUNCTIONS)
+
+    assert cut.rval == 'raw_a > (100000.0)'
+    assert x.rval == 'raw_a*calculation_k + const_expr0 - 3 + 18.84'
+    # 'k' is found by its new key
+    assert k in x.children
+    assert [(v.fname, v.rval) for v in invariant] == [
+        ('calculation_k', '6.28'),
+        ('calculation_m', 'my_f(9.8596) + 1'),
+        ('const_expr0', 'my_f(3.14)'),
+    ]
+    assert pre == [raw_a, cut]
+    assert post == [x]
+    assert folded == [('100 * pow(10, 3)', '100000.0'), ('pi*2', '6.28'),
+                      ('pow(pi, 2)', '9.8596'), ('7/2', '3'),
+                      ('k*3', '18.84')]
+
+
+def test_fold_constants_not_constant():
+    raw_a = Node('a', 'raw', 'double', input=True, output=False)
+    name = Node('name', 'literals', literal='Y_PT')
+    cut = Node('sel0', 'selection', expr='a != 0 && my_f(1) / a > 1',
+               children=[raw_a], output=False)
+    x = Node('x', 'calculation', 'double', 'name + rand(1)',
+             children=[name])
+
+    (pre, post), invariant, folded = fold_constants(
+        [[raw_a, cut], [x]], PURE_FUNCTIONS)
+
+    # Conditionally evaluated, non-numeric literal, and impure function
+    assert invariant == []
+    assert folded == []
+    assert post == [x]
+
+
+def test_eliminate_dead_vars():
+    raw_a = Node('a', 'raw', 'double', input=True, output=False)
+    raw_b = Node('b', 'raw', 'double', input=True, output=False)
+    raw_c = Node('c', 'raw', 'double', input=True, output=False)
+    cut = Node('sel0', 'selection', expr='a > 1', children=[raw_a],
+               output=False)
+    used = Node('used', 'calculation', 'double', 'a + b',
+                children=[raw_a, raw_b], output=False)
+    unused = Node('unused', 'calculation', 'double', 'c*2', children=[raw_c],
+                  output=False)
+    x = Node('x', 'calculation', 'double', 'used', children=[used])
+
+    (pre, post), removed = eliminate_dead_vars(
+        [[raw_a, cut], [raw_a, raw_b, raw_c, used, unused, x]])
+
+    assert pre == [raw_a, cut]
+    assert post == [raw_a, raw_b, used, x]
+    assert removed == [raw_c, unused]
+
+
+def test_eliminate_dead_vars_folded():
+    pi = Node('pi', 'literals', literal='3.14')
+    raw_a = Node('a', 'raw', 'double', input=True, output=False)
+    k = Node('k', 'calculation', 'double', 'pi*2', children=[pi],
+             output=False)
+    x = Node('x', 'calculation', 'double', 'k*3 + a', children=[raw_a, k])
+
+    (post,), invariant, _ = fold_constants([[raw_a, k, x]], PURE_FUNCTIONS)
+    (invariant, post), removed = eliminate_dead_vars([invariant, post])
+
+    # 'k' is no longer needed once 'k*3' is folded
+    assert x.rval == '18.84 + raw_a'
+    assert invariant == []
+    assert removed == [k]
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:12 AM +0200
+"""
+Benchmark the scaling of the DAG resolver w.r.t. the number of variables in a
+scope.
+"""
+
+import sys
+
+from timeit import default_timer as timer
+
+from pyBabyMaker.dag_resolver import Variable, resolve_vars_in_scope
+
+
+def make_scopes(size):
+    return {
+        'calc': {'v{}'.format(i): Variable('v{}'.format(i), rvals=[
+            'x{}+x{}'.format(i, (i+1) % size)]) for i in range(size)},
+        'raw': {'x{}'.format(i): Variable('x{}'.format(i))
+                for i in range(size)}
+    }
+
+
+def bench(size):
+    scopes = make_scopes(size)
+    start = timer()
+    resolve_vars_in_scope(scopes['calc'].values(), 'calc', scopes,
+                          ordering=['calc', 'raw'])
+    return timer() - start
+
+
+if __name__ == '__main__':
+    sizes = [int(i) for i in sys.argv[1:]] if len(sys.argv) > 1 else \
+        [1250, 2500, 5000, 10000]
+
+    for size in sizes:
+        elapsed = bench(size)
+        print('{:>8} variables: {:8.3f} s ({:.2f} us/variable)'.format(
+            size, elapsed, elapsed / size * 1e6))
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+"""
+Benchmark the startup time of babymaker, i.e. 'import pyBabyMaker.babymaker'
+followed by the construction of both parsers.
+
+The cold run is done with an empty parser cache; the warm runs reuse the cache
+populated by the cold run.
+"""
+
+import sys
+import subprocess
+
+from tempfile import TemporaryDirectory
+from timeit import default_timer as timer
+
+
+SNIPPET_IMPORT = 'import pyBabyMaker.babymaker'
+SNIPPET_PARSERS = '''
+import pyBabyMaker.babymaker
+from pyBabyMaker.boolean.syntax import cpp_boolean_parser
+from pyBabyMaker.engine.syntax import template_macro_parser
+cpp_boolean_parser.options['cache'] = '{cache}/cpp.cache'
+template_macro_parser.options['cache'] = '{cache}/macro.cache'
+cpp_boolean_parser.parse('a+b')
+template_macro_parser.parse('a')
+'''
+
+
+def run(snippet):
+    start = timer()
+    subprocess.run([sys.executable, '-c', snippet], check=True)
+    return timer() - start
+
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    print('import only:        {:.3f} s'.format(
+        min(run(SNIPPET_IMPORT) for _ in range(repeat))))
+
+    with TemporaryDirectory() as cache:
+        snippet = SNIPPET_PARSERS.format(cache=cache)
+        print('import+parse, cold: {:.3f} s'.format(run(snippet)))
+        print('import+parse, warm: {:.3f} s'.format(
+            min(run(snippet) for _ in range(repeat))))
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+#
+# Author: Yipeng Sun
+# License: BSD 2-clause
+# Last Change: Sat Oct 17, 2026 at 10:00 AM +0200
+
+import sys
+import uproot
+
+from numpy import array_equal
+
+
+if __name__ == '__main__':
+    ntp_ref, ntp_comp = sys.argv[1:3]
+    tree = sys.argv[3] if len(sys.argv) > 3 else 'tree'
+
+    brs_ref = uproot.open(ntp_ref)[tree].arrays(library='np')
+    brs_comp = uproot.open(ntp_comp)[tree].arrays(library='np')
+
+    ok = True
+    if set(brs_ref) != set(brs_comp):
+        print('Branches differ: {} vs {}'.format(
+            sorted(brs_ref), sorted(brs_comp)))
+        ok = False
+
+    for br in sorted(set(brs_ref) & set(brs_comp)):
+        same = array_equal(brs_ref[br], brs_comp[br])
+        print('Branch {} is {}'.format(br, 'the same' if same else 'different'))
+        ok = ok and same
+
+    if ok:
+        print('Everything is fine!')
+        sys.exit(0)
+    else:
+        print('The ntuples {} and {} are not identical!'.format(
+            ntp_ref, ntp_comp))
+        sys.exit(255)